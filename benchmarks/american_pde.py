@@ -0,0 +1,77 @@
+"""
+Accuracy against runtime of the Crank-Nicolson finite-difference engine and the binomial tree for an
+American put, and the saving of pricing several strikes on one shared grid.
+
+Usage (from the repository root):
+    python -m benchmarks.american_pde
+    python -m benchmarks.american_pde --S 90 --K 100 --T 0.5 --sigma 0.4 --reference-steps 40000
+
+Errors are taken against a BBSR tree with --reference-steps steps, whose delta and gamma come from
+spot bumps of --bump relative size. The tree cases value delta and gamma the same way, so their time
+covers three trees; the finite-difference engine reads them off its grid, so its time covers one solve.
+"""
+import argparse
+import time
+import warnings
+import numpy as np
+from src.service.AmericanOption import AmericanOption
+
+
+def tree_greeks(S, K, T, r, sigma, n, extrapolation, bump):
+    h = bump * S
+    down, price, up = (AmericanOption.binomial_tree_american_option_price(spot, K, T, r, sigma, n, 'put', extrapolation)
+                       for spot in (S - h, S, S + h))
+    return {"price": price, "delta": (up - down) / (2 * h), "gamma": (up - 2 * price + down) / h**2}
+
+
+def timed(function, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--S", type=float, default=100)
+    parser.add_argument("--K", type=float, default=100)
+    parser.add_argument("--T", type=float, default=1)
+    parser.add_argument("--r", type=float, default=0.05)
+    parser.add_argument("--sigma", type=float, default=0.3)
+    parser.add_argument("--tree-steps", type=int, nargs="+", default=[100, 200, 400, 800, 1600])
+    parser.add_argument("--grids", type=int, nargs="+", default=[100, 200, 400, 800, 1600],
+                        help="Log-spot intervals; the engine takes half as many time steps")
+    parser.add_argument("--reference-steps", type=int, default=20000)
+    parser.add_argument("--bump", type=float, default=0.01, help="Relative spot bump of the tree Greeks")
+    parser.add_argument("--strikes", type=int, default=9, help="Strikes of the shared grid comparison")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    S, K, T, r, sigma = args.S, args.K, args.T, args.r, args.sigma
+    reference = tree_greeks(S, K, T, r, sigma, args.reference_steps, "bbsr", args.bump)
+    print(f"reference: price {reference['price']:.6f}, delta {reference['delta']:.6f}, gamma {reference['gamma']:.6f}")
+    print(f"{'engine':<24} {'ms':>9} {'price error':>12} {'delta error':>12} {'gamma error':>12}")
+
+    cases = [(f"tree {extrapolation} n={n}", lambda n=n, extrapolation=extrapolation: tree_greeks(S, K, T, r, sigma, n, extrapolation, args.bump))
+             for extrapolation in ("none", "bbsr") for n in args.tree_steps]
+    cases += [(f"pde {grid}x{grid // 2}", lambda grid=grid: AmericanOption.finite_difference_american_option_price(S, K, T, r, sigma, 'put', grid, grid // 2))
+              for grid in args.grids]
+    for name, function in cases:
+        seconds, result = timed(function, args.repeat)
+        errors = [abs(result[greek] - reference[greek]) for greek in ("price", "delta", "gamma")]
+        print(f"{name:<24} {1e3 * seconds:>9.2f} " + " ".join(f"{error:>12.2e}" for error in errors))
+
+    strikes = np.linspace(0.8 * K, 1.2 * K, args.strikes)
+    grid = args.grids[len(args.grids) // 2]
+    shared, _ = timed(lambda: AmericanOption.finite_difference_american_option_prices(S, strikes, T, r, sigma, 'put', grid, grid // 2), args.repeat)
+    separate, _ = timed(lambda: [AmericanOption.finite_difference_american_option_price(S, strike, T, r, sigma, 'put', grid, grid // 2)
+                                 for strike in strikes], args.repeat)
+    print(f"\n{args.strikes} strikes on a {grid}x{grid // 2} grid: shared {1e3 * shared:.2f} ms, "
+          f"one solve each {1e3 * separate:.2f} ms ({separate / shared:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Cold-start report: the time to import the app, and the extra time each engine costs on first use.
+
+Usage (from the repository root):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 9 --top 15
+
+Every measurement runs in a fresh interpreter so nothing is already imported. The "all engines"
+row loads every engine right after the import, which is what an eager import used to cost and
+what OPTION_PRICER_WARM_UP=all does at startup.
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import src.main
+imported = time.perf_counter() - start
+names = json.loads(sys.argv[1])
+start = time.perf_counter()
+src.main.engines.warm_up(names)
+print(json.dumps({"import": imported, "engines": time.perf_counter() - start}))
+"""
+
+
+def probe(names):
+    output = subprocess.run([sys.executable, "-c", PROBE, json.dumps(names)], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.splitlines()[-1])
+
+
+def engine_names():
+    output = subprocess.run(
+        [sys.executable, "-c", "import json, src.main; print(json.dumps(list(src.main.engines.report())))"],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(output.stdout.splitlines()[-1])
+
+
+def slowest_modules(top):
+    """(cumulative seconds, module) of the slowest direct imports of src.main"""
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.main"], capture_output=True, text=True, check=True)
+    children, modules = [], []
+    # -X importtime prints children before their parent, indented two spaces per level.
+    for line in output.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)", line)
+        if match is None:
+            continue
+        depth = len(match.group(2)) // 2
+        if depth == 1:
+            children.append((int(match.group(1)) / 1e6, match.group(3)))
+        elif depth == 0:
+            if match.group(3) == "src.main":
+                modules = children
+            children = []
+    return sorted(modules, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement; the median is reported")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports of src.main to list")
+    args = parser.parse_args()
+
+    rows = [("import src.main", [])] + [(f"+ {name}", [name]) for name in engine_names()] + [("+ all engines", None)]
+    print(f"{'measurement':<28} {'import s':>9} {'first use s':>12}")
+    for label, names in rows:
+        runs = [probe(names) for _ in range(args.runs)]
+        print(f"{label:<28} {statistics.median(run['import'] for run in runs):>9.3f} "
+              f"{statistics.median(run['engines'] for run in runs):>12.3f}")
+
+    print("\nSlowest direct imports of src.main:")
+    for seconds, module in slowest_modules(args.top):
+        print(f"  {seconds:>7.3f} s  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Load test: replay a JSONL trace of API calls against the app and report throughput and latency per route.
+
+Usage (from the repository root):
+    python -m benchmarks.load_test                                   # in process, benchmarks/traces/mixed.jsonl
+    python -m benchmarks.load_test --target uvicorn --workers 4 --concurrency 64 --repeat 20
+    python -m benchmarks.load_test my_trace.jsonl --url http://127.0.0.1:8000 --no-cache
+
+Each trace line is one JSON object, like the lines of requests.jsonl:
+    {"request_id": "trace-001", "method": "POST", "path": "/api/implied-volatility", "body": {...}}
+method defaults to POST and body to none. The trace is replayed --repeat times by --concurrency
+clients, each sending its next call as soon as the previous one is answered.
+
+Targets:
+    inprocess  the ASGI app in this process; sync handlers still run on the threadpool, and
+               validation and JSON encoding are included, but there is no socket
+    uvicorn    a uvicorn server launched on 127.0.0.1 with --workers processes, stopped afterwards
+    --url      an already running server
+Everything runs locally, without network access. Engines are loaded before timing starts.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import warnings
+from collections import defaultdict
+import httpx
+import numpy as np
+
+DEFAULT_TRACE = os.path.join(os.path.dirname(__file__), "traces", "mixed.jsonl")
+
+
+def read_trace(path):
+    with open(path) as file:
+        calls = [json.loads(line) for line in file if line.strip()]
+    for number, call in enumerate(calls, start=1):
+        if "path" not in call:
+            raise ValueError(f"{path}:{number} has no path")
+        call.setdefault("method", "POST")
+    return calls
+
+
+async def replay(client, calls, concurrency):
+    """(wall seconds, {path: [(seconds, status)]}) of sending every call with concurrency clients"""
+    queue = asyncio.Queue()
+    for call in calls:
+        queue.put_nowait(call)
+    results = defaultdict(list)
+
+    async def client_loop():
+        while not queue.empty():
+            call = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                response = await client.request(call["method"], call["path"], json=call.get("body"))
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            results[call["path"]].append((time.perf_counter() - start, status))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return time.perf_counter() - start, results
+
+
+def summarize(seconds, results):
+    """Per-route rows, followed by one row over all routes"""
+    rows = []
+    routes = sorted(results) + ["all"]
+    for route in routes:
+        samples = [sample for samples in results.values() for sample in samples] if route == "all" else results[route]
+        latencies = np.array([latency for latency, _ in samples])
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1e3
+        rows.append({
+            "route": route,
+            "requests": len(samples),
+            "errors": sum(1 for _, status in samples if not 200 <= status < 300),
+            "requests_per_second": len(samples) / seconds,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+        })
+    return rows
+
+
+def launch_uvicorn(port, workers, environment):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=environment
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+        try:
+            if httpx.get(f"{url}/api/engines").status_code == 200:
+                return process, url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start within 60 seconds")
+
+
+async def run(args, calls):
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    if args.url is not None:
+        client = httpx.AsyncClient(base_url=args.url, timeout=timeout, limits=limits)
+    else:
+        from src import main as app_module
+        app_module.engines.warm_up()
+        if args.no_cache:
+            app_module.result_cache.maxsize = 0
+            app_module.result_cache.clear()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app_module.app), base_url="http://load-test", timeout=timeout)
+    async with client:
+        return await replay(client, calls * args.repeat, args.concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", nargs="?", default=DEFAULT_TRACE, help="JSONL trace of API calls")
+    parser.add_argument("--target", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--url", help="Base URL of a running server; overrides --target")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765, help="Port of the launched uvicorn server")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clients sending calls at once")
+    parser.add_argument("--repeat", type=int, default=10, help="Times the trace is replayed")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the response cache, so repeated calls are priced again")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds before a call counts as failed")
+    parser.add_argument("--json", help="Also write the rows to this file")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    calls = read_trace(args.trace)
+    process = None
+    if args.url is None and args.target == "uvicorn":
+        environment = dict(os.environ, OPTION_PRICER_WARM_UP="all")
+        if args.no_cache:
+            environment["OPTION_PRICER_CACHE_SIZE"] = "0"
+        process, args.url = launch_uvicorn(args.port, args.workers, environment)
+    try:
+        seconds, results = asyncio.run(run(args, calls))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    rows = summarize(seconds, results)
+    print(f"{len(calls) * args.repeat} calls in {seconds:.2f} s, concurrency {args.concurrency}")
+    print(f"{'route':<48} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for row in rows:
+        print(f"{row['route']:<48} {row['requests']:>9} {row['errors']:>7} {row['requests_per_second']:>9.1f} "
+              f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f}")
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"seconds": seconds, "concurrency": args.concurrency, "rows": rows}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Throughput and latency of concurrent single-contract requests with and without micro-batching.
+
+Usage (from the repository root):
+    python -m benchmarks.micro_batching
+    python -m benchmarks.micro_batching --requests 2000 --concurrency 200 --windows 0 1 5
+
+Requests go through the ASGI app in process, so the numbers include routing, validation and
+serialization but no network. Engines are loaded before timing starts. Every request has its own
+spot, so none is answered from the result cache. A window of 0 prices every request alone, as the
+routes did before batching.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import warnings
+import httpx
+from src import main as app_module
+
+ROUTES = {
+    "european": ("/api/black-scholes-european-option", app_module.european_batcher,
+                 lambda i: {"S": 50 + i * 1e-4, "K": 100, "T": 1, "r": 0.05, "sigma": 0.3, "q": 0.01,
+                            "option_type": "call" if i % 2 else "put"}),
+    "implied-volatility": ("/api/implied-volatility", app_module.implied_volatility_batcher,
+                           lambda i: {"S": 100, "K": 100, "T": 1, "r": 0.05, "q": 0, "option_premium": 5 + i * 1e-4,
+                                      "option_type": "call"}),
+    "geometric-asian": ("/api/closed-form-geometric-asian-option", app_module.geometric_asian_batcher,
+                        lambda i: {"S": 50 + i * 1e-4, "K": 100, "T": 1, "r": 0.05, "sigma": 0.3, "n": 50,
+                                   "option_type": "call"}),
+}
+
+
+async def replay(route, payload, requests, concurrency, offset):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app_module.app), base_url="http://bench") as client:
+        async def send(i):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(route, json=payload(offset + i))
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(send(i) for i in range(requests)))
+        return time.perf_counter() - start, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routes", nargs="+", choices=sorted(ROUTES), default=list(ROUTES))
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100, help="Requests in flight at once")
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 1, 2, 5], help="Batch windows in milliseconds")
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    app_module.engines.warm_up()
+    print(f"{'case':<28} {'requests/s':>11} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>11}")
+    offset = 0
+    for name in args.routes:
+        route, batcher, payload = ROUTES[name]
+        for window in args.windows:
+            batcher.window, batcher.max_batch_size = window / 1000, args.max_batch_size
+            sizes = []
+            price_batch = batcher.price_batch
+            batcher.price_batch = lambda requests: sizes.append(len(requests)) or price_batch(requests)
+            try:
+                seconds, latencies = asyncio.run(replay(route, payload, args.requests, args.concurrency, offset))
+            finally:
+                batcher.price_batch = price_batch
+            offset += args.requests
+            print(f"{name + f'[{window:g} ms]':<28} {args.requests / seconds:>11.0f} "
+                  f"{1e3 * statistics.median(latencies):>8.2f} {1e3 * latencies[int(0.99 * (len(latencies) - 1))]:>8.2f} "
+                  f"{statistics.mean(sizes):>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
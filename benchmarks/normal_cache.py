@@ -0,0 +1,65 @@
+"""
+Pricing time with the normal block cache off, on a cold cache and on a warm cache.
+
+Usage (from the repository root):
+    python -m benchmarks.normal_cache
+    python -m benchmarks.normal_cache --directory /dev/shm/normals --repeat 5
+
+The cache directory defaults to a temporary one that is deleted afterwards. Prices must match
+with and without the cache; the identical column checks it.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import warnings
+from src.service.ArithmeticOption import ArithmeticOption
+from src.service.KIKOPutOption import KIKOPutOption
+from src.util.NormalBlockCache import normal_blocks
+
+ENGINES = {
+    "asian": lambda: ArithmeticOption.arithmetic_asian_option_price(100, 100, 3, 0.05, 0.3, 50, 10**6, 'call', 'geometric'),
+    "asian-sobol": lambda: ArithmeticOption.arithmetic_asian_option_price(
+        100, 100, 3, 0.05, 0.3, 50, 2**18, 'call', 'geometric', sampling='sobol'),
+    "kiko": lambda: KIKOPutOption.price_kiko_put_with_delta(100, 100, 2, 0.03, 0.2, 80, 125, 24, 1.5, M=10**6),
+}
+
+
+def timed(price, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = price()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=list(ENGINES))
+    parser.add_argument("--directory", help="Cache directory; a temporary one by default")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs of the off and warm cases; the best is reported")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    directory = args.directory or tempfile.mkdtemp(prefix="normal-blocks-")
+    os.makedirs(directory, exist_ok=True)
+    print(f"{'case':<20} {'seconds':>9} {'speedup':>8} {'identical':>10}")
+    try:
+        for engine in args.engines:
+            price = ENGINES[engine]
+            normal_blocks.directory = None
+            off, reference = timed(price, args.repeat)
+            normal_blocks.directory = directory
+            rows = [("off", off, reference), ("cold", *timed(price, 1)), ("warm", *timed(price, args.repeat))]
+            for label, seconds, result in rows:
+                print(f"{engine + '[' + label + ']':<20} {seconds:>9.3f} {off / seconds:>7.2f}x {str(repr(result) == repr(reference)):>10}")
+    finally:
+        normal_blocks.directory = None
+        if args.directory is None:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
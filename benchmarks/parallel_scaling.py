@@ -0,0 +1,59 @@
+"""
+Speedup of the Monte Carlo engines against the number of worker processes.
+
+Usage (from the repository root):
+    python -m benchmarks.parallel_scaling --workers 1 2 4 8 16 32 --repeat 3
+"""
+import argparse
+import os
+import time
+import warnings
+from src.service.ArithmeticOption import ArithmeticOption
+from src.service.KIKOPutOption import KIKOPutOption
+
+ENGINES = {
+    "asian": lambda m, workers: ArithmeticOption.arithmetic_asian_option_price(
+        100, 100, 3, 0.05, 0.3, 50, m, 'call', 'geometric', workers=workers)[0],
+    "basket": lambda m, workers: ArithmeticOption.arithemetic_mean_basket_option_price(
+        100, 100, 0.3, 0.3, 0.05, 100, 3, 0.5, m, 'call', 'geometric', workers=workers)[0],
+    "kiko": lambda m, workers: KIKOPutOption.price_kiko_put_with_delta(
+        100, 100, 2, 0.03, 0.2, 80, 125, 24, 1.5, M=m, workers=workers)[0],
+}
+
+DEFAULT_PATHS = {"asian": 400_000, "basket": 4_000_000, "kiko": 2**20}
+
+
+def default_workers():
+    cpus = os.cpu_count() or 1
+    return [2**i for i in range(cpus.bit_length()) if 2**i <= cpus]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=sorted(ENGINES))
+    parser.add_argument("--workers", nargs="+", type=int, default=default_workers())
+    parser.add_argument("--paths", type=int, help="Path budget (defaults to a per-engine size)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per point; the best is reported")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    print(f"{'engine':<8} {'workers':>7} {'paths':>9} {'seconds':>9} {'speedup':>8} {'price':>12}")
+    for engine in args.engines:
+        price_fn = ENGINES[engine]
+        m = args.paths or DEFAULT_PATHS[engine]
+        baseline = None
+        for workers in args.workers:
+            # The first call starts the process pool, which is not part of the steady-state cost.
+            price_fn(min(m, 1024), workers)
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                price = price_fn(m, workers)
+                timings.append(time.perf_counter() - start)
+            best = min(timings)
+            baseline = baseline or best
+            print(f"{engine:<8} {workers:>7} {m:>9} {best:>9.3f} {baseline / best:>8.2f} {price:>12.6f}")
+
+
+if __name__ == "__main__":
+    main()
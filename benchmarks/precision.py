@@ -0,0 +1,93 @@
+"""
+Throughput, peak memory and price deviation of the Monte Carlo engines in float32 against float64.
+
+Usage (from the repository root):
+    python -m benchmarks.precision
+    python -m benchmarks.precision --engines asian kiko --repeat 3
+
+Both precisions run with the same seed. Pseudo-random float32 normals come from a different
+generator stream, so their prices differ by sampling noise; the deviation column divides the
+price difference by the float64 standard error to show whether it stays within that noise.
+Sobol engines transform the same points in both precisions, so their deviation is rounding alone.
+"""
+import argparse
+import warnings
+import numpy as np
+from benchmarks.suite import measure
+from src.service.ArithmeticOption import ArithmeticOption
+from src.service.KIKOPutOption import KIKOPutOption
+
+PRECISIONS = ("float64", "float32")
+
+
+def asian(precision, sampling='pseudo', m=10**6):
+    return ArithmeticOption.arithmetic_asian_option_price(
+        100, 100, 3, 0.05, 0.3, 50, m, 'call', 'geometric', sampling=sampling, precision=precision)
+
+
+def mean_basket(precision, m=10**6):
+    return ArithmeticOption.arithemetic_mean_basket_option_price(
+        100, 100, 0.3, 0.3, 0.05, 100, 3, 0.5, m, 'call', 'geometric', precision=precision)
+
+
+def basket(precision, assets=10, m=10**6):
+    corr = np.full((assets, assets), 0.3)
+    np.fill_diagonal(corr, 1.0)
+    return ArithmeticOption.arithmetic_basket_option_price(
+        np.full(assets, 100.0), np.full(assets, 0.3), corr, 0.05, 100, 3, m, 'call', 'geometric', precision=precision)
+
+
+def kiko(precision, m=2**20):
+    value, _, conf_interval = KIKOPutOption.price_kiko_put_with_delta(
+        100, 100, 2, 0.03, 0.2, 80, 125, 24, 1.5, M=m, precision=precision)
+    return value, conf_interval
+
+
+# engine -> (paths per run, pricing call returning (price, confidence interval))
+ENGINES = {
+    "asian": (10**6, asian),
+    "asian-sobol": (2**17, lambda precision: asian(precision, 'sobol', 2**17)),
+    "mean-basket": (10**6, mean_basket),
+    "basket": (10**6, basket),
+    "kiko": (2**20, kiko),
+}
+
+
+def run(engines, repeat):
+    rows = []
+    for engine in engines:
+        paths, price = ENGINES[engine]
+        results = {}
+        for precision in PRECISIONS:
+            seconds, peak = measure(lambda: price(precision), repeat)
+            value, conf_interval = price(precision)
+            results[precision] = (seconds, peak, value, (conf_interval[1] - conf_interval[0]) / (2 * 1.96))
+        reference = results["float64"]
+        for precision, (seconds, peak, value, std_error) in results.items():
+            rows.append({
+                "case": f"{engine}[{precision}]",
+                "seconds": seconds,
+                "paths_per_second": paths / seconds,
+                "peak_memory_mb": peak / 2**20,
+                "price": value,
+                "speedup": reference[0] / seconds,
+                "deviation": (value - reference[2]) / reference[3],
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=list(ENGINES))
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case; the best is reported")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    print(f"{'case':<22} {'seconds':>9} {'paths/s':>10} {'peak MB':>8} {'price':>12} {'speedup':>8} {'dev/SE':>8}")
+    for row in run(args.engines, args.repeat):
+        print(f"{row['case']:<22} {row['seconds']:>9.4f} {row['paths_per_second']:>10.4g} {row['peak_memory_mb']:>8.1f} "
+              f"{row['price']:>12.6f} {row['speedup']:>7.2f}x {row['deviation']:>+8.3f}")
+
+
+if __name__ == "__main__":
+    main()
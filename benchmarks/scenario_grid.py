@@ -0,0 +1,72 @@
+"""
+Cost of a spot x vol scenario grid priced from shared paths against pricing every cell separately.
+
+Usage (from the repository root):
+    python -m benchmarks.scenario_grid
+    python -m benchmarks.scenario_grid --spots 11 --vols 7 --paths 65536
+
+Both sides use the same path count per cell; separately priced cells each get their own seed, as
+independent requests would. Every case runs twice with different seeds, and the delta noise column is
+the mean standard deviation of the finite-difference deltas between neighbouring spot cells across
+the two runs: common random numbers cancel most of the noise that independent cells put into them.
+"""
+import argparse
+import time
+import warnings
+import numpy as np
+from src.service.ArithmeticOption import ArithmeticOption
+from src.service.KIKOPutOption import KIKOPutOption
+
+
+def asian(spot_shifts, vol_shifts, m):
+    grid = lambda seed: ArithmeticOption.arithmetic_asian_option_scenarios(
+        100, 100, 3, 0.05, 0.3, 50, m, spot_shifts, vol_shifts, 'call', 'geometric', seed=seed)[0]
+    cells = lambda seed: np.array([[ArithmeticOption.arithmetic_asian_option_price(
+        100 * (1 + spot), 100, 3, 0.05, 0.3 + vol, 50, m, 'call', 'geometric', seed=seed + 1000 * i + j)[0]
+        for j, vol in enumerate(vol_shifts)] for i, spot in enumerate(spot_shifts)])
+    return grid, cells
+
+
+def kiko(spot_shifts, vol_shifts, m):
+    grid = lambda seed: KIKOPutOption.kiko_put_scenarios(100, 100, 2, 0.03, 0.2, 80, 125, 24, 1.5, spot_shifts, vol_shifts, seed=seed, M=m)[0]
+    cells = lambda seed: np.array([[KIKOPutOption.price_kiko_put_with_delta(
+        100 * (1 + spot), 100, 2, 0.03, 0.2 + vol, 80, 125, 24, 1.5, seed=seed + 1000 * i + j, M=m)[0]
+        for j, vol in enumerate(vol_shifts)] for i, spot in enumerate(spot_shifts)])
+    return grid, cells
+
+
+ENGINES = {"asian": asian, "kiko": kiko}
+
+
+def timed(price, seeds=(7405, 1)):
+    """(seconds of the first run, finite-difference delta noise across the runs) of price(seed)"""
+    start = time.perf_counter()
+    runs = [price(seeds[0])]
+    seconds = time.perf_counter() - start
+    runs += [price(seed) for seed in seeds[1:]]
+    deltas = np.array([np.diff(prices, axis=0) for prices in runs])
+    return seconds, runs[0].size, deltas.std(axis=0, ddof=1).mean()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=list(ENGINES))
+    parser.add_argument("--spots", type=int, default=9, help="Spot shocks, evenly spaced over -20%% to +20%%")
+    parser.add_argument("--vols", type=int, default=5, help="Volatility shocks, evenly spaced over -10 to +10 points")
+    parser.add_argument("--paths", type=int, default=2**16, help="Paths per cell")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    spot_shifts = np.linspace(-0.2, 0.2, args.spots)
+    vol_shifts = np.linspace(-0.1, 0.1, args.vols)
+    print(f"{'case':<16} {'seconds':>9} {'per cell ms':>12} {'speedup':>8} {'delta noise':>12}")
+    for engine in args.engines:
+        grid, cells = ENGINES[engine](spot_shifts, vol_shifts, args.paths)
+        results = {"grid": timed(grid), "per-cell": timed(cells)}
+        for label, (seconds, cells_priced, noise) in results.items():
+            print(f"{engine + '[' + label + ']':<16} {seconds:>9.3f} {1e3 * seconds / cells_priced:>12.2f} "
+                  f"{results['per-cell'][0] / seconds:>7.1f}x {noise:>12.5f}")
+
+
+if __name__ == "__main__":
+    main()
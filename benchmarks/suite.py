@@ -0,0 +1,348 @@
+"""
+Timings, throughput and peak memory of every pricing engine across parameter sweeps,
+compared against JSON baselines stored in benchmarks/baselines.
+
+Usage (from the repository root):
+    python -m benchmarks.suite                      # run and print the table
+    python -m benchmarks.suite --check              # exit 1 when a case regressed past --threshold
+    python -m benchmarks.suite --save-baseline      # overwrite the baseline with this run
+    python -m benchmarks.suite --engines asian kiko --quick
+
+Seconds are normalized by a fixed NumPy calibration workload timed in the same run, so a
+baseline recorded on one machine stays comparable on another of a different speed. The
+calibration does not cover library versions: record and check baselines on the stack pinned in
+requirements.txt (Python 3.12, NumPy 2.2.4, SciPy 1.15.2), since other NumPy and SciPy releases
+change the engines' speed and allocations on their own.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import date
+from functools import partial
+import numpy as np
+import pyarrow as pa
+import scipy
+from src.service.AmericanOption import AmericanOption
+from src.service.ArithmeticOption import ArithmeticOption
+from src.service.BlackScholes import BlackScholes
+from src.service.BulkPricer import BulkPricer
+from src.service.ClosedFormOption import ClosedFormOption
+from src.service.DiscountCurve import DiscountCurve
+from src.service.ImpliedVolatility import ImpliedVolatility
+from src.service.IRSPricer import IRSPricer
+from src.service.KIKOPutOption import KIKOPutOption
+from src.service.PriceSurface import PriceSurface
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "suite.json")
+
+
+def option_batch(size):
+    rng = np.random.default_rng(0)
+    return {
+        "S": rng.uniform(50, 150, size),
+        "K": rng.uniform(50, 150, size),
+        "T": rng.uniform(0.1, 3, size),
+        "r": rng.uniform(0.01, 0.08, size),
+        "sigma": rng.uniform(0.1, 0.6, size),
+        "q": rng.uniform(0, 0.03, size),
+        "option_type": np.where(rng.random(size) < 0.5, "call", "put"),
+    }
+
+
+def european(size):
+    batch = option_batch(size)
+    return lambda: BlackScholes.european_option_price_and_greeks(**batch)
+
+
+def implied_volatility(size):
+    batch = option_batch(size)
+    premium = BlackScholes.european_option_price_and_greeks(**batch)["price"]
+    del batch["sigma"]
+    return lambda: ImpliedVolatility.implied_volatility_batch(option_premium=premium, **batch)
+
+
+def geometric_asian(size):
+    K = np.linspace(50, 150, size)
+    return lambda: ClosedFormOption.geometric_asian_option_price(100, K, 3, 0.05, 0.3, 50, 'call')
+
+
+def geometric_basket(size):
+    K = np.linspace(50, 150, size)
+    return lambda: ClosedFormOption.geometric_basket_option_price(100, 100, 0.3, 0.3, 0.05, K, 3, 0.5, 'call')
+
+
+def american(n, strikes=1):
+    K = np.linspace(80, 120, strikes)
+    return lambda: AmericanOption.binomial_tree_american_option_prices(100, K, 1, 0.05, 0.3, n, 'put')
+
+
+def asian(m, n=50, sampling='pseudo'):
+    return lambda: ArithmeticOption.arithmetic_asian_option_price(
+        100, 100, 3, 0.05, 0.3, n, m, 'call', 'geometric', sampling=sampling)
+
+
+def mean_basket(m):
+    return lambda: ArithmeticOption.arithemetic_mean_basket_option_price(
+        100, 100, 0.3, 0.3, 0.05, 100, 3, 0.5, m, 'call', 'geometric')
+
+
+def basket(assets, m=100_000):
+    corr = np.full((assets, assets), 0.3)
+    np.fill_diagonal(corr, 1.0)
+    S, sigma = np.full(assets, 100.0), np.full(assets, 0.3)
+    return lambda: ArithmeticOption.arithmetic_basket_option_price(S, sigma, corr, 0.05, 100, 3, m, 'call', 'geometric')
+
+
+def kiko(m):
+    return lambda: KIKOPutOption.price_kiko_put_with_delta(100, 100, 2, 0.03, 0.2, 80, 125, 24, 1.5, M=m)
+
+
+def finite_difference(space_steps, strikes=1):
+    K = np.linspace(80, 120, strikes)
+    return lambda: AmericanOption.finite_difference_american_option_prices(
+        100, K, 1, 0.05, 0.3, 'put', space_steps, space_steps // 2)
+
+
+def bulk(rows, model="european"):
+    columns = option_batch(rows)
+    if model == "american":
+        # A handful of (T, r, sigma) groups, as in a book of listed options, each priced on one lattice.
+        rng = np.random.default_rng(1)
+        for name, levels in (("T", [0.25, 0.5, 1.0, 2.0]), ("r", [0.03]), ("sigma", [0.2, 0.3])):
+            columns[name] = rng.choice(levels, rows)
+        columns["n"] = np.full(rows, 200)
+        del columns["q"]
+    table = pa.table(columns)
+    return lambda: list(BulkPricer.price_batches(table.to_batches(max_chunksize=65536), model))
+
+
+def surface(quotes):
+    # Cubic interpolation needs four points per axis; the quotes stay inside the grid.
+    axes = {"moneyness": np.linspace(0.8, 1.2, 9), "T": np.array([0.25, 0.5, 0.75, 1.0]),
+            "sigma": np.array([0.2, 0.25, 0.3, 0.4]), "r": np.array([0.02, 0.03, 0.04, 0.05])}
+    american_surface = PriceSurface.build_american("put", axes, n=200)
+    rng = np.random.default_rng(0)
+    points = np.column_stack([rng.uniform(85, 115, quotes), rng.uniform(0.3, 0.9, quotes),
+                              rng.uniform(0.22, 0.38, quotes), rng.uniform(0.025, 0.045, quotes)])
+    return lambda: [american_surface.quote(S, 100.0, T, sigma, r) for S, T, sigma, r in points]
+
+
+SWAP_AS_OF = date(2025, 1, 2)
+SWAP_TENORS = ["1Y", "2Y", "3Y", "5Y", "7Y", "10Y", "15Y", "20Y", "30Y"]
+SWAP_PAR_RATES = [0.040, 0.038, 0.037, 0.036, 0.0365, 0.037, 0.038, 0.0385, 0.039]
+
+
+def swap_portfolio(trades):
+    # Maturities fall on 120 month ends, so legs repeat across trades as they do in a real book.
+    rng = np.random.default_rng(0)
+    maturities = [IRSPricer.tenor_end_date(SWAP_AS_OF, f"{months}M") for months in rng.integers(1, 121, trades) * 3]
+    return [{
+        "effective_date": SWAP_AS_OF, "maturity_date": maturity, "notional": 1e6 * (1 + i % 10),
+        "fixed_rate": 0.03 + 0.0001 * (i % 20), "float_spread": 0.0, "fixed_frequency": "12M",
+        "float_frequency": ["3M", "6M"][i % 2], "day_count_fixed": "30/360", "day_count_float": "ACT/360",
+        "business_day_convention": "Modified Following",
+    } for i, maturity in enumerate(maturities)]
+
+
+def irs(trades, risk=False):
+    portfolio = swap_portfolio(trades)
+    pillars = [IRSPricer.tenor_end_date(SWAP_AS_OF, tenor) for tenor in SWAP_TENORS]
+    times = (np.array(pillars, dtype="datetime64[D]") - np.datetime64(SWAP_AS_OF)).astype(float) / 365
+    pricer = IRSPricer(DiscountCurve(SWAP_AS_OF, pillars, np.exp(-0.037 * times)))
+    return lambda: pricer.price_portfolio(portfolio, risk=risk)
+
+
+def irs_bootstrap(trades):
+    portfolio = swap_portfolio(trades)
+
+    def run():
+        # Curves are cached by their quotes; clear the cache so every run solves the curve again.
+        IRSPricer._curves.clear()
+        curve = IRSPricer.bootstrap_curve("USD", SWAP_AS_OF, SWAP_TENORS, SWAP_PAR_RATES)
+        return IRSPricer(curve).price_portfolio(portfolio, risk=True)
+    return run
+
+
+# engine -> list of (case parameters, factory of the timed call, work units, unit name)
+# Inputs are only built when a case runs, so selecting a few engines stays cheap.
+ENGINES = {
+    "european": [({"batch": size}, partial(european, size), size, "options") for size in (10**3, 10**4, 10**5, 10**6)],
+    "implied-volatility": [({"batch": size}, partial(implied_volatility, size), size, "options") for size in (10**3, 10**4, 10**5)],
+    "geometric-asian": [({"batch": size}, partial(geometric_asian, size), size, "options") for size in (10**3, 10**4, 10**5)],
+    "geometric-basket": [({"batch": size}, partial(geometric_basket, size), size, "options") for size in (10**3, 10**4, 10**5)],
+    "american": (
+        [({"n": n, "batch": 1}, partial(american, n), n**2, "nodes") for n in (100, 500, 1000, 2000)]
+        + [({"n": 500, "batch": k}, partial(american, 500, k), k * 500**2, "nodes") for k in (10, 100)]
+    ),
+    "asian": (
+        [({"m": m, "n": 50}, partial(asian, m), m * 50, "path-steps") for m in (10**4, 10**5, 10**6)]
+        + [({"m": 10**5, "n": n}, partial(asian, 10**5, n), 10**5 * n, "path-steps") for n in (10, 200)]
+        + [({"m": m, "n": 50, "sampling": "sobol"}, partial(asian, m, sampling='sobol'), m * 50, "path-steps") for m in (2**14, 2**17)]
+    ),
+    "mean-basket": [({"m": m}, partial(mean_basket, m), m, "paths") for m in (10**4, 10**5, 10**6)],
+    "basket": [({"assets": k, "m": 10**5}, partial(basket, k), k * 10**5, "path-assets") for k in (2, 5, 10, 50)],
+    "kiko": [({"m": m, "n": 24}, partial(kiko, m), m * 24, "path-steps") for m in (2**14, 2**17, 2**20)],
+    "pde": (
+        [({"space_steps": n, "batch": 1}, partial(finite_difference, n), n**2 // 2, "nodes") for n in (200, 400, 1600)]
+        + [({"space_steps": 400, "batch": k}, partial(finite_difference, 400, k), k * 400**2 // 2, "nodes") for k in (10, 100)]
+    ),
+    "bulk": (
+        [({"model": "european", "rows": n}, partial(bulk, n), n, "options") for n in (10**4, 10**5, 10**6)]
+        + [({"model": "american", "rows": n, "n": 200}, partial(bulk, n, "american"), n, "options") for n in (10**3, 10**4)]
+    ),
+    "surface": [({"quotes": q}, partial(surface, q), q, "quotes") for q in (10**2, 10**3)],
+    "irs": (
+        [({"trades": k, "risk": risk}, partial(irs, k, risk), k, "trades") for k in (10**2, 10**3, 10**4) for risk in (False, True)]
+        + [({"trades": k, "bootstrap": True, "risk": True}, partial(irs_bootstrap, k), k, "trades") for k in (1, 10**3)]
+    ),
+}
+
+QUICK_LIMIT = 2e7
+
+
+def case_id(engine, params):
+    return engine + "[" + ",".join(f"{key}={value}" for key, value in params.items()) + "]"
+
+
+def calibrate(repeat=5):
+    """Best time of a fixed vectorized workload, used as the unit of normalized time"""
+    x = np.random.default_rng(0).standard_normal(2**20)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(10):
+            np.cumsum(np.exp(0.1 * x)).sort()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure(run, repeat):
+    # Warm up caches (Brownian bridge, correlation factors, imports) before timing.
+    run()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak
+
+
+def run_suite(engines, repeat, quick):
+    calibration = calibrate()
+    results = {}
+    for engine in engines:
+        for params, factory, units, unit in ENGINES[engine]:
+            if quick and units > QUICK_LIMIT:
+                continue
+            run = factory()
+            seconds, peak = measure(run, repeat)
+            results[case_id(engine, params)] = {
+                "seconds": seconds,
+                "normalized": seconds / calibration,
+                "throughput": units / seconds,
+                "unit": unit,
+                "peak_memory_mb": peak / 2**20,
+            }
+    return {
+        "calibration_seconds": calibration,
+        "machine": {
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+        },
+        "results": results,
+    }
+
+
+def compare(run, baseline, threshold):
+    """Regressions of normalized time or peak memory beyond threshold, as printable lines"""
+    regressions = []
+    for name, result in run["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            continue
+        for field in ("normalized", "peak_memory_mb"):
+            # Small allocations are dominated by interpreter noise rather than engine behavior.
+            if field == "peak_memory_mb" and reference[field] < 1:
+                continue
+            ratio = result[field] / reference[field]
+            if ratio > 1 + threshold:
+                regressions.append(f"{name}: {field} {reference[field]:.3f} -> {result[field]:.3f} ({ratio - 1:+.0%})")
+    return regressions
+
+
+def print_table(run, baseline=None):
+    print(f"{'case':<48} {'seconds':>9} {'throughput':>12} {'unit':<11} {'peak MB':>8} {'vs base':>8}")
+    for name, result in run["results"].items():
+        reference = (baseline or {"results": {}})["results"].get(name)
+        change = f"{result['normalized'] / reference['normalized'] - 1:+.0%}" if reference else "new"
+        print(f"{name:<48} {result['seconds']:>9.4f} {result['throughput']:>12.4g} {result['unit'] + '/s':<11} "
+              f"{result['peak_memory_mb']:>8.1f} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=list(ENGINES))
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case; the best is reported")
+    parser.add_argument("--quick", action="store_true", help=f"Skip cases larger than {QUICK_LIMIT:.0e} work units")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--output", help="Also write this run as JSON to the given file")
+    parser.add_argument("--save-baseline", action="store_true", help="Merge this run into the baseline file")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 when a case regressed")
+    parser.add_argument("--threshold", type=float, default=0.3, help="Allowed relative slowdown or memory growth")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    run = run_suite(args.engines, args.repeat, args.quick)
+    print_table(run, baseline)
+    if baseline is not None:
+        mismatched = [f"{name} {baseline['machine'][name]} -> {run['machine'][name]}"
+                      for name in ("python", "numpy", "scipy") if baseline["machine"][name] != run["machine"][name]]
+        if mismatched:
+            print(f"\nNote: the baseline was recorded on a different stack ({', '.join(mismatched)})")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(run, file, indent=2)
+
+    if args.save_baseline:
+        if baseline is not None:
+            # Keep the cases of engines that were not part of this run.
+            run["results"] = {**baseline["results"], **run["results"]}
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as file:
+            json.dump(run, file, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+
+    if args.check:
+        if baseline is None:
+            sys.exit(f"No baseline at {args.baseline}; record one with --save-baseline")
+        regressions = compare(run, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            print("\n".join(regressions))
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
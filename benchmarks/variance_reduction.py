@@ -0,0 +1,102 @@
+"""
+Price, standard error, runtime and efficiency of every variance-reduction configuration per product.
+
+Usage (from the repository root):
+    python -m benchmarks.variance_reduction
+    python -m benchmarks.variance_reduction --products asian-otm kiko --control-variate geometric
+
+Efficiency is 1 / (std_error^2 x seconds), so it does not depend on the path count; the gain column
+divides it by plain Monte Carlo on the same product. A technique pays for itself when its gain exceeds 1.
+The deviation column is the distance from the plain price in units of their combined standard error.
+"""
+import argparse
+import itertools
+import math
+import warnings
+import numpy as np
+from src.service.ArithmeticOption import ArithmeticOption
+from src.service.KIKOPutOption import KIKOPutOption
+from src.service.VarianceReduction import TECHNIQUES
+
+
+def asian(K, m=2**18):
+    return lambda techniques, control_variate: ArithmeticOption.arithmetic_asian_option_price(
+        100, K, 3, 0.05, 0.3, 50, m, 'call', control_variate, variance_reduction=techniques, efficiency=True)
+
+
+def mean_basket(K, m=2**19):
+    return lambda techniques, control_variate: ArithmeticOption.arithemetic_mean_basket_option_price(
+        100, 100, 0.3, 0.3, 0.05, K, 3, 0.5, m, 'call', control_variate, variance_reduction=techniques, efficiency=True)
+
+
+def basket(K, assets=5, m=2**18):
+    corr = np.full((assets, assets), 0.3)
+    np.fill_diagonal(corr, 1.0)
+    return lambda techniques, control_variate: ArithmeticOption.arithmetic_basket_option_price(
+        np.full(assets, 100.0), np.full(assets, 0.3), corr, 0.05, K, 3, m, 'call', control_variate,
+        variance_reduction=techniques, efficiency=True)
+
+
+def kiko(L, m=2**17):
+    # The KIKO engine has no control variate; its value, delta and interval come before the report.
+    def price(techniques, control_variate):
+        value, _, conf_interval, report = KIKOPutOption.price_kiko_put_with_delta(
+            100, 100, 2, 0.03, 0.2, L, 125, 24, 1.5, M=m, variance_reduction=techniques, efficiency=True)
+        return value, conf_interval, report
+    return price
+
+
+PRODUCTS = {
+    "asian": asian(100),
+    "asian-otm": asian(250),
+    "mean-basket": mean_basket(100),
+    "mean-basket-otm": mean_basket(250),
+    "basket": basket(100),
+    "basket-otm": basket(250),
+    "kiko": kiko(80),
+    "kiko-low-barrier": kiko(55),
+}
+
+
+def configurations():
+    """Every combination of TECHNIQUES, starting with plain Monte Carlo"""
+    return [combination for size in range(len(TECHNIQUES) + 1) for combination in itertools.combinations(TECHNIQUES, size)]
+
+
+def run(products, control_variate):
+    rows = []
+    for product in products:
+        price = PRODUCTS[product]
+        reference = None
+        for techniques in configurations():
+            value, _, report = price(techniques, control_variate)
+            reference = reference or (value, report)
+            combined_error = math.hypot(report["std_error"], reference[1]["std_error"])
+            rows.append({
+                "case": f"{product}[{'+'.join(techniques) or 'plain'}]",
+                "price": value,
+                "std_error": report["std_error"],
+                "seconds": report["seconds"],
+                "efficiency": report["efficiency"],
+                "gain": report["efficiency"] / reference[1]["efficiency"],
+                "deviation": (value - reference[0]) / combined_error if combined_error > 0 else 0.0,
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", nargs="+", choices=sorted(PRODUCTS), default=list(PRODUCTS))
+    parser.add_argument("--control-variate", choices=("none", "geometric"), default="none",
+                        help="Control variate of the arithmetic engines, applied on top of every configuration")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    print(f"{'case':<64} {'price':>12} {'std error':>10} {'seconds':>8} {'efficiency':>11} {'gain':>8} {'dev/SE':>7}")
+    for row in run(args.products, args.control_variate):
+        print(f"{row['case']:<64} {row['price']:>12.6g} {row['std_error']:>10.3g} {row['seconds']:>8.3f} "
+              f"{row['efficiency']:>11.4g} {row['gain']:>7.2f}x {row['deviation']:>+7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal
+
+class AmericanOptionBatchRequest(BaseModel):
+    S: float = Field(..., gt=0, description="Current price of the underlying asset")
+    K: List[float] = Field(..., min_length=1, description="Strike prices of the options")
+    T: float = Field(..., gt=0, description="Time to expiration in years")
+    r: float = Field(..., gt=0, description="Risk-free interest rate")
+    sigma: float = Field(..., gt=0, description="Volatility")
+    n: int = Field(..., gt=0, description="Number of time steps")
+    option_type: List[Literal["call", "put"]] = Field(..., min_length=1, description="Types of option")
+    extrapolation: Literal["none", "bbsr"] = Field("none", description="Extrapolation method to accelerate convergence: 'bbsr' smooths the last step with Black-Scholes and extrapolates from n and n / 2 steps")
+
+    @model_validator(mode="after")
+    def check_columns(self):
+        if len(self.K) != len(self.option_type):
+            raise ValueError("K and option_type must have the same length")
+        if any(value <= 0 for value in self.K):
+            raise ValueError("All values of K must be greater than 0")
+        return self
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal
+
+class AmericanOptionFiniteDifferenceBatchRequest(BaseModel):
+    S: float = Field(..., gt=0, description="Current price of the underlying asset")
+    K: List[float] = Field(..., min_length=1, description="Strike prices of the options, priced on one shared grid")
+    T: float = Field(..., gt=0, description="Time to expiration in years")
+    r: float = Field(..., gt=0, description="Risk-free interest rate")
+    sigma: float = Field(..., gt=0, description="Volatility")
+    option_type: List[Literal["call", "put"]] = Field(..., min_length=1, description="Types of option")
+    space_steps: int = Field(400, ge=4, description="Minimum number of log-spot grid intervals; more are used when the drift dominates the volatility")
+    time_steps: int = Field(200, ge=2, description="Number of time steps")
+
+    @model_validator(mode="after")
+    def check_columns(self):
+        if len(self.K) != len(self.option_type):
+            raise ValueError("K and option_type must have the same length")
+        if any(value <= 0 for value in self.K):
+            raise ValueError("All values of K must be greater than 0")
+        return self
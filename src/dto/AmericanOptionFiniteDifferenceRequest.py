@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import Literal
+
+class AmericanOptionFiniteDifferenceRequest(BaseModel):
+    S: float = Field(..., gt=0, description="Current price of the underlying asset")
+    K: float = Field(..., gt=0, description="Strike price of the option")
+    T: float = Field(..., gt=0, description="Time to expiration in years")
+    r: float = Field(..., gt=0, description="Risk-free interest rate")
+    sigma: float = Field(..., gt=0, description="Volatility")
+    option_type: Literal["call", "put"] = Field(..., description="Type of option")
+    space_steps: int = Field(400, ge=4, description="Minimum number of log-spot grid intervals; more are used when the drift dominates the volatility")
+    time_steps: int = Field(200, ge=2, description="Number of time steps")
@@ -9,3 +9,4 @@ class AmericanOptionRequest(BaseModel):
     sigma: float = Field(..., gt=0, description="Volatility")
     n: int = Field(..., gt=0, description="Number of time steps")
     option_type: Literal["call", "put"] = Field(..., description="Type of option")
+    extrapolation: Literal["none", "bbsr"] = Field("none", description="Extrapolation method to accelerate convergence: 'bbsr' smooths the last step with Black-Scholes and extrapolates from n and n / 2 steps")
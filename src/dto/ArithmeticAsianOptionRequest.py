@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import Literal
+import os
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal
 
 class ArithmeticAsianOptionRequest(BaseModel):
     S: float = Field(..., gt=0, description="Current price of the underlying asset")
@@ -11,4 +12,18 @@ class ArithmeticAsianOptionRequest(BaseModel):
     m: int = Field(..., gt=0, description="Number of simulations (paths)")
     option_type: Literal["call", "put"] = Field(..., description="Type of option")
     control_variate: Literal['none', 'geometric'] = Field(..., description="Control variate method to use")
-    
\ No newline at end of file
+    seed: int = Field(7405, ge=0, description="Random seed of the simulation")
+    workers: int = Field(1, ge=1, le=os.cpu_count() or 1, description="Number of worker processes sharing the paths, at most the number of CPUs")
+    sampling: Literal["pseudo", "sobol"] = Field("pseudo", description="Pseudo-random sampling, or scrambled Sobol sampling with randomized replicates")
+    replicates: int = Field(16, ge=2, le=1024, description="Number of independently scrambled replicates used for the Sobol confidence interval, or of independent batches for pseudo-random sampling with moment matching")
+    greeks: bool = Field(False, description="Also estimate delta, gamma and vega with standard errors from the same paths")
+    precision: Literal["float64", "float32"] = Field("float64", description="Working precision of the normals and paths; payoff statistics always accumulate in float64")
+    variance_reduction: List[Literal["antithetic", "moment_matching", "importance_sampling"]] = Field([], description="Variance reduction techniques to combine: antithetic variates, moment matching of the normals, and a drift shift towards the strike or barrier weighted by the likelihood ratio")
+
+    @model_validator(mode="after")
+    def check_replicates(self):
+        if self.sampling == "sobol" and self.m < 2 * self.replicates:
+            raise ValueError("m must be at least 2 * replicates, so every Sobol replicate has two paths")
+        if "moment_matching" in self.variance_reduction and self.m < 2 * self.replicates:
+            raise ValueError("m must be at least 2 * replicates, so every moment-matched batch has two paths")
+        return self
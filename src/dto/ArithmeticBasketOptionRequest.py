@@ -0,0 +1,47 @@
+import os
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
+
+class ArithmeticBasketOptionRequest(BaseModel):
+    S: List[float] = Field(..., min_length=1, description="Current prices of the underlying assets")
+    sigma: List[float] = Field(..., min_length=1, description="Volatilities of the underlying assets")
+    corr: List[List[float]] = Field(..., description="Correlation matrix of the underlying assets")
+    weights: Optional[List[float]] = Field(None, description="Basket weights (equal weights if omitted)")
+    r: float = Field(..., gt=0, description="Risk-free interest rate")
+    K: float = Field(..., gt=0, description="Strike price of the option")
+    T: float = Field(..., gt=0, description="Time to expiration in years")
+    m: int = Field(..., gt=0, description="Number of simulations (paths)")
+    option_type: Literal["call", "put"] = Field(..., description="Type of option")
+    control_variate: Literal['none', 'geometric'] = Field(..., description="Control variate method to use")
+    seed: int = Field(7405, ge=0, description="Random seed of the simulation")
+    workers: int = Field(1, ge=1, le=os.cpu_count() or 1, description="Number of worker processes sharing the paths, at most the number of CPUs")
+    sampling: Literal["pseudo", "sobol"] = Field("pseudo", description="Pseudo-random sampling, or scrambled Sobol sampling with randomized replicates")
+    replicates: int = Field(16, ge=2, le=1024, description="Number of independently scrambled replicates used for the Sobol confidence interval, or of independent batches for pseudo-random sampling with moment matching")
+    greeks: bool = Field(False, description="Also estimate per-asset delta, gamma and vega with standard errors from the same paths")
+    precision: Literal["float64", "float32"] = Field("float64", description="Working precision of the normals and paths; payoff statistics always accumulate in float64")
+    variance_reduction: List[Literal["antithetic", "moment_matching", "importance_sampling"]] = Field([], description="Variance reduction techniques to combine: antithetic variates, moment matching of the normals, and a drift shift towards the strike or barrier weighted by the likelihood ratio")
+
+    @model_validator(mode="after")
+    def check_assets(self):
+        N = len(self.S)
+        if len(self.sigma) != N or (self.weights is not None and len(self.weights) != N):
+            raise ValueError("S, sigma and weights must have one entry per asset")
+        if any(value <= 0 for value in self.S + self.sigma + (self.weights or [])):
+            raise ValueError("All values of S, sigma and weights must be greater than 0")
+        if len(self.corr) != N or any(len(row) != N for row in self.corr):
+            raise ValueError("corr must be an N x N matrix for N assets")
+        for i in range(N):
+            if abs(self.corr[i][i] - 1) > 1e-12:
+                raise ValueError("corr must have a unit diagonal")
+            for j in range(i):
+                if abs(self.corr[i][j] - self.corr[j][i]) > 1e-12 or abs(self.corr[i][j]) > 1:
+                    raise ValueError("corr must be symmetric with entries between -1 and 1")
+        return self
+
+    @model_validator(mode="after")
+    def check_replicates(self):
+        if self.sampling == "sobol" and self.m < 2 * self.replicates:
+            raise ValueError("m must be at least 2 * replicates, so every Sobol replicate has two paths")
+        if "moment_matching" in self.variance_reduction and self.m < 2 * self.replicates:
+            raise ValueError("m must be at least 2 * replicates, so every moment-matched batch has two paths")
+        return self
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
+from datetime import date
+from .IRSRequest import IRSRequest
+
+class IRSBatchRequest(BaseModel):
+    valuation_date: date = Field(..., description="Valuation date of the curve and the portfolio")
+    curve_dates: Optional[List[date]] = Field(None, min_length=1, description="Pillar dates of the discount curve")
+    discount_factors: Optional[List[float]] = Field(None, min_length=1, description="Discount factors at the pillar dates")
+    par_tenors: Optional[List[str]] = Field(None, min_length=1, description="Tenors of par swap quotes to bootstrap the curve from, e.g. 1Y, 5Y")
+    par_rates: Optional[List[float]] = Field(None, min_length=1, description="Par swap rates for the tenors")
+    curve_fixed_frequency: Literal["1M", "3M", "6M", "12M"] = Field("12M", description="Fixed leg payment frequency of the quoted swaps")
+    curve_day_count: Literal["30/360", "ACT/360", "ACT/365"] = Field("30/360", description="Fixed leg day count convention of the quoted swaps")
+    risk: bool = Field(False, description="Also return DV01 and key-rate deltas per 1bp")
+    trades: List[IRSRequest] = Field(..., min_length=1, description="Pay-fixed swaps to price")
+
+    @model_validator(mode="after")
+    def check_curve(self):
+        has_discount_factors = self.curve_dates is not None or self.discount_factors is not None
+        has_par_quotes = self.par_tenors is not None or self.par_rates is not None
+        if has_discount_factors == has_par_quotes:
+            raise ValueError("Provide either curve_dates and discount_factors, or par_tenors and par_rates")
+        if has_discount_factors:
+            if self.curve_dates is None or self.discount_factors is None or len(self.curve_dates) != len(self.discount_factors):
+                raise ValueError("curve_dates and discount_factors must have the same length")
+            if any(value <= 0 for value in self.discount_factors):
+                raise ValueError("All discount factors must be greater than 0")
+            if any(curve_date <= self.valuation_date for curve_date in self.curve_dates):
+                raise ValueError("All curve dates must be after the valuation date")
+        elif self.par_tenors is None or self.par_rates is None or len(self.par_tenors) != len(self.par_rates):
+            raise ValueError("par_tenors and par_rates must have the same length")
+        if len({trade.currency for trade in self.trades}) != 1:
+            raise ValueError("All trades must be in the currency of the curve")
+        return self
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal
+
+class ImpliedVolatilityBatchRequest(BaseModel):
+    S: List[float] = Field(..., min_length=1, description="Current prices of the underlying assets")
+    K: List[float] = Field(..., min_length=1, description="Strike prices of the options")
+    T: List[float] = Field(..., min_length=1, description="Times to expiration in years")
+    r: List[float] = Field(..., min_length=1, description="Risk-free interest rates")
+    option_premium: List[float] = Field(..., min_length=1, description="Option premiums")
+    q: List[float] = Field(..., min_length=1, description="Repo rates")
+    option_type: List[Literal["call", "put"]] = Field(..., min_length=1, description="Types of option")
+
+    @model_validator(mode="after")
+    def check_columns(self):
+        columns = {name: getattr(self, name) for name in ("S", "K", "T", "r", "option_premium", "q", "option_type")}
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError("All columns must have the same length")
+        for name in ("S", "K", "option_premium"):
+            if any(value <= 0 for value in columns[name]):
+                raise ValueError(f"All values of {name} must be greater than 0")
+        for name in ("T", "r", "q"):
+            if any(value < 0 for value in columns[name]):
+                raise ValueError(f"All values of {name} must be greater than or equal to 0")
+        return self
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import Literal
+
+class JobRequest(BaseModel):
+    kind: Literal[
+        "monte-carlo-arithmetic-asian-option",
+        "monte-carlo-arithmetic-mean-basket-option",
+        "monte-carlo-arithmetic-basket-option",
+        "quasi-monte-carlo-kiko-put-option"
+    ] = Field(..., description="Pricing endpoint to run as a background job")
+    request: dict = Field(..., description="Request body of the pricing endpoint")
@@ -1,4 +1,6 @@
+import os
 from pydantic import BaseModel, Field
+from typing import List, Literal
 
 class KIKOPutOptionRequest(BaseModel):
     S: float = Field(..., gt=0, description="Current price of the underlying asset")
@@ -10,4 +12,9 @@ class KIKOPutOptionRequest(BaseModel):
     U: float = Field(..., gt=0, description="Upper barrier")
     n: int = Field(..., gt=0, description="Number of time steps")
     R: float = Field(..., ge=0, description="Rebate amount")
-    
\ No newline at end of file
+    M: int = Field(int(1e6), gt=0, description="Number of quasi-Monte Carlo paths")
+    seed: int = Field(7405, ge=0, description="Random seed of the simulation")
+    workers: int = Field(1, ge=1, le=os.cpu_count() or 1, description="Number of worker processes sharing the paths, at most the number of CPUs")
+    greeks: bool = Field(False, description="Also estimate delta, gamma and vega with standard errors from the same paths")
+    precision: Literal["float64", "float32"] = Field("float64", description="Working precision of the normals and paths; payoff statistics always accumulate in float64")
+    variance_reduction: List[Literal["antithetic", "moment_matching", "importance_sampling"]] = Field([], description="Variance reduction techniques to combine: antithetic variates, moment matching of the normals, and a drift shift towards the strike or barrier weighted by the likelihood ratio")
@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List
+from .KIKOPutOptionRequest import KIKOPutOptionRequest
+
+class KIKOPutOptionScenarioRequest(BaseModel):
+    base: KIKOPutOptionRequest = Field(..., description="Unshocked option and simulation settings")
+    spot_shifts: List[float] = Field(..., min_length=1, max_length=101, description="Relative spot shocks, e.g. -0.1 for a 10% fall")
+    vol_shifts: List[float] = Field(..., min_length=1, max_length=101, description="Absolute volatility shocks, e.g. 0.05 for 5 volatility points up")
+
+    @model_validator(mode="after")
+    def check_shifts(self):
+        if any(shift <= -1 for shift in self.spot_shifts):
+            raise ValueError("All spot_shifts must be greater than -1")
+        if any(self.base.sigma + shift <= 0 for shift in self.vol_shifts):
+            raise ValueError("All shocked volatilities sigma + vol_shift must be greater than 0")
+        return self
@@ -1,28 +1,142 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
 from fastapi.staticfiles import StaticFiles
 import numpy as np
+import logging
 import math
+import os
+import time
+from contextlib import asynccontextmanager
 from .dto.EuropeanOptionRequest import EuropeanOptionRequest
+from .dto.EuropeanOptionBatchRequest import EuropeanOptionBatchRequest
 from .dto.ImpliedVolatilityRequest import ImpliedVolatilityRequest
+from .dto.ImpliedVolatilityBatchRequest import ImpliedVolatilityBatchRequest
 from .dto.GeometricAsianOptionRequest import GeometricAsianOptionRequest
 from .dto.GeometricBasketOptionRequest import GeometricBasketOptionRequest
 from .dto.ArithmeticAsianOptionRequest import ArithmeticAsianOptionRequest
 from .dto.ArithmeticMeanBasketOptionRequest import ArithmeticMeanBasketOptionRequest
+from .dto.ArithmeticBasketOptionRequest import ArithmeticBasketOptionRequest
 from .dto.AmericanOptionRequest import AmericanOptionRequest
+from .dto.AmericanOptionBatchRequest import AmericanOptionBatchRequest
+from .dto.AmericanOptionFiniteDifferenceRequest import AmericanOptionFiniteDifferenceRequest
+from .dto.AmericanOptionFiniteDifferenceBatchRequest import AmericanOptionFiniteDifferenceBatchRequest
 from .dto.KIKOPutOptionRequest import KIKOPutOptionRequest
-from .service.BlackScholes import BlackScholes
-from .service.ImpliedVolatility import ImpliedVolatility
-from .service.ClosedFormOption import ClosedFormOption
-from .service.ArithmeticOption import ArithmeticOption
-from .service.AmericanOption import AmericanOption
-from .service.KIKOPutOption import KIKOPutOption
+from .dto.ArithmeticAsianOptionScenarioRequest import ArithmeticAsianOptionScenarioRequest
+from .dto.KIKOPutOptionScenarioRequest import KIKOPutOptionScenarioRequest
+from .dto.JobRequest import JobRequest
+from .dto.IRSBatchRequest import IRSBatchRequest
+from .util.ResultCache import ResultCache
+from .util.JobManager import JobManager
+from .util.LazyEngines import LazyEngines
+from .util.MicroBatcher import MicroBatcher
+from .util.Metrics import metrics
 from fastapi.middleware.cors import CORSMiddleware
 
 def is_valid_float(value):
     return isinstance(value, float) and not math.isnan(value) and not np.isnan(value)
 
+def to_valid_list(values):
+    values = np.asarray(values, dtype=float)
+    return [value if math.isfinite(value) else "NaN" for value in values.tolist()]
 
-app = FastAPI()
+def to_valid_greeks(greeks):
+    def to_valid(value):
+        return to_valid_list(value) if np.ndim(value) else to_valid_list([value])[0]
+    return {name: {"value": to_valid(value), "std_error": to_valid(std_error)} for name, (value, std_error) in greeks.items()}
+
+def to_valid_grid(values):
+    values = np.asarray(values, dtype=float)
+    return to_valid_list(values) if values.ndim <= 1 else [to_valid_grid(row) for row in values]
+
+def scenario_response(request, spots, sigmas, prices, std_errors, conf_intervals):
+    return {
+        "spot": to_valid_list(spots),
+        "sigma": to_valid_list(sigmas),
+        "price": to_valid_grid(prices),
+        "std_error": to_valid_grid(std_errors),
+        "confident_interval": to_valid_grid(conf_intervals),
+        "input": request.dict()
+    }
+
+def request_columns(requests, fields):
+    return {field: np.array([getattr(request, field) for request in requests]) for field in fields}
+
+def price_by_option_type(price, requests, fields):
+    """Prices of single-contract requests from the scalar formula price(*fields, option_type), vectorized per option type"""
+    columns = request_columns(requests, fields)
+    option_types = np.array([request.option_type for request in requests])
+    prices = np.empty(len(requests))
+    for option_type in ("call", "put"):
+        rows = option_types == option_type
+        if rows.any():
+            prices[rows] = price(*(column[rows] for column in columns.values()), option_type)
+    return prices.tolist()
+
+def to_valid_report(report):
+    return {name: value if isinstance(value, int) else to_valid_list([value])[0] for name, value in report.items()}
+
+
+logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logging.getLogger("src.service").setLevel(os.environ.get("OPTION_PRICER_LOG_LEVEL", "WARNING").upper())
+
+# Engines and their SciPy/PyArrow dependencies are imported on first use rather than at startup,
+# which keeps cold starts short for requests that only touch one engine.
+engines = LazyEngines(package=__package__)
+BlackScholes = engines.module("BlackScholes", ".service.BlackScholes")
+ImpliedVolatility = engines.module("ImpliedVolatility", ".service.ImpliedVolatility")
+ClosedFormOption = engines.module("ClosedFormOption", ".service.ClosedFormOption")
+ArithmeticOption = engines.module("ArithmeticOption", ".service.ArithmeticOption")
+AmericanOption = engines.module("AmericanOption", ".service.AmericanOption")
+KIKOPutOption = engines.module("KIKOPutOption", ".service.KIKOPutOption")
+PriceSurfaceStore = engines.module("PriceSurfaceStore", ".service.PriceSurface")
+DiscountCurve = engines.module("DiscountCurve", ".service.DiscountCurve")
+IRSPricer = engines.module("IRSPricer", ".service.IRSPricer")
+BulkPricer = engines.module("BulkPricer", ".service.BulkPricer")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # OPTION_PRICER_WARM_UP="all" or a comma-separated list of engines loads them before serving.
+    warm_up = os.environ.get("OPTION_PRICER_WARM_UP", "").strip()
+    if warm_up:
+        engines.warm_up(None if warm_up == "all" else [name.strip() for name in warm_up.split(",")])
+    yield
+
+app = FastAPI(lifespan=lifespan)
+
+result_cache = ResultCache(
+    maxsize=int(os.environ.get("OPTION_PRICER_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("OPTION_PRICER_CACHE_TTL", 300))
+)
+
+surface_store = engines.register(
+    "surfaces", lambda: PriceSurfaceStore.load_directory(os.environ.get("OPTION_PRICER_SURFACE_DIR", "src/surfaces"))
+)
+surface_tolerance = float(os.environ.get("OPTION_PRICER_SURFACE_TOLERANCE", 1e-3))
+
+# Concurrent single-contract requests arriving within the window are priced in one vectorized call.
+batch_window = float(os.environ.get("OPTION_PRICER_BATCH_WINDOW_MS", 2)) / 1000
+batch_max_size = int(os.environ.get("OPTION_PRICER_BATCH_MAX_SIZE", 256))
+european_batcher = MicroBatcher(
+    "european",
+    lambda requests: price_by_option_type(BlackScholes.european_option_price, requests, ("S", "K", "T", "r", "sigma", "q")),
+    batch_window, batch_max_size
+)
+implied_volatility_batcher = MicroBatcher(
+    "implied_volatility",
+    lambda requests: ImpliedVolatility.implied_volatility_batch(
+        **request_columns(requests, ("S", "K", "T", "r", "q", "option_premium", "option_type"))
+    )[0].tolist(),
+    batch_window, batch_max_size
+)
+geometric_asian_batcher = MicroBatcher(
+    "geometric_asian",
+    lambda requests: price_by_option_type(ClosedFormOption.geometric_asian_option_price, requests, ("S", "K", "T", "r", "sigma", "n")),
+    batch_window, batch_max_size
+)
+
+job_manager = JobManager(max_workers=int(os.environ.get("OPTION_PRICER_JOB_WORKERS", 2)))
 
 app.add_middleware(
     CORSMiddleware,
@@ -32,12 +146,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template rather than raw path so /api/jobs/{job_id} stays one series.
+        route = request.scope.get("route")
+        labels = {"method": request.method, "route": route.path if route is not None else "unmatched", "status": status}
+        metrics.observe("http_request_duration_seconds", time.perf_counter() - start, **labels)
+        metrics.inc("http_requests_total", **labels)
+        if status >= 400:
+            metrics.inc("http_request_errors_total", **labels)
+
 api_router = APIRouter(prefix="/api")
 
 @api_router.post("/black-scholes-european-option")
-def calculate_black_scholes_european_option(request: EuropeanOptionRequest):
+@result_cache.cached
+async def calculate_black_scholes_european_option(request: EuropeanOptionRequest):
+    try:
+        price = await european_batcher.submit(request)
+
+        return {"price": price, "input": request.dict()}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.post("/black-scholes-european-option-batch")
+@result_cache.cached
+def calculate_black_scholes_european_option_batch(request: EuropeanOptionBatchRequest):
     try:
-        price = BlackScholes.european_option_price(
+        results = BlackScholes.european_option_price_and_greeks(
             request.S,
             request.K,
             request.T,
@@ -47,22 +189,15 @@ def calculate_black_scholes_european_option(request: EuropeanOptionRequest):
             request.option_type
         )
 
-        return {"price": price, "input": request.dict()}
+        return {name: to_valid_list(values) for name, values in results.items()}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @api_router.post("/implied-volatility")
-def calculate_implied_volatility(request: ImpliedVolatilityRequest):
+@result_cache.cached
+async def calculate_implied_volatility(request: ImpliedVolatilityRequest):
     try:
-        implied_volatility = ImpliedVolatility.implied_volatility(
-            request.S,
-            request.K,
-            request.T,
-            request.r,
-            request.q,
-            request.option_premium,
-            request.option_type
-        )
+        implied_volatility = await implied_volatility_batcher.submit(request)
 
         if is_valid_float(implied_volatility):
             return {"implied_volatility": implied_volatility, "input": request.dict()}
@@ -70,20 +205,35 @@ def calculate_implied_volatility(request: ImpliedVolatilityRequest):
             return {"implied_volatility": "NaN", "input": request.dict()}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
-    
-@api_router.post("/closed-form-geometric-asian-option")
-def calculate_closed_form_geometric_asian_option(request: GeometricAsianOptionRequest):
+
+@api_router.post("/implied-volatility-batch")
+@result_cache.cached
+def calculate_implied_volatility_batch(request: ImpliedVolatilityBatchRequest):
     try:
-        price = ClosedFormOption.geometric_asian_option_price(
+        implied_volatility, iterations, converged = ImpliedVolatility.implied_volatility_batch(
             request.S,
             request.K,
             request.T,
             request.r,
-            request.sigma,
-            request.n,
+            request.q,
+            request.option_premium,
             request.option_type
         )
 
+        return {
+            "implied_volatility": to_valid_list(implied_volatility),
+            "iterations": iterations.tolist(),
+            "converged": converged.tolist()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+@api_router.post("/closed-form-geometric-asian-option")
+@result_cache.cached
+async def calculate_closed_form_geometric_asian_option(request: GeometricAsianOptionRequest):
+    try:
+        price = await geometric_asian_batcher.submit(request)
+
         if is_valid_float(price):
             return {"price": price, "input": request.dict()}
         else:
@@ -92,6 +242,7 @@ def calculate_closed_form_geometric_asian_option(request: GeometricAsianOptionRe
         raise HTTPException(status_code=400, detail=str(e))
 
 @api_router.post("/closed-form-geometric-basket-option")
+@result_cache.cached
 def calculate_closed_form_geometric_basket_option(request: GeometricBasketOptionRequest):
     try:
         price = ClosedFormOption.geometric_basket_option_price(
@@ -113,94 +264,445 @@ def calculate_closed_form_geometric_basket_option(request: GeometricBasketOption
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def price_monte_carlo_arithmetic_asian_option(request: ArithmeticAsianOptionRequest, progress=None):
+    results = ArithmeticOption.arithmetic_asian_option_price(
+        request.S,
+        request.K,
+        request.T,
+        request.r,
+        request.sigma,
+        request.n,
+        request.m,
+        request.option_type,
+        request.control_variate,
+        seed=request.seed,
+        workers=request.workers,
+        sampling=request.sampling,
+        replicates=request.replicates,
+        progress=progress,
+        greeks=request.greeks,
+        precision=request.precision,
+        variance_reduction=request.variance_reduction,
+        efficiency=True
+    )
+    price, confident_interval = results[:2]
+
+    if is_valid_float(price) and is_valid_float(confident_interval[0]) and is_valid_float(confident_interval[1]):
+        response = {"price": price, "confident_interval": confident_interval, "input": request.dict()}
+    else:
+        response = {"price": "NaN", "confident_interval": ("NaN", "NaN"), "input": request.dict()}
+    if request.greeks:
+        response["greeks"] = to_valid_greeks(results[2])
+    response["efficiency"] = to_valid_report(results[-1])
+    return response
+
 @api_router.post("/monte-carlo-arithmetic-asian-option")
+@result_cache.cached
 def calculate_monte_carlo_arithmetic_asian_option(request: ArithmeticAsianOptionRequest):
     try:
-        price, confident_interval = ArithmeticOption.arithmetic_asian_option_price(
+        return price_monte_carlo_arithmetic_asian_option(request)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def price_monte_carlo_arithmetic_mean_basket_option(request: ArithmeticMeanBasketOptionRequest, progress=None):
+    results = ArithmeticOption.arithemetic_mean_basket_option_price(
+        request.S1,
+        request.S2,
+        request.sigma1,
+        request.sigma2,
+        request.r,
+        request.K,
+        request.T,
+        request.rho,
+        request.m,
+        request.option_type,
+        request.control_variate,
+        seed=request.seed,
+        workers=request.workers,
+        sampling=request.sampling,
+        replicates=request.replicates,
+        progress=progress,
+        greeks=request.greeks,
+        precision=request.precision,
+        variance_reduction=request.variance_reduction,
+        efficiency=True
+    )
+    price, confident_interval = results[:2]
+
+    if is_valid_float(price) and is_valid_float(confident_interval[0]) and is_valid_float(confident_interval[1]):
+        response = {"price": price, "confident_interval": confident_interval, "input": request.dict()}
+    else:
+        response = {"price": "NaN", "confident_interval": ("NaN", "NaN"), "input": request.dict()}
+    if request.greeks:
+        response["greeks"] = to_valid_greeks(results[2])
+    response["efficiency"] = to_valid_report(results[-1])
+    return response
+
+@api_router.post("/monte-carlo-arithmetic-mean-basket-option")
+@result_cache.cached
+def calculate_monte_carlo_arithmetic_mean_basket_option(request: ArithmeticMeanBasketOptionRequest):
+    try:
+        return price_monte_carlo_arithmetic_mean_basket_option(request)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def price_monte_carlo_arithmetic_basket_option(request: ArithmeticBasketOptionRequest, progress=None):
+    results = ArithmeticOption.arithmetic_basket_option_price(
+        request.S,
+        request.sigma,
+        request.corr,
+        request.r,
+        request.K,
+        request.T,
+        request.m,
+        request.option_type,
+        request.control_variate,
+        weights=request.weights,
+        seed=request.seed,
+        workers=request.workers,
+        sampling=request.sampling,
+        replicates=request.replicates,
+        progress=progress,
+        greeks=request.greeks,
+        precision=request.precision,
+        variance_reduction=request.variance_reduction,
+        efficiency=True
+    )
+    price, confident_interval = results[:2]
+
+    if is_valid_float(price) and is_valid_float(confident_interval[0]) and is_valid_float(confident_interval[1]):
+        response = {"price": price, "confident_interval": confident_interval, "input": request.dict()}
+    else:
+        response = {"price": "NaN", "confident_interval": ("NaN", "NaN"), "input": request.dict()}
+    if request.greeks:
+        response["greeks"] = to_valid_greeks(results[2])
+    response["efficiency"] = to_valid_report(results[-1])
+    return response
+
+@api_router.post("/monte-carlo-arithmetic-basket-option")
+@result_cache.cached
+def calculate_monte_carlo_arithmetic_basket_option(request: ArithmeticBasketOptionRequest):
+    try:
+        return price_monte_carlo_arithmetic_basket_option(request)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+def price_quasi_monte_carlo_kiko_put_option(request: KIKOPutOptionRequest, progress=None):
+    results = KIKOPutOption.price_kiko_put_with_delta(
+        request.S,
+        request.K,
+        request.T,
+        request.r,
+        request.sigma,
+        request.L,
+        request.U,
+        request.n,
+        request.R,
+        seed=request.seed,
+        M=request.M,
+        workers=request.workers,
+        progress=progress,
+        greeks=request.greeks,
+        precision=request.precision,
+        variance_reduction=request.variance_reduction,
+        efficiency=True
+    )
+    price, delta, confident_interval = results[:3]
+
+    if is_valid_float(price) and is_valid_float(delta) and is_valid_float(confident_interval[0]) and is_valid_float(confident_interval[1]):
+        response = {"price": price, "delta": delta, "confident_interval": confident_interval, "input": request.dict()}
+    else:
+        response = {"price": "NaN", "delta": "NaN", "confident_interval": ("NaN", "NaN"), "input": request.dict()}
+    if request.greeks:
+        response["greeks"] = to_valid_greeks(results[3])
+    response["efficiency"] = to_valid_report(results[-1])
+    return response
+
+@api_router.post("/quasi-monte-carlo-kiko-put-option")
+@result_cache.cached
+def calculate_quasi_monte_carlo_kiko_put_option(request: KIKOPutOptionRequest):
+    try:
+        return price_quasi_monte_carlo_kiko_put_option(request)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.post("/scenario-arithmetic-asian-option")
+@result_cache.cached
+def calculate_scenario_arithmetic_asian_option(request: ArithmeticAsianOptionScenarioRequest):
+    try:
+        base = request.base
+        prices, std_errors, conf_intervals = ArithmeticOption.arithmetic_asian_option_scenarios(
+            base.S,
+            base.K,
+            base.T,
+            base.r,
+            base.sigma,
+            base.n,
+            base.m,
+            request.spot_shifts,
+            request.vol_shifts,
+            base.option_type,
+            base.control_variate,
+            seed=base.seed,
+            workers=base.workers,
+            sampling=base.sampling,
+            replicates=base.replicates,
+            precision=base.precision,
+            variance_reduction=base.variance_reduction
+        )
+        spots = [base.S * (1 + shift) for shift in request.spot_shifts]
+        sigmas = [base.sigma + shift for shift in request.vol_shifts]
+        return scenario_response(request, spots, sigmas, prices, std_errors, conf_intervals)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.post("/scenario-kiko-put-option")
+@result_cache.cached
+def calculate_scenario_kiko_put_option(request: KIKOPutOptionScenarioRequest):
+    try:
+        base = request.base
+        prices, std_errors, conf_intervals = KIKOPutOption.kiko_put_scenarios(
+            base.S,
+            base.K,
+            base.T,
+            base.r,
+            base.sigma,
+            base.L,
+            base.U,
+            base.n,
+            base.R,
+            request.spot_shifts,
+            request.vol_shifts,
+            seed=base.seed,
+            M=base.M,
+            workers=base.workers,
+            precision=base.precision,
+            variance_reduction=base.variance_reduction
+        )
+        spots = [base.S * (1 + shift) for shift in request.spot_shifts]
+        sigmas = [base.sigma + shift for shift in request.vol_shifts]
+        return scenario_response(request, spots, sigmas, prices, std_errors, conf_intervals)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.post("/binomial-tree-american-option")
+@result_cache.cached
+def calculate_binomial_tree_american_option(request: AmericanOptionRequest):
+    try:
+        price = AmericanOption.binomial_tree_american_option_price(
             request.S,
             request.K,
             request.T,
             request.r,
             request.sigma,
             request.n,
-            request.m,
             request.option_type,
-            request.control_variate
+            request.extrapolation
         )
 
-        if is_valid_float(price) and is_valid_float(confident_interval[0]) and is_valid_float(confident_interval[1]):
-            return {"price": price, "confident_interval": confident_interval, "input": request.dict()}
+        if is_valid_float(price):
+            return {"price": price, "input": request.dict()}
         else:
-            return {"price": "NaN", "confident_interval": ("NaN", "NaN"), "input": request.dict()}
+            return {"price": "NaN", "input": request.dict()}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@api_router.post("/monte-carlo-arithmetic-mean-basket-option")
-def calculate_monte_carlo_arithmetic_mean_basket_option(request: ArithmeticMeanBasketOptionRequest):
+@api_router.post("/binomial-tree-american-option-batch")
+@result_cache.cached
+def calculate_binomial_tree_american_option_batch(request: AmericanOptionBatchRequest):
     try:
-        price, confident_interval = ArithmeticOption.arithemetic_mean_basket_option_price(
-            request.S1,
-            request.S2,
-            request.sigma1,
-            request.sigma2,
-            request.r,
+        prices = AmericanOption.binomial_tree_american_option_prices(
+            request.S,
             request.K,
             request.T,
-            request.rho,
-            request.m,
+            request.r,
+            request.sigma,
+            request.n,
             request.option_type,
-            request.control_variate
+            request.extrapolation
         )
 
-        if is_valid_float(price) and is_valid_float(confident_interval[0]) and is_valid_float(confident_interval[1]):
-            return {"price": price, "confident_interval": confident_interval, "input": request.dict()}
-        else:
-            return {"price": "NaN", "confident_interval": ("NaN", "NaN"), "input": request.dict()}
+        return {"price": to_valid_list(prices)}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
-    
-@api_router.post("/quasi-monte-carlo-kiko-put-option")
-def calculate_quasi_monte_carlo_kiko_put_option(request: KIKOPutOptionRequest):
+
+@api_router.post("/finite-difference-american-option")
+@result_cache.cached
+def calculate_finite_difference_american_option(request: AmericanOptionFiniteDifferenceRequest):
     try:
-        price, delta, confident_interval = KIKOPutOption.price_kiko_put_with_delta(
+        results = AmericanOption.finite_difference_american_option_price(
             request.S,
             request.K,
             request.T,
             request.r,
             request.sigma,
-            request.L,
-            request.U,
-            request.n,
-            request.R,
+            request.option_type,
+            request.space_steps,
+            request.time_steps
         )
 
-        if is_valid_float(price) and is_valid_float(delta) and is_valid_float(confident_interval[0]) and is_valid_float(confident_interval[1]):
-            return {"price": price, "delta": delta, "confident_interval": confident_interval, "input": request.dict()}
-        else:
-            return {"price": "NaN", "delta": "NaN", "confident_interval": ("NaN", "NaN"), "input": request.dict()}
+        response = {name: value if is_valid_float(value) else "NaN" for name, value in results.items()}
+        response["input"] = request.dict()
+        return response
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@api_router.post("/binomial-tree-american-option")
-def calculate_binomial_tree_american_option(request: AmericanOptionRequest):
+@api_router.post("/finite-difference-american-option-batch")
+@result_cache.cached
+def calculate_finite_difference_american_option_batch(request: AmericanOptionFiniteDifferenceBatchRequest):
     try:
-        price = AmericanOption.binomial_tree_american_option_price(
+        results = AmericanOption.finite_difference_american_option_prices(
             request.S,
             request.K,
             request.T,
             request.r,
             request.sigma,
-            request.n,
-            request.option_type
+            request.option_type,
+            request.space_steps,
+            request.time_steps
         )
 
+        return {name: to_valid_list(values) for name, values in results.items()}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.post("/surface-american-option")
+@result_cache.cached
+def calculate_surface_american_option(request: AmericanOptionRequest):
+    try:
+        surface = surface_store.find("american", option_type=request.option_type)
+        quote = None if surface is None else surface.quote(request.S, request.K, request.T, request.sigma, request.r)
+
+        if quote is not None and quote[1] <= surface_tolerance * request.K:
+            price, error_bound = quote
+            source = "surface"
+        else:
+            price = AmericanOption.binomial_tree_american_option_price(
+                request.S,
+                request.K,
+                request.T,
+                request.r,
+                request.sigma,
+                request.n,
+                request.option_type,
+                request.extrapolation
+            )
+            error_bound = "NaN"
+            source = "engine"
+
         if is_valid_float(price):
-            return {"price": price, "input": request.dict()}
+            return {"price": price, "error_bound": error_bound, "source": source, "input": request.dict()}
         else:
-            return {"price": "NaN", "input": request.dict()}
+            return {"price": "NaN", "error_bound": "NaN", "source": source, "input": request.dict()}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.post("/surface-arithmetic-asian-option")
+@result_cache.cached
+def calculate_surface_arithmetic_asian_option(request: ArithmeticAsianOptionRequest):
+    try:
+        surface = surface_store.find("arithmetic-asian", option_type=request.option_type, n=request.n)
+        quote = None if surface is None else surface.quote(request.S, request.K, request.T, request.sigma, request.r)
+
+        if quote is not None and quote[1] <= surface_tolerance * request.K:
+            price, error_bound = quote
+            source = "surface"
+        else:
+            response = price_monte_carlo_arithmetic_asian_option(request)
+            price = response["price"]
+            error_bound = "NaN" if price == "NaN" else (response["confident_interval"][1] - response["confident_interval"][0]) / 2
+            source = "engine"
+
+        if is_valid_float(price):
+            return {"price": price, "error_bound": error_bound, "source": source, "input": request.dict()}
+        else:
+            return {"price": "NaN", "error_bound": "NaN", "source": source, "input": request.dict()}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@api_router.post("/irs")
+@result_cache.cached
+def calculate_irs(request: IRSBatchRequest):
+    try:
+        if request.par_tenors is not None:
+            curve = IRSPricer.bootstrap_curve(
+                request.trades[0].currency,
+                request.valuation_date,
+                request.par_tenors,
+                request.par_rates,
+                request.curve_fixed_frequency,
+                request.curve_day_count
+            )
+        else:
+            curve = DiscountCurve(request.valuation_date, request.curve_dates, request.discount_factors)
+        results = IRSPricer(curve).price_portfolio([trade.model_dump() for trade in request.trades], request.risk)
+
+        key_rate_deltas = results.pop("key_rate_deltas", None)
+        response = {name: to_valid_list(values) for name, values in results.items()}
+        if key_rate_deltas is not None:
+            response["key_rate_deltas"] = {name: to_valid_list(values) for name, values in key_rate_deltas.items()}
+        return response
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.post("/bulk/{model}")
+async def price_bulk(model: str, request: Request, chunk_size: int = 65536):
+    try:
+        # Validate the whole upload before streaming, so a bad row fails the request with a 400
+        # instead of truncating a response whose status has already been sent. Parsing and validation
+        # run in the thread pool so a large upload does not stall the event loop and the micro-batcher.
+        body = await request.body()
+        table = await run_in_threadpool(BulkPricer.read_table, body, chunk_size)
+        await run_in_threadpool(BulkPricer.validate, table, model)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    batches = BulkPricer.price_batches(table.to_batches(max_chunksize=chunk_size), model)
+    return StreamingResponse(BulkPricer.stream_bytes(batches), media_type="application/vnd.apache.arrow.stream")
+
+JOB_KINDS = {
+    "monte-carlo-arithmetic-asian-option": (ArithmeticAsianOptionRequest, lambda request: request.m, price_monte_carlo_arithmetic_asian_option),
+    "monte-carlo-arithmetic-mean-basket-option": (ArithmeticMeanBasketOptionRequest, lambda request: request.m, price_monte_carlo_arithmetic_mean_basket_option),
+    "monte-carlo-arithmetic-basket-option": (ArithmeticBasketOptionRequest, lambda request: request.m, price_monte_carlo_arithmetic_basket_option),
+    "quasi-monte-carlo-kiko-put-option": (KIKOPutOptionRequest, lambda request: request.M, price_quasi_monte_carlo_kiko_put_option),
+}
+
+@api_router.post("/jobs", status_code=202)
+def submit_job(job_request: JobRequest):
+    request_type, total_paths, price = JOB_KINDS[job_request.kind]
+    try:
+        request = request_type.model_validate(job_request.request)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+    job = job_manager.submit(job_request.kind, total_paths(request), lambda progress: price(request, progress))
+    return job.to_dict()
+
+@api_router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
+
+@api_router.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
+
+@api_router.get("/engines")
+def get_engines():
+    return engines.report()
+
+@api_router.get("/cache-stats")
+def get_cache_stats():
+    return result_cache.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 
 app.include_router(api_router)
 
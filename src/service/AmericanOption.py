@@ -1,28 +1,237 @@
 import numpy as np
+from scipy.linalg.lapack import dtbtrs
+from .BlackScholes import BlackScholes
 
 class AmericanOption:
     @staticmethod
-    def binomial_tree_american_option_price(S, K, T, r, sigma, n, option_type='call'):
+    def binomial_tree_american_option_price(S, K, T, r, sigma, n, option_type='call', extrapolation='none'):
+        prices = AmericanOption.binomial_tree_american_option_prices(S, [K], T, r, sigma, n, [option_type], extrapolation)
+        return float(prices[0])
+
+    @staticmethod
+    def binomial_tree_american_option_prices(S, K, T, r, sigma, n, option_type='call', extrapolation='none'):
+        if extrapolation == 'none':
+            return AmericanOption._binomial_tree(S, K, T, r, sigma, n, option_type, smoothing=False)
+        elif extrapolation == 'bbsr':
+            # Only the smoothed tree converges smoothly enough in n to extrapolate; the plain tree's error
+            # oscillates with the parity of n and the strike's position between nodes, and 2 * fine - coarse amplifies it.
+            fine = AmericanOption._binomial_tree(S, K, T, r, sigma, n, option_type, smoothing=True)
+            coarse = AmericanOption._binomial_tree(S, K, T, r, sigma, max(n // 2, 1), option_type, smoothing=True)
+            return 2 * fine - coarse
+        else:
+            raise ValueError("Invalid extrapolation. Must be 'none' or 'bbsr'.")
+
+    @staticmethod
+    def _binomial_tree(S, K, T, r, sigma, n, option_type, smoothing):
+        K = np.atleast_1d(np.asarray(K, dtype=float))
+        option_type = np.broadcast_to(np.asarray(option_type), K.shape)
+        if not np.isin(option_type, ['call', 'put']).all():
+            raise ValueError("Invalid option_type. Must be 'call' or 'put'.")
+        sign = np.where(option_type == 'call', 1.0, -1.0)[:, np.newaxis]
+        K = K[:, np.newaxis]
+
         dt = T / n
         u = np.exp(sigma * np.sqrt(dt))
         d = 1 / u
         p = (np.exp(r * dt) - d) / (u - d)
         q = 1 - p
-        asset_prices = np.zeros(n + 1)
-        for i in range(n + 1):
-            asset_prices[i] = S * (u ** (n - i)) * (d ** i)
-        option_values = np.zeros(n + 1)
-        if option_type == 'call':
-            option_values = np.maximum(0, asset_prices - K)
-        elif option_type == 'put':
-            option_values = np.maximum(0, K - asset_prices)
-        for j in range(n - 1, -1, -1):
-            for i in range(j + 1):
-                option_values[i] = np.exp(-r * dt) * (p * option_values[i] + q * option_values[i + 1])
-                asset_prices[i] = S * (u ** (j - i)) * (d ** i)
-                if option_type == 'call':
-                    option_values[i] = np.maximum(option_values[i], asset_prices[i] - K)
-                elif option_type == 'put':
-                    option_values[i] = np.maximum(option_values[i], K - asset_prices[i])
-        return option_values[0]
-        
\ No newline at end of file
+        discount = np.exp(-r * dt)
+
+        # Node i at step j sits at S * u**(j - 2i), so every slice of the lattice is a stride-2 view of one array.
+        lattice = S * u ** np.arange(-n, n + 1)
+
+        def asset_prices(j):
+            return lattice[n - j:n + j + 1:2][::-1]
+
+        if smoothing:
+            # BBS: replace the last step with the Black-Scholes value of the European option over dt.
+            last_prices = asset_prices(n - 1)
+            continuation = np.where(
+                sign > 0,
+                BlackScholes.european_option_price(last_prices, K, dt, r, sigma, 0, 'call'),
+                BlackScholes.european_option_price(last_prices, K, dt, r, sigma, 0, 'put'),
+            )
+            option_values = np.maximum(continuation, np.maximum(sign * (last_prices - K), 0))
+            start = n - 2
+        else:
+            option_values = np.maximum(sign * (asset_prices(n) - K), 0)
+            start = n - 1
+
+        for j in range(start, -1, -1):
+            option_values = discount * (p * option_values[:, :-1] + q * option_values[:, 1:])
+            np.maximum(option_values, sign * (asset_prices(j) - K), out=option_values)
+        return option_values[:, 0]
+
+    @staticmethod
+    def finite_difference_american_option_price(S, K, T, r, sigma, option_type='put', space_steps=400, time_steps=200):
+        """Price, delta, gamma and theta of one American option from a single Crank-Nicolson solve"""
+        results = AmericanOption.finite_difference_american_option_prices(S, [K], T, r, sigma, [option_type], space_steps, time_steps)
+        return {name: float(values[0]) for name, values in results.items()}
+
+    @staticmethod
+    def finite_difference_american_option_prices(S, K, T, r, sigma, option_type='put', space_steps=400, time_steps=200, width=5.0,
+                                                 peclet=0.05, max_space_steps=2**16):
+        """
+        Price, delta, gamma and theta of American options on spot S for every strike in K, as a dict of arrays.
+        All strikes share one uniform grid in log-spot with S on a node, spanning the drift and width standard
+        deviations beyond the spot and strikes, and one factorization per time step size. The grid has at least
+        space_steps intervals, and more when the drift r - sigma^2 / 2 dominates the diffusion: the cell Peclet
+        number |drift| h / sigma^2 is kept within peclet, which resolves the layer of width sigma^2 / |drift| at
+        the exercise boundary and keeps the scheme monotone. Grids that would need more than max_space_steps
+        intervals raise ValueError rather than return an unresolved price. Crank-Nicolson steps follow
+        four half-size implicit steps (Rannacher start-up), the payoff is averaged over each grid cell, and
+        the early-exercise problem of every step is solved exactly by Brennan-Schwartz. Delta and gamma are
+        differences on the grid around S; theta is the change of the value over the last time step.
+        """
+        K = np.atleast_1d(np.asarray(K, dtype=float))
+        option_type = np.broadcast_to(np.asarray(option_type), K.shape)
+        if not np.isin(option_type, ['call', 'put']).all():
+            raise ValueError("Invalid option_type. Must be 'call' or 'put'.")
+        if space_steps < 4 or time_steps < 2:
+            raise ValueError("space_steps must be at least 4 and time_steps at least 2.")
+
+        drift = r - 0.5 * sigma**2
+        spread = width * sigma * np.sqrt(T)
+        lower = min(np.log(S), np.log(K.min())) + min(drift * T, 0) - spread
+        upper = max(np.log(S), np.log(K.max())) + max(drift * T, 0) + spread
+        if drift != 0:
+            space_steps = max(space_steps, int(np.ceil((upper - lower) * abs(drift) / (peclet * sigma**2))))
+        if space_steps > max_space_steps:
+            raise ValueError(
+                f"sigma is too small against r for the finite-difference grid: it would need {space_steps} space steps "
+                f"(at most {max_space_steps}). Use the binomial tree instead."
+            )
+        h = (upper - lower) / space_steps
+        spot_index = int(round((np.log(S) - lower) / h))
+        x = np.log(S) + h * (np.arange(space_steps + 1) - spot_index)
+        spots = np.exp(x)
+
+        # Generator L V = sub V[i-1] + diag V[i] + sup V[i+1] of V_tau = sigma^2 / 2 V_xx + drift V_x - r V.
+        sub = 0.5 * sigma**2 / h**2 - 0.5 * drift / h
+        diag = -sigma**2 / h**2 - r
+        sup = 0.5 * sigma**2 / h**2 + 0.5 * drift / h
+
+        dt = T / time_steps
+        steps = [(1.0, dt / 2)] * 4 + [(0.5, dt)] * (time_steps - 2)
+
+        prices = np.empty(len(K))
+        deltas = np.empty(len(K))
+        gammas = np.empty(len(K))
+        thetas = np.empty(len(K))
+        for kind in ('call', 'put'):
+            columns = np.flatnonzero(option_type == kind)
+            if len(columns) == 0:
+                continue
+            strikes = K[columns]
+            sign = 1.0 if kind == 'call' else -1.0
+            exercise = np.maximum(sign * (spots[:, np.newaxis] - strikes), 0)
+            values = AmericanOption.cell_average_payoff(x, h, strikes, sign)
+
+            tau = 0.0
+            factors = {}
+            for theta, step in steps:
+                previous = values
+                tau += step
+                values = AmericanOption.crank_nicolson_step(
+                    values, exercise, spots, strikes, sign, r, tau, theta, step, sub, diag, sup, factors
+                )
+
+            i = spot_index
+            first = (values[i + 1] - values[i - 1]) / (2 * h)
+            second = (values[i + 1] - 2 * values[i] + values[i - 1]) / h**2
+            prices[columns] = values[i]
+            deltas[columns] = first / S
+            gammas[columns] = (second - first) / S**2
+            thetas[columns] = -(values[i] - previous[i]) / steps[-1][1]
+
+        return {"price": prices, "delta": deltas, "gamma": gammas, "theta": thetas}
+
+    @staticmethod
+    def cell_average_payoff(x, h, K, sign):
+        """
+        Payoffs max(sign (S - K), 0) averaged over the cell [x - h/2, x + h/2] of each log-spot node, shape
+        (nodes, strikes), so a strike between nodes does not leave the kink's position to the grid
+        """
+        left = (x - h / 2)[:, np.newaxis]
+        right = (x + h / 2)[:, np.newaxis]
+        log_K = np.log(K)
+        # Integral of (S - K) over the part of the cell above the strike, in the log-spot variable.
+        cut = np.clip(log_K, left, right)
+        above = (np.exp(right) - np.exp(cut) - K * (right - cut)) / h
+        below = (np.exp(cut) - np.exp(left) - K * (cut - left)) / h
+        return above if sign > 0 else -below
+
+    @staticmethod
+    def crank_nicolson_step(values, exercise, spots, K, sign, r, tau, theta, step, sub, diag, sup, factors):
+        """
+        Advance values (nodes, strikes) by step in time to maturity tau with the theta scheme, Dirichlet
+        boundaries at the intrinsic or discounted forward value, and early exercise into exercise.
+        factors caches the Brennan-Schwartz pivots per (theta, step).
+        """
+        explicit = values.copy()
+        explicit[1:-1] += (1 - theta) * step * (sub * values[:-2] + diag * values[1:-1] + sup * values[2:])
+
+        boundary_low = np.maximum(sign * (spots[0] - K * np.exp(-r * tau)), exercise[0])
+        boundary_high = np.maximum(sign * (spots[-1] - K * np.exp(-r * tau)), exercise[-1])
+        a, d, c = -theta * step * sub, 1 - theta * step * diag, -theta * step * sup
+        rhs = explicit[1:-1]
+        rhs[0] -= a * boundary_low
+        rhs[-1] -= c * boundary_high
+
+        key = (theta, step)
+        if key not in factors:
+            factors[key] = (AmericanOption.brennan_schwartz_factor(a, d, c, len(rhs)),
+                            AmericanOption.brennan_schwartz_factor(c, d, a, len(rhs)))
+        if sign < 0:
+            interior = AmericanOption.brennan_schwartz(a, factors[key][0], rhs, exercise[1:-1])
+        else:
+            # A call is exercised at high spots: solve on the reversed grid, where sub- and superdiagonal swap.
+            interior = AmericanOption.brennan_schwartz(c, factors[key][1], rhs[::-1], exercise[-2:0:-1])[::-1]
+        return np.vstack((boundary_low, interior, boundary_high))
+
+    @staticmethod
+    def brennan_schwartz_factor(sub, diag, sup, size):
+        """
+        Pivots left by eliminating the superdiagonal of the constant tridiagonal matrix from the last row up,
+        with the upper and lower bidiagonal band matrices of the elimination and of the substitution
+        """
+        pivots = np.empty(size)
+        pivots[-1] = diag
+        for i in range(size - 2, -1, -1):
+            pivots[i] = diag - sup * sub / pivots[i + 1]
+        upper = np.zeros((2, size))
+        upper[0, 1:] = sup / pivots[1:]
+        upper[1] = 1.0
+        lower = np.zeros((2, size))
+        lower[0] = pivots
+        lower[1, :-1] = sub
+        return pivots, upper, lower
+
+    @staticmethod
+    def brennan_schwartz(sub, factor, rhs, payoff):
+        """
+        Solve A V >= rhs, V >= payoff with equality in one of them at every node, for the constant tridiagonal
+        A behind factor and an exercise region at the start of the grid; each column is its own problem.
+        Elimination from the last row up leaves a lower bidiagonal system, solved from the first node with
+        V[i] = max((reduced[i] - sub V[i-1]) / pivots[i], payoff[i]). The exercise region is the run of nodes
+        where the payoff wins given an exercised neighbour, and the rest is one bidiagonal solve.
+        """
+        pivots, upper, lower = factor
+        reduced, _ = dtbtrs(upper, rhs, uplo='U')
+
+        previous_payoff = np.vstack((np.zeros((1, payoff.shape[1])), payoff[:-1]))
+        candidate = (reduced - sub * previous_payoff) / pivots[:, np.newaxis]
+        exercised = np.logical_and.accumulate(candidate <= payoff, axis=0)
+
+        values, _ = dtbtrs(lower, np.where(exercised, pivots[:, np.newaxis] * payoff + sub * previous_payoff, reduced), uplo='L')
+        values = np.where(exercised, payoff, values)
+
+        # The payoff binding again past the exercise region needs the node-by-node substitution; shortfalls
+        # within rounding of the payoff scale (such as -5e-324 against a zero payoff) are only clamped.
+        tolerance = 1e-12 * (1 + np.abs(payoff).max(axis=0))
+        for column in np.flatnonzero((payoff - values > tolerance).any(axis=0)):
+            value = 0.0
+            for i in range(len(pivots)):
+                value = max((reduced[i, column] - sub * value) / pivots[i], payoff[i, column])
+                values[i, column] = value
+        return np.maximum(values, payoff, out=values)
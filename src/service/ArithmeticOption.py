@@ -1,111 +1,526 @@
+import functools
+import logging
+import time
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr
+from .ClosedFormOption import ClosedFormOption
+from .ParallelMonteCarlo import ParallelMonteCarlo
+from .QuasiMonteCarlo import QuasiMonteCarlo
+from .RunningStatistics import RunningStatistics
+from .ScenarioStatistics import ScenarioStatistics
+from .VarianceReduction import VarianceReduction
+from ..util.Metrics import metrics
+
+logger = logging.getLogger(__name__)
 
 class ArithmeticOption:
     @staticmethod
-    def arithmetic_asian_option_price(S, K, T, r, sigma, n, m, option_type='call', control_variate='none'):
-        rng = np.random.default_rng(7405)
+    def arithmetic_asian_option_price(S, K, T, r, sigma, n, m, option_type='call', control_variate='none', seed=7405, workers=1,
+                                      sampling='pseudo', replicates=16, chunk_size=2**14, progress=None, greeks=False, precision='float64',
+                                      variance_reduction=(), efficiency=False):
+        """
+        Price and 95% confidence interval of an arithmetic average-price option. With greeks, also
+        returns a dict of (value, std_error) for delta, gamma and vega estimated from the same paths.
+        precision 'float32' draws normals and builds paths in single precision. variance_reduction
+        combines any of 'antithetic', 'moment_matching' and 'importance_sampling'. With efficiency,
+        the last element returned is the ParallelMonteCarlo.efficiency report of the run.
+        """
+        techniques = VarianceReduction.validate(variance_reduction)
 
-        dt = T / n
-        S_t = np.zeros((m, n+1))
-        S_t[:, 0] = S
+        def estimate(statistics):
+            return ArithmeticOption.asian_estimate(statistics, S, K, T, r, sigma, n, option_type, control_variate)
 
-        Z = rng.standard_normal((m, n))
-        scaling = np.exp((r - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * Z)
-        S_t[:, 1:] = S[:, np.newaxis] * np.cumprod(scaling, axis=1)
+        start = time.perf_counter()
+        result = ParallelMonteCarlo.sample(
+            ArithmeticOption.asian_statistics, estimate, m, seed, workers, sampling, replicates,
+            S, K, T, r, sigma, n, option_type, chunk_size, greeks, precision, techniques, progress=progress,
+            batched="moment_matching" in techniques
+        )
+        price, std_error, conf_interval = ParallelMonteCarlo.interval(result, estimate, sampling)
+        seconds = time.perf_counter() - start
 
-        S_avg = np.mean(S_t[:, 1:], axis=1)
-        if option_type == 'call':
-            payoffs = np.maximum(S_avg - K, 0)
-        elif option_type == 'put':
-            payoffs = np.maximum(K - S_avg, 0)
+        logger.info("Price: %s, Std Error: %s, Confidence Interval: %s", price, std_error, conf_interval)
+        outputs = [price, conf_interval]
+        if greeks:
+            estimates = ArithmeticOption.greek_estimates(result, sampling, np.exp(-r * T), 1)
+            outputs.append({name: (values[0], std_errors[0]) for name, (values, std_errors) in estimates.items()})
+        if efficiency:
+            outputs.append(ParallelMonteCarlo.efficiency(std_error, seconds, ParallelMonteCarlo.paths(result)))
+        return tuple(outputs)
 
+    @staticmethod
+    def asian_estimate(statistics, S, K, T, r, sigma, n, option_type, control_variate):
+        """Discounted price and standard error from running (arithmetic, geometric) payoff statistics"""
+        m = statistics.count
         if control_variate == 'none':
-            price = np.exp(-r * T) * np.mean(payoffs)
-            std_error = np.exp(-r * T) * np.std(payoffs) / np.sqrt(m)
-            conf_interval = [price - 1.96 * std_error, price + 1.96 * std_error]
-
-            print(f"Price: {price}, Std Error: {std_error}, Confidence Interval: {conf_interval}")
-            
-            return price, conf_interval
+            price = np.exp(-r * T) * statistics.mean[0]
+            std_error = np.exp(-r * T) * statistics.std()[0] / np.sqrt(m)
+            return price, std_error
 
         elif control_variate == 'geometric':
-            geometric_avg = np.exp(np.mean(np.log(S_t[:, 1:]), axis=1))
+            geo_price = ClosedFormOption.geometric_asian_option_price(S, K, T, r, sigma, n, option_type)
+            cv_mean, cv_std_error = statistics.control_variate_estimate(geo_price * np.exp(r * T))
+            return np.exp(-r * T) * cv_mean, np.exp(-r * T) * cv_std_error
 
-            if option_type == 'call':
-                geo_payoffs = np.maximum(geometric_avg - K, 0)
-            else:
-                geo_payoffs = np.maximum(K - geometric_avg, 0)
+        else:
+            raise ValueError("Invalid control_variate. Must be 'none' or 'geometric'.")
 
-            sigma_adj = sigma*np.sqrt((n+1)*(2*n+1)/(6*n**2))
-            mu_adj = (r- 0.5 * sigma**2) * (n + 1)/(2 * n)+ 0.5 *sigma_adj**2
-            d1 = (np.log(S/K) + (mu_adj + 0.5 * sigma_adj**2) * T) / (sigma_adj * np.sqrt(T))
-            d2 = d1 - sigma_adj * np.sqrt(T)
+    @staticmethod
+    def asian_statistics(m, seed, S, K, T, r, sigma, n, option_type, chunk_size, greeks=False, precision='float64', techniques=frozenset(),
+                         sampling='pseudo', progress=None):
+        """
+        Simulate m paths and return the running (arithmetic, geometric) payoff statistics,
+        followed by the (delta, gamma, vega) estimator columns when greeks is set.
+        progress, if given, is called with the statistics after every chunk.
+        """
+        dtype = ParallelMonteCarlo.precision_dtype(precision)
+        draw_paths = ArithmeticOption.brownian_paths(n, T, seed, sampling, dtype, techniques, m)
+        statistics = RunningStatistics(5 if greeks else 2)
+        chunks = ArithmeticOption.asian_payoff_chunks(S, K, T, r, sigma, n, m, option_type, draw_paths, chunk_size, greeks, dtype, techniques)
+        for columns in chunks:
+            with metrics.time("engine_phase_seconds", engine="asian", phase="reduction"):
+                samples = np.column_stack(columns)
+                statistics.update(samples, len(samples) * VarianceReduction.paths_per_sample(techniques))
+            if progress is not None:
+                progress(statistics)
+        return statistics
 
-            if option_type == 'call':
-                geo_price = np.exp(-r * T) * (S * np.exp(mu_adj * T) * norm.cdf(d1) - K * norm.cdf(d2))
-            else:
-                geo_price = np.exp(-r * T) * (K * norm.cdf(-d2) - S * np.exp(mu_adj * T) * norm.cdf(-d1))
+    @staticmethod
+    def brownian_paths(n, T, seed, sampling='pseudo', dtype=np.float64, techniques=frozenset(), m=None):
+        """
+        Return draw(count) -> Brownian paths W(t_1), ..., W(t_n) of shape (count, n) and type dtype on the grid t_i = i T / n.
+        Pseudo-random paths sum normals drawn row by row from default_rng(seed), so they do not depend on
+        how the draws are chunked; Sobol paths use a scrambled sequence with a Brownian bridge construction.
+        Antithetic and moment-matching techniques act on the normals before the paths are built.
+        m, the total number of paths, lets the normals of the first m paths come from the normal block cache.
+        """
+        draw = QuasiMonteCarlo.normal_draws(sampling, n, seed, m, dtype)
+        if sampling == 'pseudo':
+            step = np.dtype(dtype).type(np.sqrt(T / n))
+            construct = lambda Z: step * np.cumsum(Z, axis=1)
+        else:
+            construct = QuasiMonteCarlo.brownian_bridge(n, T).construct
+        return lambda count: construct(VarianceReduction.normals(draw, count, techniques))
+
+    @staticmethod
+    def asian_payoff_chunks(S, K, T, r, sigma, n, m, option_type, draw_paths, chunk_size, greeks=False, dtype=np.float64,
+                            techniques=frozenset()):
+        """
+        Yield undiscounted (arithmetic, geometric) average-price payoffs chunk by chunk, and with greeks
+        the per-path delta, gamma and vega estimators of the arithmetic payoff. Delta and vega are pathwise
+        derivatives; gamma differentiates the pathwise delta, whose indicator is not differentiable, with
+        the likelihood ratio of the first increment, giving delta / S * (W(t_1) / (sigma t_1) - 1).
+        Paths are built in dtype, the type of draw_paths; the averages along each path accumulate in float64.
+        With importance sampling the Brownian motion gets the drift of asian_drift_shift and every column
+        is weighted by its likelihood ratio; antithetic pairs are averaged into one sample.
+        """
+        timer = functools.partial(metrics.time, "engine_phase_seconds", engine="asian")
+        times = T / n * np.arange(1, n + 1)
+        drift = ((r - 0.5 * sigma**2) * times).astype(dtype)
+        vol = np.dtype(dtype).type(sigma)
+        theta = ArithmeticOption.asian_drift_shift(S, K, T, r, sigma, n, option_type) if "importance_sampling" in techniques else 0.0
+        for start in range(0, m, chunk_size):
+            with timer(phase="random"):
+                W = draw_paths(min(chunk_size, m - start))
+            with timer(phase="paths"):
+                if theta:
+                    # Girsanov: paths of W + theta t are reweighted by exp(-theta W(T) - theta^2 T / 2).
+                    likelihood = np.exp(-theta * W[:, -1].astype(np.float64) - 0.5 * theta**2 * T)
+                    W += (theta * times).astype(dtype)
+                # Without greeks W and the log-paths are not needed again, so the paths are built in the buffer of W.
+                log_paths = drift + vol * W if greeks else np.multiply(W, vol, out=W)
+                if not greeks:
+                    log_paths += drift
+                geometric_avg = S * np.exp(np.mean(log_paths, axis=1, dtype=np.float64))
+                paths = np.exp(log_paths, out=None if greeks else log_paths)
+                S_avg = S * np.mean(paths, axis=1, dtype=np.float64)
+
+            with timer(phase="payoff"):
+                if option_type == 'call':
+                    payoffs = np.maximum(S_avg - K, 0), np.maximum(geometric_avg - K, 0)
+                elif option_type == 'put':
+                    payoffs = np.maximum(K - S_avg, 0), np.maximum(K - geometric_avg, 0)
+                else:
+                    raise ValueError("Invalid option_type. Must be 'call' or 'put'.")
+
+                if greeks:
+                    exercised = np.where(S_avg > K, 1.0, 0.0) if option_type == 'call' else np.where(S_avg < K, -1.0, 0.0)
+                    delta = exercised * S_avg / S
+                    gamma = delta / S * (W[:, 0] / (sigma * times[0]) - 1)
+                    vega = exercised * S * np.mean(paths * (W - vol * times.astype(dtype)), axis=1, dtype=np.float64)
+                    payoffs += (delta, gamma, vega)
+                if theta:
+                    payoffs = tuple(column * likelihood for column in payoffs)
+            # Release the chunk's paths before the caller asks for the next chunk.
+            del W, log_paths, paths
+            yield tuple(VarianceReduction.pair_average(column, techniques) for column in payoffs)
 
-            cov = np.cov(payoffs, geo_payoffs)[0, 1]
-            var = np.var(geo_payoffs)
-            theta = cov / var
+    @staticmethod
+    def asian_drift_shift(S, K, T, r, sigma, n, option_type):
+        """
+        Drift added to the Brownian motion for importance sampling, chosen so the median geometric average
+        of the shifted paths sits at the strike. Zero when the option is already in the money at the median.
+        """
+        mean_time = T * (n + 1) / (2 * n)
+        theta = (np.log(K / S) - (r - 0.5 * sigma**2) * mean_time) / (sigma * mean_time)
+        return float(max(theta, 0.0) if option_type == 'call' else min(theta, 0.0))
 
-            cv_payoffs = payoffs - theta * (geo_payoffs - geo_price * np.exp(r * T))
-            price = np.exp(-r * T) * np.mean(cv_payoffs)
-            std_error = np.exp(-r * T) * np.std(cv_payoffs) / np.sqrt(m)
-            conf_interval = [price - 1.96 * std_error, price + 1.96 * std_error]
+    @staticmethod
+    def arithmetic_asian_option_scenarios(S, K, T, r, sigma, n, m, spot_shifts, vol_shifts, option_type='call', control_variate='none',
+                                          seed=7405, workers=1, sampling='pseudo', replicates=16, chunk_size=2**14, precision='float64',
+                                          variance_reduction=()):
+        """
+        Prices, standard errors and 95% confidence intervals of an arithmetic average-price option on the grid
+        of spots S * (1 + spot_shift) by volatilities sigma + vol_shift, as arrays of shape (spots, vols) and
+        (spots, vols, 2). Every cell is priced from the same Brownian paths (common random numbers), so the
+        grid is smooth across shocks and the unshocked cell equals arithmetic_asian_option_price.
+        """
+        techniques = VarianceReduction.validate(variance_reduction)
+        if "importance_sampling" in techniques:
+            raise ValueError("importance_sampling shifts the paths of each spot and volatility, so scenario cells cannot share them.")
+        spots, sigmas = ScenarioStatistics.axes(S, sigma, spot_shifts, vol_shifts)
 
-            print(f"Price: {price}, Std Error: {std_error}, Confidence Interval: {conf_interval}")
-            return price, conf_interval
+        result = ParallelMonteCarlo.sample(
+            ArithmeticOption.asian_scenario_statistics, None, m, seed, workers, sampling, replicates,
+            spots, K, T, r, sigmas, n, option_type, chunk_size, precision, techniques, batched="moment_matching" in techniques
+        )
 
+        prices = np.empty((len(spots), len(sigmas)))
+        std_errors = np.empty_like(prices)
+        conf_intervals = np.empty(prices.shape + (2,))
+        for i, spot in enumerate(spots):
+            for j, vol in enumerate(sigmas):
+                def estimate(statistics):
+                    return ArithmeticOption.asian_estimate(statistics.cell(i, j), spot, K, T, r, vol, n, option_type, control_variate)
+                prices[i, j], std_errors[i, j], conf_intervals[i, j] = ParallelMonteCarlo.interval(result, estimate, sampling)
+        return prices, std_errors, conf_intervals
 
     @staticmethod
-    def arithemetic_mean_basket_option_price(S1, S2, sigma1, sigma2, r, K, T, rho, m, option_type='call', control_variate='none'):
-        rng = np.random.default_rng(7405)
+    def asian_scenario_statistics(m, seed, spots, K, T, r, sigmas, n, option_type, chunk_size, precision='float64', techniques=frozenset(),
+                                  sampling='pseudo', progress=None):
+        """
+        Simulate m Brownian paths once and return the (arithmetic, geometric) payoff statistics of every
+        (spot, sigma) cell. Log-paths are rebuilt from the same W for each sigma; prices are proportional
+        to spot, so each spot only rescales the path averages of its sigma.
+        """
+        timer = functools.partial(metrics.time, "engine_phase_seconds", engine="asian_scenario")
+        dtype = ParallelMonteCarlo.precision_dtype(precision)
+        draw_paths = ArithmeticOption.brownian_paths(n, T, seed, sampling, dtype, techniques, m)
+        times = T / n * np.arange(1, n + 1)
+        statistics = ScenarioStatistics((len(spots), len(sigmas)), 2)
+        paths_per_sample = VarianceReduction.paths_per_sample(techniques)
+        if option_type not in ('call', 'put'):
+            raise ValueError("Invalid option_type. Must be 'call' or 'put'.")
+        sign = 1.0 if option_type == 'call' else -1.0
 
-        Z1 = rng.standard_normal(m)
-        Z2 = rho * Z1 + np.sqrt(1 - rho**2) * rng.standard_normal(m)
+        for start in range(0, m, chunk_size):
+            with timer(phase="random"):
+                W = draw_paths(min(chunk_size, m - start))
+            for j, sigma in enumerate(sigmas):
+                with timer(phase="paths"):
+                    log_paths = ((r - 0.5 * sigma**2) * times).astype(dtype) + np.dtype(dtype).type(sigma) * W
+                    arithmetic_average = np.mean(np.exp(log_paths), axis=1, dtype=np.float64)
+                    geometric_average = np.exp(np.mean(log_paths, axis=1, dtype=np.float64))
+                for i, spot in enumerate(spots):
+                    with timer(phase="payoff"):
+                        payoffs = np.column_stack((
+                            np.maximum(sign * (spot * arithmetic_average - K), 0),
+                            np.maximum(sign * (spot * geometric_average - K), 0)
+                        ))
+                    with timer(phase="reduction"):
+                        samples = VarianceReduction.pair_average(payoffs, techniques)
+                        statistics.cell(i, j).update(samples, len(samples) * paths_per_sample)
+            if progress is not None:
+                progress(statistics)
+        return statistics
 
-        S1_T = S1 * np.exp((r - 0.5 * sigma1**2) * T + sigma1 * np.sqrt(T) * Z1)
-        S2_T = S2 * np.exp((r - 0.5 * sigma2**2) * T + sigma2 * np.sqrt(T) * Z2)
+    @staticmethod
+    def greek_estimates(result, sampling, scale, count):
+        """
+        (values, std_errors) arrays of delta, gamma and vega from a ParallelMonteCarlo.sample result whose
+        statistics hold two payoff columns followed by count columns for each Greek, scaled by scale
+        """
+        greeks = {}
+        for i, name in enumerate(("delta", "gamma", "vega")):
+            estimates = [
+                ParallelMonteCarlo.interval(result, ParallelMonteCarlo.column_estimate(2 + i * count + j, scale), sampling)[:2]
+                for j in range(count)
+            ]
+            greeks[name] = tuple(np.array(column) for column in zip(*estimates))
+        return greeks
 
+    @staticmethod
+    def basket_greek_columns(S, S_T, weights, sigma, T, X, Y, exercised):
+        """
+        Per-path delta, gamma and vega estimators of each asset, shape (paths, assets) each, for a call or
+        put on the basket S_T @ weights. X are the correlated normals driving log S_T and Y = X @ inv(corr)
+        their likelihood-ratio score directions; exercised is +1 where a call pays, -1 where a put pays, else 0.
+        Delta and vega are pathwise; gamma applies the likelihood ratio to the pathwise delta.
+        """
+        contribution = exercised[:, np.newaxis] * weights * S_T
+        delta = contribution / S
+        gamma = delta / S * (Y / (sigma * np.sqrt(T)) - 1)
+        vega = contribution * (np.sqrt(T) * X - sigma * T)
+        return delta, gamma, vega
 
-        Ba_T = (S1_T + S2_T) / 2
-        if option_type == "call":
-            arithmetic_bkst_payoff = np.maximum(Ba_T - K, 0)
-        elif option_type == "put":
-            arithmetic_bkst_payoff = np.maximum(K - Ba_T, 0)
+    @staticmethod
+    def inverse_factor(factor):
+        """Inverse of a correlation factor, or NaNs for a singular correlation matrix (gamma is then undefined)"""
+        try:
+            return np.linalg.inv(factor)
+        except np.linalg.LinAlgError:
+            return np.full_like(factor, np.nan)
+
+    @staticmethod
+    def arithemetic_mean_basket_option_price(S1, S2, sigma1, sigma2, r, K, T, rho, m, option_type='call', control_variate='none', seed=7405, workers=1,
+                                             sampling='pseudo', replicates=16, chunk_size=2**14, progress=None, greeks=False, precision='float64',
+                                             variance_reduction=(), efficiency=False):
+        """
+        Price and 95% confidence interval of an option on the mean of two assets. With greeks, also returns
+        a dict of (values, std_errors) for delta, gamma and vega, each an array over the two assets.
+        precision 'float32' draws normals and builds terminal prices in single precision. variance_reduction
+        and efficiency are as in arithmetic_asian_option_price.
+        """
+        techniques = VarianceReduction.validate(variance_reduction)
 
+        def estimate(statistics):
+            return ArithmeticOption.basket_estimate(statistics, S1, S2, sigma1, sigma2, r, K, T, rho, option_type, control_variate)
+
+        start = time.perf_counter()
+        result = ParallelMonteCarlo.sample(
+            ArithmeticOption.basket_statistics, estimate, m, seed, workers, sampling, replicates,
+            S1, S2, sigma1, sigma2, r, K, T, rho, option_type, chunk_size, greeks, precision, techniques, progress=progress,
+            batched="moment_matching" in techniques
+        )
+        price, std_error, conf_interval = ParallelMonteCarlo.interval(result, estimate, sampling)
+        seconds = time.perf_counter() - start
+        logger.info("Price: %s, Std Error: %s, Confidence Interval: %s", price, std_error, conf_interval)
+        outputs = [price, conf_interval]
+        if greeks:
+            outputs.append(ArithmeticOption.greek_estimates(result, sampling, 1.0, 2))
+        if efficiency:
+            outputs.append(ParallelMonteCarlo.efficiency(std_error, seconds, ParallelMonteCarlo.paths(result)))
+        return tuple(outputs)
+
+    @staticmethod
+    def basket_estimate(statistics, S1, S2, sigma1, sigma2, r, K, T, rho, option_type, control_variate):
+        """Price and standard error from running discounted (arithmetic, geometric) payoff statistics"""
+        m = statistics.count
         if control_variate == 'none':
-            price = np.exp(-r * T) * np.mean(arithmetic_bkst_payoff)
-            price_std = np.std(np.exp(-r * T)*arithmetic_bkst_payoff)
-            conf_interval = [price - 1.96 * price_std / np.sqrt(m), price + 1.96 * price_std / np.sqrt(m)]
-            print(f"Price: {price}, Std Error: {price_std}, Confidence Interval: {conf_interval}")
-            return price, conf_interval
-            
-        Bg_T = np.sqrt(S1_T * S2_T)
-        if option_type == "call":
-            geometric_bkst_payoff = np.maximum(Bg_T - K, 0)
-        elif option_type == "put":
-            geometric_bkst_payoff = np.maximum(K - Bg_T, 0)
+            return statistics.mean[0], statistics.std()[0] / np.sqrt(m)
+
+        elif control_variate == 'geometric':
+            geometric_bkt_closeform_price = ArithmeticOption.geometric_basket_price(S1, S2, sigma1, sigma2, rho, r, T, K, option_type)
+            return statistics.control_variate_estimate(geometric_bkt_closeform_price)
+
+        else:
+            raise ValueError("Invalid control_variate. Must be 'none' or 'geometric'.")
+
+    @staticmethod
+    def basket_statistics(m, seed, S1, S2, sigma1, sigma2, r, K, T, rho, option_type, chunk_size, greeks=False, precision='float64',
+                          techniques=frozenset(), sampling='pseudo', progress=None):
+        """
+        Simulate m terminal prices in chunks and return the discounted (arithmetic, geometric) payoff statistics,
+        followed by the delta, gamma and vega estimator columns of both assets when greeks is set.
+        The basket is observed once, so Sobol sampling needs no path construction beyond two dimensions.
+        """
+        timer = functools.partial(metrics.time, "engine_phase_seconds", engine="basket")
+        dtype = ParallelMonteCarlo.precision_dtype(precision)
+        draw = QuasiMonteCarlo.normal_draws(sampling, 2, seed, m, dtype)
+        factor = np.array([[1.0, 0.0], [rho, np.sqrt(1 - rho**2)]])
+        shift = None
+        if "importance_sampling" in techniques:
+            shift = ArithmeticOption.basket_drift_shift(
+                np.array([S1, S2]), np.array([sigma1, sigma2]), factor, np.array([0.5, 0.5]), r, K, T, option_type
+            )
+            shift = shift if shift.any() else None
+        # Coefficients in the working dtype, so float32 normals are not promoted back to float64.
+        a = dtype.type
+        statistics = RunningStatistics(8 if greeks else 2)
+        for start in range(0, m, chunk_size):
+            with timer(phase="random"):
+                Z = VarianceReduction.normals(draw, min(chunk_size, m - start), techniques)
+
+            with timer(phase="paths"):
+                if shift is not None:
+                    likelihood = VarianceReduction.likelihood_ratio(Z, shift)
+                    Z = Z + shift.astype(dtype)
+                Z1, Z2 = Z.T
+
+                Z2_independent = Z2
+                Z2 = a(rho) * Z1 + a(np.sqrt(1 - rho**2)) * Z2
+                S1_T = a(S1) * np.exp(a((r - 0.5 * sigma1**2) * T) + a(sigma1 * np.sqrt(T)) * Z1)
+                S2_T = a(S2) * np.exp(a((r - 0.5 * sigma2**2) * T) + a(sigma2 * np.sqrt(T)) * Z2)
+
+                Ba_T = (S1_T + S2_T) / 2
+                Bg_T = np.sqrt(S1_T * S2_T)
+
+            with timer(phase="payoff"):
+                if option_type == "call":
+                    arithmetic_bkst_payoff = np.maximum(Ba_T - K, 0)
+                    geometric_bkst_payoff = np.maximum(Bg_T - K, 0)
+                elif option_type == "put":
+                    arithmetic_bkst_payoff = np.maximum(K - Ba_T, 0)
+                    geometric_bkst_payoff = np.maximum(K - Bg_T, 0)
+                else:
+                    raise ValueError("Invalid option_type. Must be 'call' or 'put'.")
+
+                columns = [arithmetic_bkst_payoff, geometric_bkst_payoff]
+                if greeks:
+                    exercised = np.where(Ba_T > K, 1.0, 0.0) if option_type == "call" else np.where(Ba_T < K, -1.0, 0.0)
+                    Y = np.column_stack((Z1, Z2_independent)) @ ArithmeticOption.inverse_factor(factor)
+                    columns += ArithmeticOption.basket_greek_columns(
+                        np.array([S1, S2]), np.column_stack((S1_T, S2_T)), np.array([0.5, 0.5]), np.array([sigma1, sigma2]),
+                        T, np.column_stack((Z1, Z2)), Y, exercised
+                    )
 
-        geometric_bkt_closeform_price = ArithmeticOption.geometric_basket_price(S1, S2, sigma1, sigma2, rho, r, T, K, option_type)
+            with timer(phase="reduction"):
+                samples = np.exp(-r * T) * np.column_stack(columns)
+                if shift is not None:
+                    samples *= likelihood[:, np.newaxis]
+                samples = VarianceReduction.pair_average(samples, techniques)
+                statistics.update(samples, len(samples) * VarianceReduction.paths_per_sample(techniques))
+            if progress is not None:
+                progress(statistics)
+        return statistics
+
+    @staticmethod
+    def arithmetic_basket_option_price(S, sigma, corr, r, K, T, m, option_type='call', control_variate='none', weights=None, seed=7405, workers=1,
+                                       sampling='pseudo', replicates=16, chunk_size=2**14, progress=None, greeks=False,
+                                       precision='float64', variance_reduction=(), efficiency=False):
+        """
+        Price and 95% confidence interval of an option on a weighted basket of N assets. With greeks, also
+        returns a dict of (values, std_errors) for delta, gamma and vega, each an array over the assets.
+        precision 'float32' draws normals and builds terminal prices in single precision. variance_reduction
+        and efficiency are as in arithmetic_asian_option_price.
+        """
+        techniques = VarianceReduction.validate(variance_reduction)
+        S = np.asarray(S, dtype=float)
+        sigma = np.asarray(sigma, dtype=float)
+        weights = np.full(len(S), 1 / len(S)) if weights is None else np.asarray(weights, dtype=float)
+        factor = ArithmeticOption.correlation_factor(corr)
+
+        def estimate(statistics):
+            if control_variate == 'none':
+                return statistics.mean[0], statistics.std()[0] / np.sqrt(statistics.count)
+            elif control_variate == 'geometric':
+                geo_price = ClosedFormOption.geometric_n_asset_basket_option_price(S, sigma, corr, r, K, T, weights, option_type)
+                return statistics.control_variate_estimate(geo_price)
+            else:
+                raise ValueError("Invalid control_variate. Must be 'none' or 'geometric'.")
+
+        start = time.perf_counter()
+        result = ParallelMonteCarlo.sample(
+            ArithmeticOption.n_asset_basket_statistics, estimate, m, seed, workers, sampling, replicates,
+            S, sigma, factor, weights, r, K, T, option_type, chunk_size, greeks, precision, techniques, progress=progress,
+            batched="moment_matching" in techniques
+        )
+        price, std_error, conf_interval = ParallelMonteCarlo.interval(result, estimate, sampling)
+        seconds = time.perf_counter() - start
+        logger.info("Price: %s, Std Error: %s, Confidence Interval: %s", price, std_error, conf_interval)
+        outputs = [price, conf_interval]
+        if greeks:
+            outputs.append(ArithmeticOption.greek_estimates(result, sampling, 1.0, len(S)))
+        if efficiency:
+            outputs.append(ParallelMonteCarlo.efficiency(std_error, seconds, ParallelMonteCarlo.paths(result)))
+        return tuple(outputs)
+
+    @staticmethod
+    def basket_drift_shift(S, sigma, factor, weights, r, K, T, option_type):
+        """
+        Shift of the independent normals for importance sampling of a basket option: the smallest shift
+        that moves the median geometric basket to the strike. Zero when the option is already in the money
+        at the median.
+        """
+        direction = factor.T @ (weights * sigma * np.sqrt(T))
+        distance = np.log(K) - weights @ (np.log(S) + (r - 0.5 * sigma**2) * T)
+        out_of_the_money = distance > 0 if option_type == 'call' else distance < 0
+        if not out_of_the_money or not direction.any():
+            return np.zeros(len(S))
+        return direction * distance / (direction @ direction)
+
+    @staticmethod
+    def correlation_factor(corr):
+        """Factor A with A @ A.T == corr, computed once per distinct correlation matrix"""
+        corr = np.asarray(corr, dtype=float)
+        return ArithmeticOption._correlation_factor(corr.shape[0], corr.tobytes())
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def _correlation_factor(N, corr_bytes):
+        corr = np.frombuffer(corr_bytes, dtype=float).reshape(N, N)
+        try:
+            factor = np.linalg.cholesky(corr)
+        except np.linalg.LinAlgError:
+            # Singular but positive semi-definite matrices (e.g. perfectly correlated assets) have no
+            # Cholesky factor; scaling the eigenvectors by the root eigenvalues gives a valid factor instead.
+            eigenvalues, eigenvectors = np.linalg.eigh(corr)
+            if eigenvalues.min() < -1e-10:
+                raise ValueError("Correlation matrix must be positive semi-definite")
+            factor = eigenvectors * np.sqrt(np.maximum(eigenvalues, 0))
+        factor.setflags(write=False)
+        return factor
+
+    @staticmethod
+    def n_asset_basket_statistics(m, seed, S, sigma, factor, weights, r, K, T, option_type, chunk_size, greeks=False,
+                                  precision='float64', techniques=frozenset(), sampling='pseudo', progress=None):
+        """
+        Simulate m terminal prices of an N-asset basket in chunks and return the discounted
+        (arithmetic, geometric) payoff statistics, followed by the delta, gamma and vega estimator
+        columns of every asset when greeks is set. Correlated normals are one matrix product per chunk.
+        """
+        N = len(S)
+        dtype = ParallelMonteCarlo.precision_dtype(precision)
+        draw = QuasiMonteCarlo.normal_draws(sampling, N, seed, m, dtype)
 
-        arithmetic_bkst_price = np.exp(-r*T)*arithmetic_bkst_payoff
-        geometric_bkst_price = np.exp(-r*T)*geometric_bkst_payoff
+        timer = functools.partial(metrics.time, "engine_phase_seconds", engine="n_asset_basket")
+        log_S_T0 = (np.log(S) + (r - 0.5 * sigma**2) * T).astype(dtype)
+        scale = (sigma * np.sqrt(T)).astype(dtype)
+        path_factor = factor.T.astype(dtype)
+        path_weights = weights.astype(dtype)
+        score_factor = ArithmeticOption.inverse_factor(factor) if greeks else None
+        shift = None
+        if "importance_sampling" in techniques:
+            shift = ArithmeticOption.basket_drift_shift(S, sigma, factor, weights, r, K, T, option_type)
+            shift = shift if shift.any() else None
+        statistics = RunningStatistics(2 + 3 * N if greeks else 2)
+        for start in range(0, m, chunk_size):
+            with timer(phase="random"):
+                Z = VarianceReduction.normals(draw, min(chunk_size, m - start), techniques)
+            with timer(phase="paths"):
+                if shift is not None:
+                    likelihood = VarianceReduction.likelihood_ratio(Z, shift)
+                    Z = Z + shift.astype(dtype)
+                X = Z @ path_factor
+                # Without greeks X and log S_T are not needed again, so S_T is built in the buffer of X.
+                log_S_T = scale * X if greeks else np.multiply(X, scale, out=X)
+                log_S_T += log_S_T0
+                Bg_T = np.exp(log_S_T @ path_weights)
+                S_T = np.exp(log_S_T, out=None if greeks else log_S_T)
+                Ba_T = S_T @ path_weights
 
-        cov_fg = np.cov(arithmetic_bkst_price, geometric_bkst_price)[0, 1]
-        var_g = np.var(geometric_bkst_price)
-        theta = cov_fg / var_g
+            with timer(phase="payoff"):
+                if option_type == "call":
+                    payoffs = np.maximum(Ba_T - K, 0), np.maximum(Bg_T - K, 0)
+                elif option_type == "put":
+                    payoffs = np.maximum(K - Ba_T, 0), np.maximum(K - Bg_T, 0)
+                else:
+                    raise ValueError("Invalid option_type. Must be 'call' or 'put'.")
 
-        adj_price= arithmetic_bkst_price+ theta*(geometric_bkt_closeform_price - geometric_bkst_price)
-        adj_price_mu = np.mean(adj_price)
-        adj_price_std = np.std(adj_price)
+                if greeks:
+                    exercised = np.where(Ba_T > K, 1.0, 0.0) if option_type == "call" else np.where(Ba_T < K, -1.0, 0.0)
+                    payoffs += ArithmeticOption.basket_greek_columns(S, S_T, weights, sigma, T, X, Z @ score_factor, exercised)
 
-        conf_interval = [adj_price_mu - 1.96 * adj_price_std / np.sqrt(m), adj_price_mu + 1.96 * adj_price_std / np.sqrt(m)]
-        print(f"Price: {adj_price_mu}, Std Error: {adj_price_std}, Confidence Interval: {conf_interval}")
-        return adj_price_mu, conf_interval
+            with timer(phase="reduction"):
+                samples = np.exp(-r * T) * np.column_stack(payoffs)
+                if shift is not None:
+                    samples *= likelihood[:, np.newaxis]
+                samples = VarianceReduction.pair_average(samples, techniques)
+                statistics.update(samples, len(samples) * VarianceReduction.paths_per_sample(techniques))
+            del Z, X, log_S_T, S_T
+            if progress is not None:
+                progress(statistics)
+        return statistics
 
     @staticmethod
     def geometric_basket_price(S1, S2, sigma1, sigma2, rho, r, T, K, option_type="call"):
@@ -116,9 +531,9 @@ class ArithmeticOption:
         d2 = d1 - sigma_bg * np.sqrt(T)
 
         if option_type == "call":
-            price = np.exp(-r * T) * (Bg0 * np.exp(mu_bg * T) * norm.cdf(d1) - K * norm.cdf(d2))
+            price = np.exp(-r * T) * (Bg0 * np.exp(mu_bg * T) * ndtr(d1) - K * ndtr(d2))
         elif option_type == "put":
-            price = np.exp(-r * T) * (K * norm.cdf(-d2) - Bg0 * np.exp(mu_bg * T) * norm.cdf(-d1))
+            price = np.exp(-r * T) * (K * ndtr(-d2) - Bg0 * np.exp(mu_bg * T) * ndtr(-d1))
         else:
             raise ValueError("Invalid option_type. Must be 'call' or 'put'.")
         return price
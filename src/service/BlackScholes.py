@@ -1,5 +1,5 @@
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr
 
 class BlackScholes:        
     @staticmethod
@@ -8,7 +8,41 @@ class BlackScholes:
         d2 = d1 - sigma * np.sqrt(T)
 
         if option_type == 'call':
-            return S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+            return S * np.exp(-q * T) * ndtr(d1) - K * np.exp(-r * T) * ndtr(d2)
         elif option_type == 'put':
-            return K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
+            return K * np.exp(-r * T) * ndtr(-d2) - S * np.exp(-q * T) * ndtr(-d1)
         
+
+    @staticmethod
+    def european_option_price_and_greeks(S, K, T, r, sigma, q, option_type):
+        S, K, T, r, sigma, q = (np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q))
+        is_call = np.asarray(option_type) == 'call'
+
+        sqrt_T = np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * sqrt_T)
+        d2 = d1 - sigma * sqrt_T
+
+        dividend_discount = np.exp(-q * T)
+        discount = np.exp(-r * T)
+        pdf_d1 = np.exp(-d1**2 / 2) / np.sqrt(2 * np.pi)
+        sign = np.where(is_call, 1.0, -1.0)
+        cdf_d1 = ndtr(sign * d1)
+        cdf_d2 = ndtr(sign * d2)
+
+        price = sign * (S * dividend_discount * cdf_d1 - K * discount * cdf_d2)
+        delta = sign * dividend_discount * cdf_d1
+        gamma = dividend_discount * pdf_d1 / (S * sigma * sqrt_T)
+        vega = S * dividend_discount * pdf_d1 * sqrt_T
+        theta = (-S * dividend_discount * pdf_d1 * sigma / (2 * sqrt_T)
+                 - sign * r * K * discount * cdf_d2
+                 + sign * q * S * dividend_discount * cdf_d1)
+        rho = sign * K * T * discount * cdf_d2
+
+        return {
+            "price": price,
+            "delta": delta,
+            "gamma": gamma,
+            "vega": vega,
+            "theta": theta,
+            "rho": rho,
+        }
@@ -0,0 +1,205 @@
+import argparse
+import io
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from .AmericanOption import AmericanOption
+from .BlackScholes import BlackScholes
+from .ClosedFormOption import ClosedFormOption
+
+# model -> {column: constraint}; the same bounds as the JSON request DTOs
+COLUMNS = {
+    "european": {"S": "positive", "K": "positive", "T": "non_negative", "r": "positive", "sigma": "positive",
+                 "q": "non_negative", "option_type": "option_type"},
+    "geometric-asian": {"S": "positive", "K": "positive", "T": "positive", "r": "positive", "sigma": "positive",
+                        "n": "positive_integer", "option_type": "option_type"},
+    "geometric-basket": {"S1": "positive", "S2": "positive", "sigma1": "positive", "sigma2": "positive", "r": "positive",
+                         "K": "positive", "T": "positive", "rho": "correlation", "option_type": "option_type"},
+    "american": {"S": "positive", "K": "positive", "T": "positive", "r": "positive", "sigma": "positive",
+                 "n": "positive_integer", "option_type": "option_type"},
+}
+OPTIONAL_COLUMNS = {"american": {"extrapolation": ("extrapolation", "none")}}
+ID_COLUMN = "trade_id"
+CATEGORIES = {"option_type": ("call", "put"), "extrapolation": ("none", "bbsr")}
+PARQUET_MAGIC = b"PAR1"
+
+class BulkPricer:
+    @staticmethod
+    def read_batches(source, chunk_size: int = 65536):
+        """
+        Record batches of an Arrow IPC stream or a Parquet file, told apart by the Parquet magic bytes.
+        source: Path or binary file object
+        """
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = pa.BufferReader(source)
+        elif isinstance(source, str):
+            source = pa.memory_map(source) if not BulkPricer.is_parquet(source) else source
+        if BulkPricer.is_parquet(source):
+            yield from pq.ParquetFile(source).iter_batches(batch_size=chunk_size)
+        else:
+            for batch in pa.ipc.open_stream(source):
+                # Producers may write one huge batch; re-chunk so memory and latency stay bounded.
+                yield from pa.Table.from_batches([batch]).to_batches(max_chunksize=chunk_size)
+
+    @staticmethod
+    def read_table(source, chunk_size: int = 65536):
+        """All record batches of source as one table of chunk_size batches"""
+        return pa.Table.from_batches(list(BulkPricer.read_batches(source, chunk_size)))
+
+    @staticmethod
+    def is_parquet(source) -> bool:
+        if isinstance(source, str):
+            with open(source, "rb") as file:
+                return file.read(4) == PARQUET_MAGIC
+        position = source.tell()
+        magic = source.read(4)
+        source.seek(position)
+        return magic == PARQUET_MAGIC
+
+    @staticmethod
+    def validate(batch, model: str) -> dict:
+        """
+        Check a record batch or table column by column and return the model inputs as NumPy arrays.
+        Raises ValueError naming every missing column and every column with nulls or out-of-range values.
+        """
+        if model not in COLUMNS:
+            raise ValueError(f"Invalid model. Must be one of {', '.join(COLUMNS)}.")
+        missing = [name for name in COLUMNS[model] if name not in batch.schema.names]
+        if missing:
+            raise ValueError(f"Missing columns for {model}: {', '.join(missing)}")
+
+        columns, errors = {}, []
+        specs = dict(COLUMNS[model])
+        specs.update({name: spec for name, (spec, _) in OPTIONAL_COLUMNS.get(model, {}).items() if name in batch.schema.names})
+        for name, constraint in specs.items():
+            column = batch.column(name)
+            if column.null_count:
+                errors.append(f"{name} has {column.null_count} null values")
+                continue
+            try:
+                values, invalid = BulkPricer.check_column(column, constraint)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, TypeError):
+                errors.append(f"{name} has type {column.type}, expected {'string' if constraint in CATEGORIES else 'numeric'}")
+                continue
+            if invalid.any():
+                errors.append(f"{name} violates {constraint} in {int(invalid.sum())} rows, first at row {int(np.argmax(invalid))}")
+            columns[name] = values
+        if errors:
+            raise ValueError("; ".join(errors))
+
+        for name, (_, default) in OPTIONAL_COLUMNS.get(model, {}).items():
+            columns.setdefault(name, np.full(batch.num_rows, default))
+        return columns
+
+    @staticmethod
+    def check_column(column, constraint: str):
+        """NumPy values of column and the mask of rows violating constraint"""
+        if constraint in CATEGORIES:
+            values = np.asarray(pc.cast(column, pa.string()).to_numpy(zero_copy_only=False), dtype=str)
+            return values, ~np.isin(values, CATEGORIES[constraint])
+        if constraint == "positive_integer":
+            if not pa.types.is_integer(column.type):
+                raise TypeError(f"{column.type} is not an integer type")
+            values = pc.cast(column, pa.int64()).to_numpy()
+            return values, values <= 0
+
+        if not (pa.types.is_floating(column.type) or pa.types.is_integer(column.type)):
+            raise TypeError(f"{column.type} is not numeric")
+        values = pc.cast(column, pa.float64()).to_numpy()
+        invalid = ~np.isfinite(values)
+        if constraint == "positive":
+            invalid |= values <= 0
+        elif constraint == "non_negative":
+            invalid |= values < 0
+        elif constraint == "correlation":
+            invalid |= np.abs(values) > 1
+        return values, invalid
+
+    @staticmethod
+    def price(columns: dict, model: str) -> dict:
+        """Result columns of a validated batch"""
+        if model == "european":
+            return BlackScholes.european_option_price_and_greeks(
+                columns["S"], columns["K"], columns["T"], columns["r"], columns["sigma"], columns["q"], columns["option_type"]
+            )
+
+        price = np.empty(len(columns["option_type"]))
+        if model == "american":
+            # Prices are homogeneous of degree one in (S, K), so every row sharing (T, r, sigma, n, extrapolation)
+            # is priced on a single unit-spot lattice with strikes K / S.
+            keys = np.rec.fromarrays([columns[name] for name in ("T", "r", "sigma", "n", "extrapolation")])
+            unique_keys, group = np.unique(keys, return_inverse=True)
+            for i, (T, r, sigma, n, extrapolation) in enumerate(unique_keys):
+                rows = np.flatnonzero(group == i)
+                price[rows] = columns["S"][rows] * AmericanOption.binomial_tree_american_option_prices(
+                    1.0, columns["K"][rows] / columns["S"][rows], T, r, sigma, int(n), columns["option_type"][rows], str(extrapolation)
+                )
+            return {"price": price}
+
+        for option_type in ("call", "put"):
+            rows = columns["option_type"] == option_type
+            if model == "geometric-asian":
+                price[rows] = ClosedFormOption.geometric_asian_option_price(
+                    *(columns[name][rows] for name in ("S", "K", "T", "r", "sigma", "n")), option_type
+                )
+            elif model == "geometric-basket":
+                price[rows] = ClosedFormOption.geometric_basket_option_price(
+                    *(columns[name][rows] for name in ("S1", "S2", "sigma1", "sigma2", "r", "K", "T", "rho")), option_type
+                )
+        return {"price": price}
+
+    @staticmethod
+    def price_batches(batches, model: str):
+        """Yield one result record batch per input batch, carrying the trade_id column through when present"""
+        for batch in batches:
+            results = BulkPricer.price(BulkPricer.validate(batch, model), model)
+            arrays = {name: pa.array(np.asarray(values, dtype=float)) for name, values in results.items()}
+            if ID_COLUMN in batch.schema.names:
+                arrays = {ID_COLUMN: batch.column(ID_COLUMN), **arrays}
+            yield pa.RecordBatch.from_pydict(arrays)
+
+    @staticmethod
+    def stream_bytes(result_batches):
+        """Encode result batches as an Arrow IPC stream, yielding the bytes of each batch as soon as it is priced"""
+        sink = io.BytesIO()
+        writer = None
+        for batch in result_batches:
+            if writer is None:
+                writer = pa.ipc.new_stream(sink, batch.schema)
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+        if writer is not None:
+            writer.close()
+            yield sink.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description="Price an Arrow IPC stream or Parquet file of trades in bulk")
+    parser.add_argument("model", choices=sorted(COLUMNS))
+    parser.add_argument("input", help="Arrow IPC stream or Parquet file of trades")
+    parser.add_argument("output", help="Output file; Parquet when it ends in .parquet, otherwise an Arrow IPC stream")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="Rows priced per record batch")
+    args = parser.parse_args()
+
+    writer = None
+    rows = 0
+    try:
+        for batch in BulkPricer.price_batches(BulkPricer.read_batches(args.input, args.chunk_size), args.model):
+            if writer is None:
+                if args.output.endswith(".parquet"):
+                    writer = pq.ParquetWriter(args.output, batch.schema)
+                else:
+                    writer = pa.ipc.new_stream(args.output, batch.schema)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    except ValueError as e:
+        parser.exit(1, f"Invalid input after {rows} rows: {e}\n")
+    finally:
+        if writer is not None:
+            writer.close()
+    print(f"Priced {rows} trades into {args.output}")
+
+if __name__ == "__main__":
+    main()
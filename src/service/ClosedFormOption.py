@@ -1,5 +1,5 @@
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr
 
 class ClosedFormOption:
     @staticmethod
@@ -11,9 +11,9 @@ class ClosedFormOption:
         d2 = d1 - sigma_adj * np.sqrt(T)
     
         if option_type == 'call':
-            return np.exp(-r * T) * (S * np.exp(r_adj * T) * norm.cdf(d1) - K * norm.cdf(d2))
+            return np.exp(-r * T) * (S * np.exp(r_adj * T) * ndtr(d1) - K * ndtr(d2))
         elif option_type == 'put':
-            return np.exp(-r * T) * (K * norm.cdf(-d2) - S * np.exp(r_adj * T) * norm.cdf(-d1))
+            return np.exp(-r * T) * (K * ndtr(-d2) - S * np.exp(r_adj * T) * ndtr(-d1))
 
 
     @staticmethod
@@ -26,6 +26,27 @@ class ClosedFormOption:
         d2 = d1 - sigma * np.sqrt(T)
     
         if option_type == 'call':
-            return np.exp(-r * T) * (S0 * np.exp(b * T) * norm.cdf(d1) - K * norm.cdf(d2))
+            return np.exp(-r * T) * (S0 * np.exp(b * T) * ndtr(d1) - K * ndtr(d2))
         elif option_type == 'put':
-            return np.exp(-r * T) * (K * norm.cdf(-d2) - S0 * np.exp(b * T) * norm.cdf(-d1))
+            return np.exp(-r * T) * (K * ndtr(-d2) - S0 * np.exp(b * T) * ndtr(-d1))
+
+
+    @staticmethod
+    def geometric_n_asset_basket_option_price(S, sigma, corr, r, K, T, weights=None, option_type='call'):
+        S = np.asarray(S, dtype=float)
+        sigma = np.asarray(sigma, dtype=float)
+        weights = np.full(len(S), 1 / len(S)) if weights is None else np.asarray(weights, dtype=float)
+
+        cov = np.asarray(corr, dtype=float) * np.outer(sigma, sigma)
+        sigma_bg = np.sqrt(weights @ cov @ weights)
+        mu = weights @ (r - 0.5 * sigma**2)
+        S0 = np.exp(weights @ np.log(S))
+
+        d1 = (np.log(S0 / K) + (mu + sigma_bg**2) * T) / (sigma_bg * np.sqrt(T))
+        d2 = d1 - sigma_bg * np.sqrt(T)
+        forward = S0 * np.exp((mu + 0.5 * sigma_bg**2) * T)
+
+        if option_type == 'call':
+            return np.exp(-r * T) * (forward * ndtr(d1) - K * ndtr(d2))
+        elif option_type == 'put':
+            return np.exp(-r * T) * (K * ndtr(-d2) - forward * ndtr(-d1))
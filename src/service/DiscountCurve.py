@@ -0,0 +1,64 @@
+import numpy as np
+
+class DiscountCurve:
+    def __init__(self, as_of, dates, discount_factors):
+        """
+        Discount curve held as sorted arrays of pillar times and log discount factors,
+        interpolated log-linearly (piecewise flat forward rates)
+        as_of: Valuation date, where the discount factor is 1
+        dates: Pillar dates after as_of
+        discount_factors: Discount factors at the pillar dates
+        """
+        self.as_of = np.datetime64(as_of, "D")
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        discount_factors = np.asarray(discount_factors, dtype=float)
+        if dates.shape != discount_factors.shape or dates.ndim != 1:
+            raise ValueError("dates and discount_factors must be one-dimensional and of the same length")
+        if np.any(discount_factors <= 0):
+            raise ValueError("Discount factors must be greater than 0")
+
+        order = np.argsort(dates)
+        times = self.year_fractions(dates[order])
+        if np.any(times <= 0) or np.any(np.diff(times) == 0):
+            raise ValueError("Pillar dates must be distinct and after the valuation date")
+        self.dates = dates[order]
+        self.times = np.concatenate(([0.0], times))
+        self.log_discount_factors = np.concatenate(([0.0], np.log(discount_factors[order])))
+        self.factor_names = None
+        self.factor_jacobian = None
+
+    def year_fractions(self, dates) -> np.ndarray:
+        """ACT/365 time from the valuation date, the axis the curve interpolates on"""
+        return (np.asarray(dates, dtype="datetime64[D]") - self.as_of).astype(float) / 365
+
+    def interpolation_weights(self, dates):
+        """
+        Indices into the pillar arrays (position 0 is the valuation date) and weights such that
+        log DF(date) = sum(weights * log_discount_factors[indices], axis=1), each of shape (len(dates), 2).
+        Dates on or before the valuation date get DF 1; dates beyond the last pillar extend its segment.
+        """
+        t = np.atleast_1d(self.year_fractions(dates))
+        right = np.clip(np.searchsorted(self.times, t, side="right"), 1, len(self.times) - 1)
+        left = right - 1
+        weight = (t - self.times[left]) / (self.times[right] - self.times[left])
+        weight = np.where(t <= 0, 0.0, weight)
+        return np.column_stack((left, right)), np.column_stack((1 - weight, weight))
+
+    def discount_factors(self, dates) -> np.ndarray:
+        """
+        Discount factors at any array of dates. Log discount factors are interpolated linearly
+        in time, and extrapolated beyond the last pillar with its forward rate.
+        """
+        indices, weights = self.interpolation_weights(dates)
+        return np.exp(np.sum(weights * self.log_discount_factors[indices], axis=1))
+
+    def risk_factors(self):
+        """
+        Names of the curve's risk factors and the Jacobian of the pillar log discount factors with
+        respect to them, shape (pillars, factors). By default the factors are the continuously
+        compounded zero rates of the pillars, so the Jacobian is diagonal with entries -t.
+        """
+        if self.factor_jacobian is not None:
+            return self.factor_names, self.factor_jacobian
+        names = [str(pillar) for pillar in self.dates]
+        return names, np.diag(-self.times[1:])
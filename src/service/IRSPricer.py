@@ -1,99 +1,217 @@
+import functools
+import hashlib
+import json
+import re
 import numpy as np
-from datetime import date, timedelta
-import pandas as pd
+from datetime import date
+from scipy.optimize import brentq
+from .DiscountCurve import DiscountCurve
+from ..util.ResultCache import ResultCache
+
+FREQUENCY_MONTHS = {"1M": 1, "3M": 3, "6M": 6, "12M": 12}
+BUSINESS_DAY_ROLLS = {"Following": "following", "Modified Following": "modifiedfollowing", "Preceding": "preceding"}
 
 class IRSPricer:
-    def __init__(self, curve_data: dict):
+    _curves = ResultCache(maxsize=64, ttl=float("inf"))
+
+    def __init__(self, curve: DiscountCurve):
         """
-        Initialize IRS Pricer with curve data
-        curve_data: Dictionary containing discount factors and forward rates
+        Initialize IRS Pricer with a discount curve
+        curve: Curve used both to discount cash flows and to project floating rates
         """
-        self.curve_data = curve_data
+        self.curve = curve
 
     @staticmethod
-    def get_payment_dates(start_date: date, end_date: date, frequency: str) -> list:
-        """Generate payment dates based on frequency"""
-        dates = []
-        current = start_date
-        freq_months = {"1M": 1, "3M": 3, "6M": 6, "12M": 12}
-        months = freq_months[frequency]
-        
-        while current <= end_date:
-            dates.append(current)
-            # Add months to current date
-            current = date(current.year + (current.month + months - 1) // 12,
-                         (current.month + months - 1) % 12 + 1,
-                         current.day)
-        return dates
+    @functools.lru_cache(maxsize=4096)
+    def payment_schedule(start_date: date, end_date: date, frequency: str, business_day_convention: str = "Following") -> np.ndarray:
+        """
+        Adjusted schedule dates from start_date to end_date, rolled forward by whole periods from start_date.
+        Days past the end of a shorter month are clipped to its last day, a final short stub ends at end_date,
+        and dates are moved off weekends by the business day convention. Cached per distinct leg.
+        """
+        if end_date <= start_date:
+            raise ValueError("Maturity date must be after the effective date")
+        months = FREQUENCY_MONTHS[frequency]
+        start = np.datetime64(start_date, "D")
+        end = np.datetime64(end_date, "D")
+
+        start_month = start.astype("datetime64[M]")
+        periods = (end.astype("datetime64[M]") - start_month).astype(int) // months
+        month_starts = start_month + months * np.arange(periods + 1)
+        days_in_month = ((month_starts + 1).astype("datetime64[D]") - month_starts.astype("datetime64[D]")).astype(int)
+        dates = month_starts.astype("datetime64[D]") + (np.minimum(start_date.day, days_in_month) - 1)
+        dates = dates[dates <= end]
+        if dates[-1] < end:
+            dates = np.append(dates, end)
+
+        schedule = np.busday_offset(dates, 0, roll=BUSINESS_DAY_ROLLS[business_day_convention])
+        schedule.setflags(write=False)
+        return schedule
 
     @staticmethod
-    def calculate_day_count_fraction(start_date: date, end_date: date, convention: str) -> float:
-        """Calculate day count fraction based on convention"""
-        if convention == "30/360":
-            return (360 * (end_date.year - start_date.year) + 
-                   30 * (end_date.month - start_date.month) +
-                   (end_date.day - start_date.day)) / 360
-        elif convention == "ACT/360":
-            return (end_date - start_date).days / 360
-        elif convention == "ACT/365":
-            return (end_date - start_date).days / 365
-        
-    def price_irs(self, trade_details: dict) -> dict:
+    def day_count_fractions(start_dates, end_dates, convention) -> np.ndarray:
+        """Day count fractions of arrays of periods, with one convention or an array of conventions"""
+        start_dates = np.asarray(start_dates, dtype="datetime64[D]")
+        end_dates = np.asarray(end_dates, dtype="datetime64[D]")
+        convention = np.broadcast_to(np.asarray(convention), start_dates.shape)
+        days = (end_dates - start_dates).astype(float)
+
+        def components(dates):
+            months = dates.astype("datetime64[M]")
+            return months.astype("datetime64[Y]").astype(int), months.astype(int) % 12, (dates - months).astype(int) + 1
+
+        # 30/360 bond basis: a day 31 counts as 30, and so does an end day 31 when the start is the 30th or 31st.
+        y1, m1, d1 = components(start_dates)
+        y2, m2, d2 = components(end_dates)
+        d1 = np.minimum(d1, 30)
+        d2 = np.where(d1 == 30, np.minimum(d2, 30), d2)
+        thirty_360 = (360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)) / 360
+
+        if not np.isin(convention, ["30/360", "ACT/360", "ACT/365"]).all():
+            raise ValueError("Invalid day count convention. Must be '30/360', 'ACT/360' or 'ACT/365'.")
+        return np.select([convention == "30/360", convention == "ACT/360"], [thirty_360, days / 360], days / 365)
+
+    def leg_values(self, legs: list, gradients: bool = False):
         """
-        Price an Interest Rate Swap
-        Returns dictionary with NPV and other metrics
+        Per unit of notional, the annuity sum(dcf * DF(end)) and the projected floating value
+        sum(DF(start) - DF(end)) of each leg (start_date, end_date, frequency, day_count, business_day_convention).
+        Periods paid on or before the valuation date are dropped, and a period already accruing
+        projects its rate from the valuation date. All periods share one curve lookup.
+        With gradients, also returns the derivatives of both with respect to the pillar log discount
+        factors, each of shape (legs, pillars).
         """
-        fixed_dates = self.get_payment_dates(
-            trade_details["effective_date"],
-            trade_details["maturity_date"],
-            trade_details["fixed_frequency"]
-        )
-        
-        float_dates = self.get_payment_dates(
-            trade_details["effective_date"],
-            trade_details["maturity_date"],
-            trade_details["float_frequency"]
-        )
-
-        # Calculate fixed leg cash flows
-        fixed_leg_cf = []
-        for i in range(1, len(fixed_dates)):
-            dcf = self.calculate_day_count_fraction(
-                fixed_dates[i-1],
-                fixed_dates[i],
-                trade_details["day_count_fixed"]
-            )
-            cf = trade_details["notional"] * trade_details["fixed_rate"] * dcf
-            fixed_leg_cf.append({
-                "date": fixed_dates[i],
-                "amount": cf,
-                "df": self.curve_data["discount_factors"].get(fixed_dates[i], 1.0)
-            })
-
-        # Calculate floating leg cash flows (using forward rates)
-        float_leg_cf = []
-        for i in range(1, len(float_dates)):
-            dcf = self.calculate_day_count_fraction(
-                float_dates[i-1],
-                float_dates[i],
-                trade_details["day_count_float"]
-            )
-            forward_rate = self.curve_data["forward_rates"].get(float_dates[i-1], 0.0)
-            cf = trade_details["notional"] * (forward_rate + trade_details["float_spread"]) * dcf
-            float_leg_cf.append({
-                "date": float_dates[i],
-                "amount": cf,
-                "df": self.curve_data["discount_factors"].get(float_dates[i], 1.0)
-            })
-
-        # Calculate NPV
-        fixed_npv = sum(cf["amount"] * cf["df"] for cf in fixed_leg_cf)
-        float_npv = sum(cf["amount"] * cf["df"] for cf in float_leg_cf)
-        
-        return {
+        schedules = [IRSPricer.payment_schedule(start, end, frequency, roll) for start, end, frequency, _, roll in legs]
+        counts = [len(schedule) - 1 for schedule in schedules]
+        leg = np.repeat(np.arange(len(legs)), counts)
+        starts = np.concatenate([schedule[:-1] for schedule in schedules])
+        ends = np.concatenate([schedule[1:] for schedule in schedules])
+        dcf = IRSPricer.day_count_fractions(starts, ends, np.repeat([day_count for _, _, _, day_count, _ in legs], counts))
+
+        live = ends > self.curve.as_of
+        df_start = self.curve.discount_factors(np.maximum(starts, self.curve.as_of))
+        df_end = self.curve.discount_factors(ends)
+        annuity_terms = np.where(live, dcf * df_end, 0.0)
+        annuity = np.bincount(leg, weights=annuity_terms, minlength=len(legs))
+        projection = np.bincount(leg, weights=np.where(live, df_start - df_end, 0.0), minlength=len(legs))
+        if not gradients:
+            return annuity, projection
+
+        # dDF(t) / dlogDF(pillar) = DF(t) * weight(t, pillar); column 0 is the fixed valuation date.
+        pillars = len(self.curve.times)
+        start_indices, start_weights = self.curve.interpolation_weights(np.maximum(starts, self.curve.as_of))
+        end_indices, end_weights = self.curve.interpolation_weights(ends)
+        rows = np.repeat(leg, 2).reshape(-1, 2)
+        annuity_gradient = np.zeros((len(legs), pillars))
+        projection_gradient = np.zeros((len(legs), pillars))
+        np.add.at(annuity_gradient, (rows, end_indices), annuity_terms[:, np.newaxis] * end_weights)
+        np.add.at(projection_gradient, (rows, start_indices), np.where(live, df_start, 0.0)[:, np.newaxis] * start_weights)
+        np.add.at(projection_gradient, (rows, end_indices), -np.where(live, df_end, 0.0)[:, np.newaxis] * end_weights)
+        return annuity, projection, annuity_gradient[:, 1:], projection_gradient[:, 1:]
+
+    def price_portfolio(self, trades: list, risk: bool = False) -> dict:
+        """
+        Price a list of pay-fixed swaps given as IRSRequest dicts and return columns of NPVs.
+        Legs shared by several trades (same dates, frequency and conventions) are valued once.
+        With risk, also returns the NPV change for a 1bp rise of each curve risk factor
+        (key_rate_deltas, keyed by factor name) and of all factors together (dv01), from the
+        linear sensitivities of the legs to the pillar discount factors.
+        """
+        legs = {}
+        fixed_leg = np.array([legs.setdefault((
+            trade["effective_date"], trade["maturity_date"], trade["fixed_frequency"],
+            trade["day_count_fixed"], trade["business_day_convention"]
+        ), len(legs)) for trade in trades])
+        float_leg = np.array([legs.setdefault((
+            trade["effective_date"], trade["maturity_date"], trade["float_frequency"],
+            trade["day_count_float"], trade["business_day_convention"]
+        ), len(legs)) for trade in trades])
+        values = self.leg_values(list(legs), gradients=risk)
+        annuity, projection = values[:2]
+
+        notional = np.array([trade["notional"] for trade in trades], dtype=float)
+        fixed_rate = np.array([trade["fixed_rate"] for trade in trades], dtype=float)
+        float_spread = np.array([trade["float_spread"] for trade in trades], dtype=float)
+
+        fixed_npv = notional * fixed_rate * annuity[fixed_leg]
+        float_npv = notional * (projection[float_leg] + float_spread * annuity[float_leg])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            par_rate = float_npv / (notional * annuity[fixed_leg])
+
+        results = {
             "npv": float_npv - fixed_npv,
             "fixed_leg_npv": fixed_npv,
             "float_leg_npv": float_npv,
-            "fixed_cashflows": fixed_leg_cf,
-            "float_cashflows": float_leg_cf
-        }
\ No newline at end of file
+            "par_rate": par_rate
+        }
+        if risk:
+            annuity_gradient, projection_gradient = values[2:]
+            npv_gradient = notional[:, np.newaxis] * (
+                projection_gradient[float_leg]
+                + float_spread[:, np.newaxis] * annuity_gradient[float_leg]
+                - fixed_rate[:, np.newaxis] * annuity_gradient[fixed_leg]
+            )
+            names, jacobian = self.curve.risk_factors()
+            key_rate_deltas = 1e-4 * npv_gradient @ jacobian
+            results["dv01"] = key_rate_deltas.sum(axis=1)
+            results["key_rate_deltas"] = dict(zip(names, key_rate_deltas.T))
+        return results
+
+    def price_irs(self, trade_details: dict) -> dict:
+        """
+        Price an Interest Rate Swap
+        Returns dictionary with NPV, leg NPVs and par rate as floats. The per-period fixed_cashflows and
+        float_cashflows lists are no longer returned: legs are valued as annuities in price_portfolio.
+        """
+        return {name: float(values[0]) for name, values in self.price_portfolio([trade_details]).items()}
+
+    @staticmethod
+    def tenor_end_date(start_date: date, tenor: str) -> date:
+        """Unadjusted end of a tenor such as "3M" or "10Y", clipped to the end of the month"""
+        match = re.fullmatch(r"(\d+)([MY])", tenor)
+        if match is None:
+            raise ValueError(f"Invalid tenor {tenor!r}. Must be a number of months or years such as '6M' or '5Y'.")
+        months = int(match.group(1)) * (12 if match.group(2) == "Y" else 1)
+        month = np.datetime64(start_date, "M") + months
+        days_in_month = ((month + 1).astype("datetime64[D]") - month.astype("datetime64[D]")).astype(int)
+        return (month.astype("datetime64[D]") + (min(start_date.day, days_in_month) - 1)).astype(date)
+
+    @staticmethod
+    def bootstrap_curve(currency: str, as_of: date, tenors: list, par_rates: list, fixed_frequency: str = "12M",
+                        day_count: str = "30/360", business_day_convention: str = "Modified Following") -> DiscountCurve:
+        """
+        Discount curve that reprices par swaps starting at as_of to zero, one pillar per quote at the
+        swap's adjusted maturity, solved pillar by pillar. The risk factors of the curve are the par
+        quotes, with the Jacobian of the pillar log discount factors from the implicit function theorem.
+        Curves are cached by currency, as-of date and a hash of the quotes and conventions.
+        """
+        quotes = json.dumps([list(tenors), list(par_rates), fixed_frequency, day_count, business_day_convention])
+        key = f"{currency}:{as_of.isoformat()}:{hashlib.sha256(quotes.encode()).hexdigest()}"
+        found, curve = IRSPricer._curves.get(key)
+        if found:
+            return curve
+
+        if len(tenors) != len(par_rates) or not tenors:
+            raise ValueError("tenors and par_rates must be non-empty and of the same length")
+        legs = [
+            (as_of, IRSPricer.tenor_end_date(as_of, tenor), fixed_frequency, day_count, business_day_convention)
+            for tenor in tenors
+        ]
+        pillars = [IRSPricer.payment_schedule(*leg[:3], business_day_convention)[-1] for leg in legs]
+        if any(np.diff(np.array(pillars, dtype="datetime64[D]")).astype(int) <= 0):
+            raise ValueError("Tenors must be in increasing order of maturity")
+
+        log_dfs = []
+        for i, (leg, rate) in enumerate(zip(legs, par_rates)):
+            def residual(log_df):
+                pricer = IRSPricer(DiscountCurve(as_of, pillars[:i + 1], np.exp(log_dfs + [log_df])))
+                annuity, projection = pricer.leg_values([leg])
+                return rate * annuity[0] - projection[0]
+            log_dfs.append(brentq(residual, -10.0, 1.0, xtol=1e-14))
+
+        curve = DiscountCurve(as_of, pillars, np.exp(log_dfs))
+        annuity, _, annuity_gradient, projection_gradient = IRSPricer(curve).leg_values(legs, gradients=True)
+        residual_gradient = np.asarray(par_rates)[:, np.newaxis] * annuity_gradient - projection_gradient
+        curve.factor_names = list(tenors)
+        curve.factor_jacobian = -np.linalg.solve(residual_gradient, np.diag(annuity))
+        IRSPricer._curves.set(key, curve)
+        return curve
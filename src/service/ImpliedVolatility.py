@@ -1,12 +1,11 @@
 import numpy as np
-from scipy.stats import norm
 from .BlackScholes import BlackScholes
 
 class ImpliedVolatility:
     @staticmethod
     def vega(S, K, T, r, sigma, q):
         d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-        return S * np.exp(-q * T) * np.sqrt(T) * norm.pdf(d1)
+        return S * np.exp(-q * T) * np.sqrt(T) * np.exp(-d1**2 / 2) / np.sqrt(2 * np.pi)
 
     @staticmethod
     def implied_volatility(S, K, T, r, q, option_premium, option_type = 'call', tolerance=1e-8, max_iter=100):
@@ -23,4 +22,76 @@ class ImpliedVolatility:
             sigmadiff = abs(increment)
 
         return sigma
-        
\ No newline at end of file
+        
+    @staticmethod
+    def implied_volatility_batch(S, K, T, r, q, option_premium, option_type, tolerance=1e-8, max_iter=100,
+                                 sigma_lower=1e-6, sigma_upper=10.0):
+        S, K, T, r, q, option_premium = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (S, K, T, r, q, option_premium)))
+        is_call = np.broadcast_to(np.asarray(option_type) == 'call', S.shape)
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            forward_S = S * np.exp(-q * T)
+            discounted_K = K * np.exp(-r * T)
+            # Solve every quote as a call through put-call parity, so vega and the bracket are shared.
+            call_premium = np.where(is_call, option_premium, option_premium + forward_S - discounted_K)
+            valid = (T > 0) & (call_premium > np.maximum(forward_S - discounted_K, 0)) & (call_premium < forward_S)
+
+            # Corrado-Miller rational approximation, falling back to the original guess where it breaks down.
+            moneyness = forward_S - discounted_K
+            x = call_premium - 0.5 * moneyness
+            sigma = (np.sqrt(2 * np.pi / T) / (forward_S + discounted_K)
+                     * (x + np.sqrt(np.maximum(x ** 2 - moneyness ** 2 / np.pi, 0))))
+            sigmahat = np.sqrt(2 * np.abs(np.log(S / K) + (r - q) * T) / T)
+            sigma = np.where(np.isfinite(sigma) & (sigma > sigma_lower), sigma, sigmahat)
+            sigma = np.clip(np.where(np.isfinite(sigma), sigma, 0.2), sigma_lower, sigma_upper)
+
+            lower = np.full(S.shape, sigma_lower)
+            upper = np.full(S.shape, sigma_upper)
+            iterations = np.zeros(S.shape, dtype=int)
+            converged = np.zeros(S.shape, dtype=bool)
+            active = valid.copy()
+
+            for _ in range(max_iter):
+                if not active.any():
+                    break
+                idx = np.flatnonzero(active)
+                s = sigma[idx]
+                price = BlackScholes.european_option_price(S[idx], K[idx], T[idx], r[idx], s, q[idx], 'call')
+                diff = price - call_premium[idx]
+                upper[idx] = np.where(diff > 0, np.minimum(upper[idx], s), upper[idx])
+                lower[idx] = np.where(diff <= 0, np.maximum(lower[idx], s), lower[idx])
+
+                vega = ImpliedVolatility.vega(S[idx], K[idx], T[idx], r[idx], s, q[idx])
+                increment = diff / vega
+                new_sigma = s - increment
+                iterations[idx] += 1
+
+                done = np.abs(increment) < tolerance
+                stalled = ~done & (~np.isfinite(new_sigma) | (new_sigma <= lower[idx]) | (new_sigma >= upper[idx]))
+                sigma[idx] = np.where(stalled, s, new_sigma)
+                converged[idx[done]] = True
+                active[idx[done | stalled]] = False
+
+            # Bisection on the bracket tightened by the Newton iterates for every quote Newton did not settle.
+            pending = valid & ~converged
+            for _ in range(max_iter):
+                if not pending.any():
+                    break
+                idx = np.flatnonzero(pending)
+                mid = 0.5 * (lower[idx] + upper[idx])
+                price = BlackScholes.european_option_price(S[idx], K[idx], T[idx], r[idx], mid, q[idx], 'call')
+                above = price > call_premium[idx]
+                upper[idx] = np.where(above, mid, upper[idx])
+                lower[idx] = np.where(above, lower[idx], mid)
+                sigma[idx] = 0.5 * (lower[idx] + upper[idx])
+                iterations[idx] += 1
+
+                done = (upper[idx] - lower[idx]) < tolerance
+                converged[idx[done]] = True
+                pending[idx[done]] = False
+
+        # A root pinned to the initial bracket edge means the quote lies outside the volatilities searched.
+        converged &= (sigma > sigma_lower + tolerance) & (sigma < sigma_upper - tolerance)
+        sigma = np.where(converged, sigma, np.nan)
+        return sigma, iterations, converged
@@ -1,57 +1,226 @@
+import functools
 import numpy as np
 import math
-import pandas as pd
-from scipy.stats import norm, qmc
-import dask.dataframe as dd
+import time
+from .ParallelMonteCarlo import ParallelMonteCarlo
+from .QuasiMonteCarlo import QuasiMonteCarlo
+from .RunningStatistics import RunningStatistics
+from .ScenarioStatistics import ScenarioStatistics
+from .VarianceReduction import VarianceReduction
+from ..util.Metrics import metrics
+
 class KIKOPutOption:
     @staticmethod
-    def price_kiko_put_with_delta(S, K, T, r, sigma, L, U, n, R, seed=7405, deltaS=0.2):
-        np.random.seed(seed)
+    def price_kiko_put_with_delta(S, K, T, r, sigma, L, U, n, R, seed=7405, deltaS=0.2, M=int(1e6), workers=1, chunk_size=2**15, progress=None,
+                                  greeks=False, precision='float64', variance_reduction=(), efficiency=False):
+        """
+        Value, delta and 95% confidence interval of a knock-in knock-out put. Delta is a central difference
+        over S +/- deltaS on shared paths, unless greeks is set: then delta, gamma and vega all come from
+        likelihood-ratio estimators on the unbumped paths, returned as a fourth element mapping each
+        name to (value, std_error). precision 'float32' builds the normals and log-paths in single precision.
+        variance_reduction combines any of 'antithetic', 'moment_matching' and 'importance_sampling'.
+        With efficiency, the last element returned is the ParallelMonteCarlo.efficiency report of the run.
+        """
+        techniques = VarianceReduction.validate(variance_reduction)
+        if greeks:
+            return KIKOPutOption.price_kiko_put_with_greeks(
+                S, K, T, r, sigma, L, U, n, R, seed, M, workers, chunk_size, progress, precision, techniques, efficiency
+            )
+
+        def estimate(statistics):
+            return statistics.mean[2], statistics.std(ddof=1)[2] / math.sqrt(statistics.count)
+
+        start = time.perf_counter()
+        spots = np.array([S - deltaS, S + deltaS, S])
+        statistics = ParallelMonteCarlo.run(
+            KIKOPutOption.kiko_put_statistics, M, seed, workers, spots, K, T, r, sigma, L, U, n, R, chunk_size, False, precision, techniques,
+            progress=ParallelMonteCarlo.progress_reporter(progress, estimate)
+        )
+        seconds = time.perf_counter() - start
+
+        value_down, value_up, value = statistics.mean
+        std_error = statistics.std(ddof=1)[2] / math.sqrt(statistics.count)
+        conf_interval = (value - 1.96 * std_error, value + 1.96 * std_error)
+        delta = (value_up - value_down) / (2 * deltaS)
+
+        if efficiency:
+            return value, delta, conf_interval, ParallelMonteCarlo.efficiency(std_error, seconds, M)
+        return value, delta, conf_interval
+
+    @staticmethod
+    def price_kiko_put_with_greeks(S, K, T, r, sigma, L, U, n, R, seed=7405, M=int(1e6), workers=1, chunk_size=2**15, progress=None,
+                                   precision='float64', variance_reduction=(), efficiency=False):
+        """
+        The barriers make the payoff discontinuous in the path, so pathwise derivatives do not apply;
+        each Greek is the payoff times the derivative of the log density of the simulated increments.
+        """
+        techniques = VarianceReduction.validate(variance_reduction)
+
+        def estimate(statistics):
+            return statistics.mean[0], statistics.std(ddof=1)[0] / math.sqrt(statistics.count)
+
+        start = time.perf_counter()
+        statistics = ParallelMonteCarlo.run(
+            KIKOPutOption.kiko_put_statistics, M, seed, workers, np.array([S]), K, T, r, sigma, L, U, n, R, chunk_size, True, precision,
+            techniques, progress=ParallelMonteCarlo.progress_reporter(progress, estimate)
+        )
+        seconds = time.perf_counter() - start
+
+        means = statistics.mean
+        std_errors = statistics.std(ddof=1) / math.sqrt(statistics.count)
+        value = means[0]
+        conf_interval = (value - 1.96 * std_errors[0], value + 1.96 * std_errors[0])
+        greeks = {name: (means[i], std_errors[i]) for i, name in enumerate(("delta", "gamma", "vega"), start=1)}
+        if efficiency:
+            return value, greeks["delta"][0], conf_interval, greeks, ParallelMonteCarlo.efficiency(std_errors[0], seconds, M)
+        return value, greeks["delta"][0], conf_interval, greeks
+
+    @staticmethod
+    def kiko_put_statistics(M, seed, spots, K, T, r, sigma, L, U, n, R, chunk_size, greeks=False, precision='float64', techniques=frozenset(),
+                            progress=None):
+        """
+        Simulate M scrambled Sobol paths and return the running payoff statistics for each spot,
+        followed by the likelihood-ratio delta, gamma and vega columns at the last spot when greeks is set.
+        Worker streams arrive as a SeedSequence and seed the scrambling through a Generator.
+        Log-paths are built in the working precision; payoffs and statistics stay in float64. Importance
+        sampling shifts every increment by kiko_drift_shift and weights the payoffs by the likelihood ratio
+        before the Greeks are taken, so their scores use the increments actually simulated.
+        progress, if given, is called with the statistics after every chunk.
+        """
+        deltaT = T / n
+        dtype = ParallelMonteCarlo.precision_dtype(precision)
+        drift = dtype.type((r - 0.5 * sigma**2) * deltaT)
+        step = dtype.type(sigma * np.sqrt(deltaT))
+        draw = QuasiMonteCarlo.normal_draws('sobol', n, seed, M, dtype)
+        shift = KIKOPutOption.kiko_drift_shift(spots[-1], T, r, sigma, L, n) if "importance_sampling" in techniques else 0.0
+        statistics = RunningStatistics(len(spots) + 3 if greeks else len(spots))
+
+        timer = functools.partial(metrics.time, "engine_phase_seconds", engine="kiko_put")
+
+        for start in range(0, M, chunk_size):
+            with timer(phase="random"):
+                Z = VarianceReduction.normals(draw, min(chunk_size, M - start), techniques)
+            with timer(phase="paths"):
+                if shift:
+                    likelihood = VarianceReduction.likelihood_ratio(Z, np.full(n, shift))
+                    Z = Z + dtype.type(shift)
+                log_paths = np.cumsum(drift + step * Z, axis=1)
+                path_max = log_paths.max(axis=1)
+                path_min = log_paths.min(axis=1)
+            with timer(phase="payoff"):
+                payoffs = np.column_stack([
+                    KIKOPutOption.kiko_put_payoffs(log_paths, path_max, path_min, s, K, T, r, L, U, R, deltaT)
+                    for s in spots
+                ])
+                if shift:
+                    payoffs *= likelihood[:, np.newaxis]
+                if greeks:
+                    payoffs = np.column_stack((payoffs, KIKOPutOption.likelihood_ratio_greeks(payoffs[:, -1], Z, spots[-1], sigma, deltaT)))
+            with timer(phase="reduction"):
+                samples = VarianceReduction.pair_average(payoffs, techniques)
+                statistics.update(samples, len(samples) * VarianceReduction.paths_per_sample(techniques))
+            if progress is not None:
+                progress(statistics)
+        return statistics
+
+    @staticmethod
+    def kiko_put_scenarios(S, K, T, r, sigma, L, U, n, R, spot_shifts, vol_shifts, seed=7405, M=int(1e6), workers=1, chunk_size=2**15,
+                           precision='float64', variance_reduction=()):
+        """
+        Values, standard errors and 95% confidence intervals of a knock-in knock-out put on the grid of spots
+        S * (1 + spot_shift) by volatilities sigma + vol_shift, as arrays of shape (spots, vols) and (spots, vols, 2).
+        Every cell is priced from the same Sobol normals (common random numbers), so the unshocked cell
+        matches the value of price_kiko_put_with_delta up to rounding.
+        """
+        techniques = VarianceReduction.validate(variance_reduction)
+        if "importance_sampling" in techniques:
+            raise ValueError("importance_sampling shifts the paths of each spot and volatility, so scenario cells cannot share them.")
+        spots, sigmas = ScenarioStatistics.axes(S, sigma, spot_shifts, vol_shifts)
+
+        statistics = ParallelMonteCarlo.run(
+            KIKOPutOption.kiko_put_scenario_statistics, M, seed, workers, spots, K, T, r, sigmas, L, U, n, R, chunk_size, precision, techniques
+        )
+
+        values = np.array([cell.mean[0] for cell in statistics.cells]).reshape(statistics.shape)
+        std_errors = np.array([cell.std(ddof=1)[0] / math.sqrt(cell.count) for cell in statistics.cells]).reshape(statistics.shape)
+        conf_intervals = np.stack((values - 1.96 * std_errors, values + 1.96 * std_errors), axis=-1)
+        return values, std_errors, conf_intervals
+
+    @staticmethod
+    def kiko_put_scenario_statistics(M, seed, spots, K, T, r, sigmas, L, U, n, R, chunk_size, precision='float64', techniques=frozenset(),
+                                     progress=None):
+        """
+        Draw M Sobol normal vectors once and return the payoff statistics of every (spot, sigma) cell.
+        Log-paths and their extrema are rebuilt from the same normals for each sigma and shared by all spots.
+        """
         deltaT = T / n
-        M = int(1e6)
-        sequencer = qmc.Sobol(d=n, seed=seed)
-        X = np.array(sequencer.random(n=M))
-        Z = norm.ppf(X)
-
-        samples = (r - 0.5 * sigma**2) * deltaT + sigma * np.sqrt(deltaT) * Z
-        df_samples = pd.DataFrame(samples)
-        df_samples_cumsum = df_samples.cumsum(axis=1)
-
-        ddf_stocks_base = dd.from_pandas(df_samples_cumsum, npartitions=4)
-
-        list_s = [("down", S - deltaS), ("up", S + deltaS), ("S", S)]
-        value_local = {}
-
-        for (s_str, s) in list_s:
-            ddf_stocks = ddf_stocks_base.map_partitions(lambda df: s * np.exp(df))
-            
-            def calculate_payoff(row):
-                ds_path_local = row.values
-                price_max = ds_path_local.max()
-                price_min = ds_path_local.min()
-
-                if price_max >= U:
-                    knockout_time = np.argmax(ds_path_local >= U) + 1
-                    return R * np.exp(-r * knockout_time * deltaT)
-                elif price_min <= L:
-                    final_price = ds_path_local[-1]
-                    return np.exp(-r * T) * max(K - final_price, 0)
-                else:
-                    return 0
-
-            payoffs = ddf_stocks.apply(calculate_payoff, axis=1, meta=('payoff', 'float64'))
-            
-            value = payoffs.mean().compute()
-            std = payoffs.std().compute()
-            value_local[s_str] = value
-
-            if s_str == 'S':
-                value_local['std'] = std
-                conf_interval_lower = value - 1.96 * std / math.sqrt(M)
-                conf_interval_upper = value + 1.96 * std / math.sqrt(M)
-                value_local['conf_interval'] = (conf_interval_lower, conf_interval_upper)
-
-        delta = (value_local['up'] - value_local['down']) / (2 * deltaS)
-
-        return value_local['S'], delta, value_local['conf_interval']
-    
\ No newline at end of file
+        dtype = ParallelMonteCarlo.precision_dtype(precision)
+        draw = QuasiMonteCarlo.normal_draws('sobol', n, seed, M, dtype)
+        statistics = ScenarioStatistics((len(spots), len(sigmas)))
+        paths_per_sample = VarianceReduction.paths_per_sample(techniques)
+
+        timer = functools.partial(metrics.time, "engine_phase_seconds", engine="kiko_put_scenario")
+
+        for start in range(0, M, chunk_size):
+            with timer(phase="random"):
+                Z = VarianceReduction.normals(draw, min(chunk_size, M - start), techniques)
+            for j, sigma in enumerate(sigmas):
+                with timer(phase="paths"):
+                    drift = dtype.type((r - 0.5 * sigma**2) * deltaT)
+                    step = dtype.type(sigma * np.sqrt(deltaT))
+                    log_paths = np.cumsum(drift + step * Z, axis=1)
+                    path_max = log_paths.max(axis=1)
+                    path_min = log_paths.min(axis=1)
+                for i, spot in enumerate(spots):
+                    with timer(phase="payoff"):
+                        payoffs = KIKOPutOption.kiko_put_payoffs(log_paths, path_max, path_min, spot, K, T, r, L, U, R, deltaT)
+                    with timer(phase="reduction"):
+                        samples = VarianceReduction.pair_average(payoffs, techniques)
+                        statistics.cell(i, j).update(samples, len(samples) * paths_per_sample)
+            if progress is not None:
+                progress(statistics)
+        return statistics
+
+    @staticmethod
+    def kiko_drift_shift(S, T, r, sigma, L, n):
+        """
+        Shift of each normal increment for importance sampling, moving the median terminal price down to the
+        lower barrier so knock-ins stop being rare. Zero when the median path already ends below the barrier.
+        """
+        shift = (np.log(L / S) - (r - 0.5 * sigma**2) * T) / (sigma * np.sqrt(T / n) * n)
+        return float(min(shift, 0.0))
+
+    @staticmethod
+    def likelihood_ratio_greeks(payoffs, Z, S, sigma, deltaT):
+        """
+        Per-path delta, gamma and vega estimators of payoffs driven by the standard normal increments Z.
+        Only the first increment depends on S, with score Z_1 / (S sigma sqrt(dt)); every increment
+        depends on sigma, with score (Z^2 - 1) / sigma - Z sqrt(dt).
+        """
+        step = sigma * np.sqrt(deltaT)
+        Z1 = Z[:, 0]
+        delta = payoffs * Z1 / (S * step)
+        gamma = payoffs * ((Z1**2 - 1) / step**2 - Z1 / step) / S**2
+        vega = payoffs * np.sum((Z**2 - 1) / sigma - Z * np.sqrt(deltaT), axis=1)
+        return np.column_stack((delta, gamma, vega))
+
+    @staticmethod
+    def kiko_put_payoffs(log_paths, path_max, path_min, S, K, T, r, L, U, R, deltaT):
+        """
+        Discounted KIKO put payoffs for paths given as cumulative log-returns from spot S,
+        with the running extrema of the log-paths precomputed so bumped spots can share them
+        """
+        log_U = log_paths.dtype.type(np.log(U / S))
+        log_L = log_paths.dtype.type(np.log(L / S))
+
+        knocked_out = path_max >= log_U
+        knocked_in = ~knocked_out & (path_min <= log_L)
+
+        payoffs = np.zeros(log_paths.shape[0])
+        out_paths = np.flatnonzero(knocked_out)
+        knockout_time = np.argmax(log_paths[out_paths] >= log_U, axis=1) + 1
+        payoffs[out_paths] = R * np.exp(-r * knockout_time * deltaT)
+
+        final_price = S * np.exp(log_paths[knocked_in, -1])
+        payoffs[knocked_in] = np.exp(-r * T) * np.maximum(K - final_price, 0)
+        return payoffs
@@ -0,0 +1,248 @@
+import multiprocessing
+import os
+import threading
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from .QuasiMonteCarlo import QuasiMonteCarlo
+from .RunningStatistics import RunningStatistics
+from ..util.Metrics import metrics
+
+PRECISIONS = {"float64": np.float64, "float32": np.float32}
+MAX_WORKERS = os.cpu_count() or 1
+
+class ParallelMonteCarlo:
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    @staticmethod
+    def precision_dtype(precision: str) -> np.dtype:
+        """
+        Working dtype of the normals and paths of a simulation. Payoffs are folded into
+        RunningStatistics in float64 whatever the working precision.
+        """
+        if precision not in PRECISIONS:
+            raise ValueError("Invalid precision. Must be 'float64' or 'float32'.")
+        return np.dtype(PRECISIONS[precision])
+
+    @staticmethod
+    def split_paths(m: int, workers: int) -> list:
+        """Split a path budget of m as evenly as possible across workers"""
+        return [m // workers + (1 if i < m % workers else 0) for i in range(workers)]
+
+    @staticmethod
+    def replicate_paths(m: int, replicates: int) -> int:
+        """
+        Paths of every Sobol replicate: the largest power of two within m / replicates, so each replicate
+        keeps the balance properties of the Sobol points. Needs at least two paths per replicate.
+        """
+        if m < 2 * replicates:
+            raise ValueError("m must be at least 2 * replicates, so every Sobol replicate has two paths.")
+        return 1 << ((m // replicates).bit_length() - 1)
+
+    @staticmethod
+    def check_workers(workers: int) -> None:
+        if not 1 <= workers <= MAX_WORKERS:
+            raise ValueError(f"workers must be between 1 and {MAX_WORKERS}, the number of CPUs.")
+
+    @staticmethod
+    def get_executor() -> ProcessPoolExecutor:
+        """
+        Return the process pool of MAX_WORKERS processes shared by every request, created once under a
+        lock so concurrent requests and job threads never build a second one
+        """
+        with ParallelMonteCarlo._executor_lock:
+            if ParallelMonteCarlo._executor is None:
+                ParallelMonteCarlo._executor = ProcessPoolExecutor(
+                    max_workers=MAX_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return ParallelMonteCarlo._executor
+
+    @staticmethod
+    def progress_reporter(progress, estimate):
+        """
+        Adapt a progress(paths_done, price, conf_interval) callback to receive running statistics,
+        using estimate(statistics) -> (price, std_error). Returns None when progress is None.
+        """
+        if progress is None:
+            return None
+
+        def report(statistics):
+            price, std_error = estimate(statistics)
+            progress(statistics.paths, price, [price - 1.96 * std_error, price + 1.96 * std_error])
+        return report
+
+    @staticmethod
+    @contextmanager
+    def instrument(simulate, m: int):
+        """Record the paths, wall time and throughput of a completed run, labelled by the simulate function"""
+        engine = simulate.__name__.removesuffix("_statistics")
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+        metrics.inc("monte_carlo_paths_total", m, engine=engine)
+        metrics.observe("monte_carlo_run_seconds", seconds, engine=engine)
+        if seconds > 0:
+            metrics.set("monte_carlo_paths_per_second", m / seconds, engine=engine)
+
+    @staticmethod
+    def price(simulate, estimate, m: int, seed, workers: int, sampling: str, replicates: int, *args, progress=None):
+        """
+        Price, standard error and 95% confidence interval of a Monte Carlo engine.
+        simulate(paths, seed, *args, sampling) -> RunningStatistics simulates a block of paths and
+        estimate(statistics) -> (price, std_error) turns statistics into an estimate. Pseudo-random
+        sampling pools all paths and uses the normal interval; Sobol sampling runs independently
+        scrambled replicates and builds the interval from the spread of the replicate estimates.
+        """
+        result = ParallelMonteCarlo.sample(simulate, estimate, m, seed, workers, sampling, replicates, *args, progress=progress)
+        return ParallelMonteCarlo.interval(result, estimate, sampling)
+
+    @staticmethod
+    def sample(simulate, estimate, m: int, seed, workers: int, sampling: str, replicates: int, *args, progress=None, batched=False):
+        """
+        Run the simulation behind price and return its raw result: the pooled RunningStatistics for
+        pseudo-random sampling, or the list of per-replicate RunningStatistics for Sobol sampling.
+        With batched, pseudo-random paths are also split into replicates independent batches: moment
+        matching ties together the paths it rescales, so only whole batches are independent samples.
+        Several estimates can then be taken from the same paths with interval.
+        """
+        def report(replicate_statistics):
+            price, _, conf_interval = QuasiMonteCarlo.replicate_interval([estimate(s)[0] for s in replicate_statistics])
+            progress(sum(s.paths for s in replicate_statistics), price, conf_interval)
+
+        if sampling == 'pseudo' and not batched:
+            return ParallelMonteCarlo.run(
+                simulate, m, seed, workers, *args, sampling,
+                progress=ParallelMonteCarlo.progress_reporter(progress, estimate)
+            )
+
+        elif sampling == 'pseudo':
+            if m < 2 * replicates:
+                raise ValueError("m must be at least 2 * replicates, so every moment-matched batch has two paths.")
+            return ParallelMonteCarlo.run_replicates(
+                simulate, ParallelMonteCarlo.split_paths(m, replicates), seed, workers, *args, sampling,
+                progress=None if progress is None else report
+            )
+
+        elif sampling == 'sobol':
+            return ParallelMonteCarlo.run_replicates(
+                simulate, [ParallelMonteCarlo.replicate_paths(m, replicates)] * replicates, seed, workers, *args, sampling,
+                progress=None if progress is None else report
+            )
+
+        else:
+            raise ValueError("Invalid sampling. Must be 'pseudo' or 'sobol'.")
+
+    @staticmethod
+    def paths(result) -> int:
+        """Paths simulated for a sample result, which Sobol replicates round down to powers of two"""
+        return sum(statistics.paths for statistics in result) if isinstance(result, list) else result.paths
+
+    @staticmethod
+    def interval(result, estimate, sampling: str):
+        """
+        Estimate, standard error and 95% confidence interval of estimate(statistics) on a sample result.
+        Results of several replicates or batches take their interval from the spread of the per-replicate estimates.
+        """
+        if sampling not in ('pseudo', 'sobol'):
+            raise ValueError("Invalid sampling. Must be 'pseudo' or 'sobol'.")
+        if isinstance(result, list):
+            return QuasiMonteCarlo.replicate_interval([estimate(s)[0] for s in result])
+        else:
+            value, std_error = estimate(result)
+            return value, std_error, [value - 1.96 * std_error, value + 1.96 * std_error]
+
+    @staticmethod
+    def efficiency(std_error: float, seconds: float, paths: int) -> dict:
+        """
+        Cost of a run's accuracy: the estimator variance times the runtime, which stays constant as
+        the path count grows, so runs of different sizes and techniques compare directly. Its inverse
+        is the efficiency; a variance reduction pays for itself when it raises the efficiency.
+        """
+        variance_time = std_error**2 * seconds
+        return {
+            "std_error": std_error,
+            "seconds": seconds,
+            "paths": paths,
+            "variance_time_product": variance_time,
+            "efficiency": 1 / variance_time if variance_time > 0 else float("inf"),
+        }
+
+    @staticmethod
+    def column_estimate(column: int, scale: float = 1.0):
+        """estimate(statistics) -> (mean, std_error) of one statistics column, multiplied by scale"""
+        def estimate(statistics):
+            return scale * statistics.mean[column], abs(scale) * statistics.std(ddof=1)[column] / np.sqrt(statistics.count)
+        return estimate
+
+    @staticmethod
+    def run(simulate, m: int, seed, workers: int, *args, progress=None) -> RunningStatistics:
+        """
+        Run simulate(paths, seed, *args) -> RunningStatistics and merge the results.
+        With one worker the simulation runs in-process on seed itself; otherwise each worker
+        gets an independent stream spawned from SeedSequence(seed), and the per-worker statistics
+        are merged in worker order so the result is deterministic for a given (seed, workers).
+        progress(statistics) is called after every chunk in-process, or after every merged worker.
+        An exception raised by progress stops the simulation and cancels the workers not yet started.
+        """
+        ParallelMonteCarlo.check_workers(workers)
+        with ParallelMonteCarlo.instrument(simulate, m):
+            if workers == 1:
+                return simulate(m, seed, *args, progress=progress)
+
+            seed_sequences = np.random.SeedSequence(seed).spawn(workers)
+            executor = ParallelMonteCarlo.get_executor()
+            futures = [
+                executor.submit(simulate, paths, seed_sequence, *args)
+                for paths, seed_sequence in zip(ParallelMonteCarlo.split_paths(m, workers), seed_sequences)
+                if paths > 0
+            ]
+
+            statistics = None
+            try:
+                for future in futures:
+                    result = future.result()
+                    statistics = result if statistics is None else statistics.merge(result)
+                    if progress is not None:
+                        progress(statistics)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+            return statistics
+
+    @staticmethod
+    def run_replicates(simulate, paths: list, seed, workers: int, *args, progress=None) -> list:
+        """
+        Run simulate(count, seed, *args) -> RunningStatistics once per independent replicate, with the
+        path count of each replicate in paths, and return the per-replicate statistics in replicate order.
+        Replicate streams are spawned from SeedSequence(seed) and are distributed over the process pool
+        when workers > 1. progress(statistics_so_far) is called after every finished replicate.
+        """
+        ParallelMonteCarlo.check_workers(workers)
+        replicates = len(paths)
+        with ParallelMonteCarlo.instrument(simulate, sum(paths)):
+            seed_sequences = np.random.SeedSequence(seed).spawn(replicates)
+            results = []
+
+            if workers == 1:
+                for count, seed_sequence in zip(paths, seed_sequences):
+                    results.append(simulate(count, seed_sequence, *args))
+                    if progress is not None:
+                        progress(results)
+                return results
+
+            executor = ParallelMonteCarlo.get_executor()
+            futures = [executor.submit(simulate, count, seed_sequence, *args) for count, seed_sequence in zip(paths, seed_sequences)]
+            try:
+                for future in futures:
+                    results.append(future.result())
+                    if progress is not None:
+                        progress(results)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+            return results
@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import numpy as np
+from scipy.interpolate import RegularGridInterpolator
+from .AmericanOption import AmericanOption
+from .ArithmeticOption import ArithmeticOption
+
+AXES = ("moneyness", "T", "sigma", "r")
+
+DEFAULT_GRIDS = {
+    "american": {
+        "moneyness": np.linspace(0.5, 1.5, 41),
+        "T": np.array([0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0]),
+        "sigma": np.linspace(0.05, 0.8, 16),
+        "r": np.linspace(0.005, 0.1, 6),
+    },
+    "arithmetic-asian": {
+        "moneyness": np.linspace(0.6, 1.4, 17),
+        "T": np.array([0.1, 0.25, 0.5, 1.0, 2.0, 3.0]),
+        "sigma": np.linspace(0.1, 0.6, 6),
+        "r": np.linspace(0.01, 0.09, 4),
+    },
+}
+
+class PriceSurface:
+    def __init__(self, model: str, key: dict, axes: dict, values: np.ndarray, errors: np.ndarray):
+        """
+        Prices of a model on a grid over normalized inputs (moneyness S/K, T, sigma, r).
+        Both pricing models are homogeneous of degree one in (S, K), so values hold price / K
+        and a quote for any strike is K times the interpolated value.
+        model: "american" or "arithmetic-asian"
+        key: Contract parameters the surface was built for, e.g. {"option_type": "put"}
+        errors: Numerical error of each grid value (tree step-halving change or Monte Carlo interval half-width)
+        """
+        self.model = model
+        self.key = key
+        self.axes = {name: np.asarray(axes[name], dtype=float) for name in AXES}
+        self.values = np.asarray(values, dtype=float)
+        self.errors = np.asarray(errors, dtype=float)
+        grid = tuple(self.axes[name] for name in AXES)
+        self._cubic = RegularGridInterpolator(grid, self.values, method="cubic")
+        self._linear = RegularGridInterpolator(grid, self.values, method="linear")
+        self._errors = RegularGridInterpolator(grid, self.errors, method="linear")
+
+    def contains(self, moneyness, T, sigma, r) -> bool:
+        point = dict(zip(AXES, (moneyness, T, sigma, r)))
+        return all(self.axes[name][0] <= point[name] <= self.axes[name][-1] for name in AXES)
+
+    def quote(self, S, K, T, sigma, r):
+        """
+        Interpolated price and error bound, or None when the query lies outside the grid.
+        The bound adds the gap between cubic and linear interpolation, a local estimate of the
+        interpolation error, to the numerical error of the surrounding grid values.
+        """
+        if not self.contains(S / K, T, sigma, r):
+            return None
+        point = np.array([[S / K, T, sigma, r]])
+        cubic = self._cubic(point)[0]
+        linear = self._linear(point)[0]
+        error_bound = abs(cubic - linear) + self._errors(point)[0]
+        return K * cubic, K * error_bound
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(
+            path,
+            metadata=json.dumps({"model": self.model, "key": self.key}),
+            values=self.values,
+            errors=self.errors,
+            **{f"axis_{name}": self.axes[name] for name in AXES}
+        )
+
+    @staticmethod
+    def load(path: str) -> "PriceSurface":
+        with np.load(path) as data:
+            metadata = json.loads(str(data["metadata"]))
+            axes = {name: data[f"axis_{name}"] for name in AXES}
+            return PriceSurface(metadata["model"], metadata["key"], axes, data["values"], data["errors"])
+
+    @staticmethod
+    def build(model: str, key: dict, axes: dict, price_slice, progress=None) -> "PriceSurface":
+        """
+        Fill a surface by calling price_slice(moneyness, T, sigma, r) -> (values, errors), which prices
+        the whole moneyness axis at once for one (T, sigma, r) node, with values normalized by K.
+        """
+        shape = tuple(len(axes[name]) for name in AXES)
+        values = np.zeros(shape)
+        errors = np.zeros(shape)
+        nodes = [(i, j, k) for i in range(shape[1]) for j in range(shape[2]) for k in range(shape[3])]
+        for done, (i, j, k) in enumerate(nodes, start=1):
+            values[:, i, j, k], errors[:, i, j, k] = price_slice(axes["moneyness"], axes["T"][i], axes["sigma"][j], axes["r"][k])
+            if progress is not None:
+                progress(done, len(nodes))
+        return PriceSurface(model, key, axes, values, errors)
+
+    @staticmethod
+    def build_american(option_type: str, axes: dict = None, n: int = 1000, extrapolation: str = "bbsr", progress=None) -> "PriceSurface":
+        """
+        Price every moneyness of a node as strikes 1 / moneyness on one unit-spot lattice.
+        The change from halving the number of steps is recorded as the error of each value.
+        """
+        def price_slice(moneyness, T, sigma, r):
+            strikes = 1 / moneyness
+            prices = AmericanOption.binomial_tree_american_option_prices(1.0, strikes, T, r, sigma, n, option_type, extrapolation)
+            coarse = AmericanOption.binomial_tree_american_option_prices(1.0, strikes, T, r, sigma, n // 2, option_type, extrapolation)
+            return prices / strikes, np.abs(prices - coarse) / strikes
+
+        key = {"option_type": option_type}
+        return PriceSurface.build("american", key, axes or DEFAULT_GRIDS["american"], price_slice, progress)
+
+    @staticmethod
+    def build_arithmetic_asian(option_type: str, n: int, axes: dict = None, m: int = 2**15, progress=None) -> "PriceSurface":
+        """Price every node with Sobol sampling and the geometric control variate"""
+        def price_slice(moneyness, T, sigma, r):
+            values, errors = np.zeros(len(moneyness)), np.zeros(len(moneyness))
+            for i, S in enumerate(moneyness):
+                price, conf_interval = ArithmeticOption.arithmetic_asian_option_price(
+                    S, 1.0, T, r, sigma, n, m, option_type, 'geometric', sampling='sobol'
+                )
+                values[i], errors[i] = price, (conf_interval[1] - conf_interval[0]) / 2
+            return values, errors
+
+        key = {"option_type": option_type, "n": n}
+        return PriceSurface.build("arithmetic-asian", key, axes or DEFAULT_GRIDS["arithmetic-asian"], price_slice, progress)
+
+class PriceSurfaceStore:
+    def __init__(self):
+        self.surfaces = {}
+
+    @staticmethod
+    def make_key(model: str, key: dict) -> tuple:
+        return (model,) + tuple(sorted(key.items()))
+
+    def add(self, surface: PriceSurface) -> None:
+        self.surfaces[self.make_key(surface.model, surface.key)] = surface
+
+    def find(self, model: str, **key):
+        return self.surfaces.get(self.make_key(model, key))
+
+    @staticmethod
+    def load_directory(directory: str) -> "PriceSurfaceStore":
+        """Load every .npz surface in directory; a missing directory gives an empty store"""
+        store = PriceSurfaceStore()
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".npz"):
+                    store.add(PriceSurface.load(os.path.join(directory, name)))
+        return store
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute price surfaces for the surface quote endpoints")
+    parser.add_argument("model", choices=sorted(DEFAULT_GRIDS))
+    parser.add_argument("--option-type", choices=["call", "put"], required=True)
+    parser.add_argument("--n", type=int, help="Tree steps (american, default 1000) or averaging periods (arithmetic-asian, required)")
+    parser.add_argument("--m", type=int, default=2**15, help="Paths per node (arithmetic-asian)")
+    parser.add_argument("--output-dir", default=os.environ.get("OPTION_PRICER_SURFACE_DIR", "src/surfaces"))
+    args = parser.parse_args()
+
+    def progress(done, total):
+        print(f"\r{done}/{total} nodes", end="", flush=True)
+
+    if args.model == "american":
+        surface = PriceSurface.build_american(args.option_type, n=args.n or 1000, progress=progress)
+        name = f"american-{args.option_type}.npz"
+    else:
+        if args.n is None:
+            parser.error("--n is required for arithmetic-asian surfaces")
+        surface = PriceSurface.build_arithmetic_asian(args.option_type, args.n, m=args.m, progress=progress)
+        name = f"arithmetic-asian-{args.option_type}-n{args.n}.npz"
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    surface.save(os.path.join(args.output_dir, name))
+    print(f"\nSaved {os.path.join(args.output_dir, name)}")
+
+if __name__ == "__main__":
+    main()
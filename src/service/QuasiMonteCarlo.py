@@ -0,0 +1,96 @@
+import functools
+import numpy as np
+import scipy
+from scipy.special import ndtri
+from scipy.stats import qmc, t
+from ..util.NormalBlockCache import normal_blocks
+
+class BrownianBridge:
+    def __init__(self, n: int, T: float):
+        """
+        Brownian bridge construction of W at the n equally spaced times T/n, ..., T.
+        The first normal fixes W(T) and each following one bisects the widest remaining
+        interval, so the leading (best distributed) QMC dimensions carry most of the variance.
+        """
+        self.n = n
+        self.times = T / n * np.arange(1, n + 1)
+        self.steps = []
+
+        time = np.concatenate(([0.0], self.times))
+        intervals = [(0, n)]
+        while intervals:
+            left, right = intervals.pop(0)
+            if right - left < 2:
+                continue
+            mid = (left + right) // 2
+            span = time[right] - time[left]
+            # Plain floats, so float32 normals are not promoted to float64 column by column.
+            self.steps.append((
+                mid, left, right,
+                float((time[right] - time[mid]) / span),
+                float((time[mid] - time[left]) / span),
+                float(np.sqrt((time[mid] - time[left]) * (time[right] - time[mid]) / span))
+            ))
+            intervals.extend([(left, mid), (mid, right)])
+
+    def construct(self, Z: np.ndarray) -> np.ndarray:
+        """Map standard normals of shape (m, n) to Brownian paths W(t_1), ..., W(t_n) of shape (m, n)"""
+        W = np.zeros((Z.shape[0], self.n + 1), dtype=Z.dtype)
+        W[:, self.n] = float(np.sqrt(self.times[-1])) * Z[:, 0]
+        for k, (mid, left, right, weight_left, weight_right, std) in enumerate(self.steps, start=1):
+            W[:, mid] = weight_left * W[:, left] + weight_right * W[:, right] + std * Z[:, k]
+        return W[:, 1:]
+
+class QuasiMonteCarlo:
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def brownian_bridge(n: int, T: float) -> BrownianBridge:
+        return BrownianBridge(n, T)
+
+    @staticmethod
+    def sobol(d: int, seed) -> qmc.Sobol:
+        """Scrambled Sobol sequence seeded by an int, or by a SeedSequence spawned for a replicate or worker"""
+        return qmc.Sobol(d=d, seed=seed if isinstance(seed, (int, np.integer)) else np.random.default_rng(seed))
+
+    @staticmethod
+    def normal_draws(sampling: str, d: int, seed, m: int = None, dtype=np.float64):
+        """
+        Return draw(count) -> the next count standard normal vectors of dimension d, in dtype, from
+        default_rng(seed) ('pseudo') or a scrambled Sobol sequence ('sobol'). Both streams are the same
+        however they are chunked, so with the normal block cache enabled the first m vectors are served
+        from a shared memory-mapped block instead of being generated again.
+        """
+        if sampling == 'pseudo':
+            def make_draw():
+                rng = np.random.default_rng(seed)
+                return lambda count: rng.standard_normal((count, d), dtype=dtype)
+        elif sampling == 'sobol':
+            def make_draw():
+                sequencer = QuasiMonteCarlo.sobol(d, seed)
+                return lambda count: QuasiMonteCarlo.normals(sequencer, count, dtype)
+        else:
+            raise ValueError("Invalid sampling. Must be 'pseudo' or 'sobol'.")
+        return normal_blocks.stream(sampling, seed, d, m, dtype, make_draw, version=f"-scipy{scipy.__version__}")
+
+    @staticmethod
+    def normals(sequencer: qmc.Sobol, count: int, dtype=np.float64) -> np.ndarray:
+        """
+        Standard normals of the next count points of a Sobol sequence, in dtype. Points that round
+        to 0 or 1 in float32 are kept inside the unit interval so their normals stay finite.
+        """
+        u = sequencer.random(count)
+        if dtype != np.float64:
+            u = np.clip(u.astype(dtype), np.finfo(dtype).tiny, 1 - np.finfo(dtype).epsneg)
+        return ndtri(u)
+
+    @staticmethod
+    def replicate_interval(estimates, confidence: float = 0.95):
+        """
+        Price, standard error and confidence interval from independently randomized QMC replicates.
+        The interval uses the Student t quantile since the number of replicates is small.
+        """
+        estimates = np.asarray(estimates, dtype=float)
+        price = estimates.mean()
+        std_error = estimates.std(ddof=1) / np.sqrt(len(estimates)) if len(estimates) > 1 else np.nan
+        half_width = t.ppf(0.5 + confidence / 2, max(len(estimates) - 1, 1)) * std_error
+        return price, std_error, [price - half_width, price + half_width]
@@ -0,0 +1,63 @@
+import numpy as np
+
+class RunningStatistics:
+    """
+    Streaming sample mean and co-moment matrix of one or more variables.
+    Chunks are folded in with the pairwise update of Chan et al., so the result
+    does not depend on how the samples were split into chunks or workers.
+    paths counts the simulated paths behind the samples, which differs from count
+    when several paths are averaged into one sample (antithetic pairs).
+    """
+    def __init__(self, dimension: int = 1):
+        self.count = 0
+        self.paths = 0
+        self.mean = np.zeros(dimension)
+        self.comoment = np.zeros((dimension, dimension))
+
+    def update(self, samples, paths: int = None) -> "RunningStatistics":
+        """Fold an array of shape (m,) or (m, dimension), simulated from paths paths (default m), into the statistics"""
+        samples = np.asarray(samples, dtype=np.float64)
+        samples = samples.reshape(samples.shape[0], -1)
+        if samples.shape[0] == 0:
+            return self
+        self.paths += samples.shape[0] if paths is None else paths
+        mean = samples.mean(axis=0)
+        centered = samples - mean
+        self._combine(samples.shape[0], mean, centered.T @ centered)
+        return self
+
+    def merge(self, other: "RunningStatistics") -> "RunningStatistics":
+        """Fold the statistics of another accumulator into this one"""
+        if other.count > 0:
+            self._combine(other.count, other.mean, other.comoment)
+            self.paths += other.paths
+        return self
+
+    def _combine(self, count, mean, comoment):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / total
+        self.comoment = self.comoment + comoment + np.outer(delta, delta) * self.count * count / total
+        self.count = total
+
+    def covariance(self, ddof: int = 0) -> np.ndarray:
+        return self.comoment / (self.count - ddof)
+
+    def variance(self, ddof: int = 0) -> np.ndarray:
+        return np.diag(self.covariance(ddof))
+
+    def std(self, ddof: int = 0) -> np.ndarray:
+        return np.sqrt(self.variance(ddof))
+
+    def control_variate_estimate(self, control_mean: float, target: int = 0, control: int = 1):
+        """
+        Control-variate estimate of the mean of variable target, using variable control with known mean
+        control_mean and the estimated optimal coefficient. Returns (estimate, standard error).
+        """
+        cov = self.covariance(ddof=1)
+        # A control that never varies (e.g. a deep out-of-the-money payoff) carries no information.
+        theta = cov[target, control] / cov[control, control] if cov[control, control] > 0 else 0.0
+        estimate = self.mean[target] - theta * (self.mean[control] - control_mean)
+        variance = (self.comoment[target, target] - 2 * theta * self.comoment[target, control]
+                    + theta**2 * self.comoment[control, control]) / self.count
+        return estimate, np.sqrt(max(variance, 0.0) / self.count)
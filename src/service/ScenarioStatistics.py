@@ -0,0 +1,39 @@
+import numpy as np
+from .RunningStatistics import RunningStatistics
+
+class ScenarioStatistics:
+    """
+    One RunningStatistics per cell of a scenario grid, stored row-major over (spot shift, vol shift).
+    Cells are simulated from the same paths but kept apart, so each has its own estimate and
+    standard error, and workers are merged cell by cell.
+    """
+    def __init__(self, shape: tuple, dimension: int = 1):
+        self.shape = tuple(shape)
+        self.cells = [RunningStatistics(dimension) for _ in range(int(np.prod(self.shape)))]
+
+    @staticmethod
+    def axes(S, sigma, spot_shifts, vol_shifts):
+        """Shocked spots S * (1 + spot_shift) and volatilities sigma + vol_shift, which must stay positive"""
+        spots = S * (1 + np.asarray(spot_shifts, dtype=float))
+        sigmas = sigma + np.asarray(vol_shifts, dtype=float)
+        if spots.size == 0 or sigmas.size == 0:
+            raise ValueError("spot_shifts and vol_shifts must not be empty.")
+        if np.any(spots <= 0) or np.any(sigmas <= 0):
+            raise ValueError("Shocked spots and volatilities must be greater than 0.")
+        return spots, sigmas
+
+    @property
+    def count(self) -> int:
+        return self.cells[0].count
+
+    @property
+    def paths(self) -> int:
+        return self.cells[0].paths
+
+    def cell(self, i: int, j: int) -> RunningStatistics:
+        return self.cells[i * self.shape[1] + j]
+
+    def merge(self, other: "ScenarioStatistics") -> "ScenarioStatistics":
+        for cell, other_cell in zip(self.cells, other.cells):
+            cell.merge(other_cell)
+        return self
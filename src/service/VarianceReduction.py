@@ -0,0 +1,57 @@
+import numpy as np
+
+TECHNIQUES = ("antithetic", "moment_matching", "importance_sampling")
+
+class VarianceReduction:
+    @staticmethod
+    def validate(techniques) -> frozenset:
+        """The set of requested techniques; any combination of TECHNIQUES may be used together"""
+        techniques = frozenset(techniques or ())
+        unknown = techniques.difference(TECHNIQUES)
+        if unknown:
+            raise ValueError(f"Invalid variance_reduction {', '.join(sorted(unknown))}. Must be among {', '.join(TECHNIQUES)}.")
+        return techniques
+
+    @staticmethod
+    def normals(draw, count: int, techniques) -> np.ndarray:
+        """
+        Standard normals for count paths from draw(rows) -> array of shape (rows, dimensions).
+        With antithetic, draws ceil(count / 2) rows Z and returns [Z; -Z], so path i pairs with
+        path i + len / 2. With moment_matching, every dimension is rescaled to sample mean 0 and
+        standard deviation 1, computed in float64; this adds a bias of order 1 / count.
+        """
+        if "antithetic" in techniques:
+            Z = draw((count + 1) // 2)
+            Z = np.concatenate((Z, -Z))
+        else:
+            Z = draw(count)
+        if "moment_matching" in techniques and len(Z) > 1:
+            mean = Z.mean(axis=0, dtype=np.float64)
+            std = Z.std(axis=0, dtype=np.float64)
+            Z = ((Z - mean) / np.where(std > 0, std, 1.0)).astype(Z.dtype)
+        return Z
+
+    @staticmethod
+    def paths_per_sample(techniques) -> int:
+        """Simulated paths behind each sample folded into the statistics"""
+        return 2 if "antithetic" in techniques else 1
+
+    @staticmethod
+    def likelihood_ratio(Z, shift) -> np.ndarray:
+        """
+        Weights exp(-shift . Z - |shift|^2 / 2) that make payoffs of the shifted normals Z + shift
+        unbiased for the unshifted expectation
+        """
+        shift = np.asarray(shift, dtype=np.float64)
+        return np.exp(-(Z @ shift.astype(Z.dtype)) - 0.5 * shift @ shift)
+
+    @staticmethod
+    def pair_average(samples, techniques):
+        """
+        Average each antithetic pair of samples, which are rows i and i + len / 2, so the pairs
+        enter the running statistics as independent samples; other samples pass through unchanged
+        """
+        if "antithetic" not in techniques:
+            return samples
+        half = len(samples) // 2
+        return 0.5 * (samples[:half] + samples[half:])
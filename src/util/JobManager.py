@@ -0,0 +1,112 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+class JobCancelledError(Exception):
+    pass
+
+class Job:
+    def __init__(self, kind: str, total_paths: int):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.total_paths = total_paths
+        self.paths_done = 0
+        self.estimate = None
+        self.confident_interval = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = threading.Event()
+        self.future = None
+
+    def report_progress(self, paths_done, estimate, confident_interval):
+        """Progress callback handed to the engines; raises to stop the simulation once cancelled"""
+        self.paths_done = int(paths_done)
+        self.estimate = float(estimate)
+        self.confident_interval = [float(bound) for bound in confident_interval]
+        if self.cancel_requested.is_set():
+            raise JobCancelledError(f"Job {self.id} was cancelled")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": {
+                "paths_done": self.paths_done,
+                "total_paths": self.total_paths,
+                "fraction": self.paths_done / self.total_paths if self.total_paths else 0.0,
+                "estimate": self.estimate,
+                "confident_interval": self.confident_interval
+            },
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+class JobManager:
+    def __init__(self, max_workers: int = 2, max_jobs: int = 1000):
+        """
+        Run long pricing jobs on a dedicated thread pool, separate from the request threadpool
+        max_workers: Number of jobs running concurrently
+        max_jobs: Number of jobs remembered; the oldest finished jobs are forgotten first
+        """
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pricing-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, total_paths: int, run) -> Job:
+        """Queue run(progress) -> result, where progress(paths_done, estimate, confident_interval) reports back"""
+        job = Job(kind, total_paths)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._forget_finished()
+        job.future = self._executor.submit(self._execute, job, run)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str):
+        """Cancel a queued job immediately, or ask a running job to stop at its next progress report"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancel_requested.set()
+        if job.future.cancel():
+            job.status = "cancelled"
+            job.finished_at = time.time()
+        return job
+
+    def _execute(self, job: Job, run):
+        if job.cancel_requested.is_set():
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            return
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = run(job.report_progress)
+            job.paths_done = job.total_paths
+            job.status = "completed"
+        except JobCancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        while len(self._jobs) > self.max_jobs and finished:
+            del self._jobs[finished.pop(0)]
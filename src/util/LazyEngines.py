@@ -0,0 +1,74 @@
+import importlib
+import threading
+import time
+from .Metrics import metrics
+
+class LazyEngine:
+    def __init__(self, name: str, loader):
+        """
+        Stand-in for an engine class or object that is only built on first attribute access
+        name: Engine name used by warm-up and in metrics
+        loader: Callable returning the real object
+        """
+        self.name = name
+        self.import_seconds = None
+        self._loader = loader
+        self._target = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Build the engine once, recording how long the first load took"""
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    start = time.perf_counter()
+                    target = self._loader()
+                    self.import_seconds = time.perf_counter() - start
+                    metrics.set("engine_import_seconds", self.import_seconds, engine=self.name)
+                    self._target = target
+        return self._target
+
+    @property
+    def loaded(self) -> bool:
+        return self._target is not None
+
+    def __getattr__(self, attribute):
+        return getattr(self.load(), attribute)
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+class LazyEngines:
+    def __init__(self, package: str = None):
+        """
+        Registry of engines loaded on first use, so importing the app does not pay for
+        SciPy, PyArrow and the engine modules until a route needs them
+        package: Anchor for relative module paths
+        """
+        self.package = package
+        self._engines = {}
+
+    def register(self, name: str, loader) -> LazyEngine:
+        engine = self._engines[name] = LazyEngine(name, loader)
+        return engine
+
+    def module(self, name: str, path: str, attribute: str = None) -> LazyEngine:
+        """Lazy stand-in for attribute (default name) of the module at path"""
+        return self.register(name, lambda: getattr(importlib.import_module(path, self.package), attribute or name))
+
+    def warm_up(self, names=None) -> dict:
+        """
+        Load the named engines now (all when names is None) and return the seconds each took.
+        Engines share dependencies, so whichever loads first also pays for the shared imports.
+        """
+        names = list(self._engines) if names is None else names
+        unknown = [name for name in names if name not in self._engines]
+        if unknown:
+            raise ValueError(f"Unknown engines: {', '.join(unknown)}. Must be among {', '.join(self._engines)}.")
+        for name in names:
+            self._engines[name].load()
+        return {name: self._engines[name].import_seconds for name in names}
+
+    def report(self) -> dict:
+        """Whether each engine is loaded and the seconds its first load took"""
+        return {name: {"loaded": engine.loaded, "import_seconds": engine.import_seconds} for name, engine in self._engines.items()}
@@ -0,0 +1,124 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Metrics:
+    def __init__(self):
+        """
+        Counters, gauges and histograms rendered in the Prometheus text exposition format.
+        Series are keyed by metric name and a sorted tuple of label pairs. Engines running in
+        the process pool record into their worker's own registry, which is not exported.
+        """
+        self._descriptions = {}
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, kind: str, help: str, buckets=DEFAULT_BUCKETS) -> None:
+        """Register the type ("counter", "gauge" or "histogram"), help text and buckets of a metric"""
+        self._descriptions[name] = (kind, help, tuple(buckets))
+
+    @staticmethod
+    def _series(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        series = self._series(name, labels)
+        with self._lock:
+            self._counters[series] = self._counters.get(series, 0.0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        series = self._series(name, labels)
+        with self._lock:
+            self._gauges[series] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        buckets = self._descriptions.get(name, (None, None, DEFAULT_BUCKETS))[2]
+        series = self._series(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(series)
+            if histogram is None:
+                histogram = self._histograms[series] = {"buckets": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram["counts"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    @contextmanager
+    def time(self, name: str, **labels):
+        """Observe the seconds spent in the with-block into histogram name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _format_labels(labels, extra=()) -> str:
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(float(value))
+
+    def render(self) -> str:
+        """All series in the Prometheus text format, grouped by metric name"""
+        with self._lock:
+            families = {}
+            for (name, labels), value in self._counters.items():
+                families.setdefault(name, ("counter", []))[1].append((labels, value))
+            for (name, labels), value in self._gauges.items():
+                families.setdefault(name, ("gauge", []))[1].append((labels, value))
+            for (name, labels), histogram in self._histograms.items():
+                families.setdefault(name, ("histogram", []))[1].append((labels, dict(histogram, counts=list(histogram["counts"]))))
+
+        lines = []
+        for name in sorted(families):
+            kind, series = families[name]
+            help = self._descriptions.get(name, (kind, name, None))[1]
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(series, key=lambda item: item[0]):
+                if kind != "histogram":
+                    lines.append(f"{name}{self._format_labels(labels)} {self._format_value(value)}")
+                    continue
+                for bound, count in zip(value["buckets"], value["counts"]):
+                    lines.append(f"{name}_bucket{self._format_labels(labels, [('le', self._format_value(bound))])} {count}")
+                lines.append(f"{name}_bucket{self._format_labels(labels, [('le', '+Inf')])} {value['count']}")
+                lines.append(f"{name}_sum{self._format_labels(labels)} {self._format_value(value['sum'])}")
+                lines.append(f"{name}_count{self._format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+metrics.describe("http_request_duration_seconds", "histogram", "Latency of HTTP requests by method, route and status")
+metrics.describe("http_requests_total", "counter", "HTTP requests by method, route and status")
+metrics.describe("http_request_errors_total", "counter", "HTTP requests answered with a 4xx or 5xx status, or raising")
+metrics.describe("engine_phase_seconds", "histogram", "Time spent per chunk in each phase of a Monte Carlo engine",
+                 buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+metrics.describe("monte_carlo_paths_total", "counter", "Monte Carlo paths simulated by engine")
+metrics.describe("monte_carlo_run_seconds", "histogram", "Wall time of a complete Monte Carlo run by engine")
+metrics.describe("monte_carlo_paths_per_second", "gauge", "Throughput of the last Monte Carlo run by engine")
+metrics.describe("engine_import_seconds", "gauge", "Seconds the first load of each lazily imported engine took")
+metrics.describe("micro_batch_size", "histogram", "Requests priced together in one vectorized engine call by batcher",
+                 buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024))
+metrics.describe("micro_batch_queue_seconds", "histogram", "Seconds each request waited for its batch to be priced by batcher",
+                 buckets=(0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1))
+metrics.describe("normal_cache_requests_total", "counter", "Lookups of cached normal blocks by generator and result (hit or miss)")
+metrics.describe("normal_cache_bytes", "gauge", "Total size of the normal blocks stored on disk after the last eviction")
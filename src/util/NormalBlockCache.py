@@ -0,0 +1,131 @@
+import hashlib
+import os
+import tempfile
+import threading
+import numpy as np
+from .Metrics import metrics
+
+class NormalBlockCache:
+    def __init__(self, directory: str = None, max_bytes: int = 2**30):
+        """
+        Blocks of standard normals keyed by generator, seed, dimension and dtype, stored as .npy files
+        and memory-mapped read-only, so every process pointing at the same directory (uvicorn workers,
+        Monte Carlo pool workers) shares one copy through the page cache
+        directory: Where blocks are stored; None disables the cache
+        max_bytes: Total size of the stored blocks; the least recently used are deleted beyond it
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_environment(cls) -> "NormalBlockCache":
+        return cls(
+            os.environ.get("OPTION_PRICER_NORMAL_CACHE_DIR") or None,
+            int(float(os.environ.get("OPTION_PRICER_NORMAL_CACHE_MB", 1024)) * 2**20)
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None and self.max_bytes > 0
+
+    @staticmethod
+    def seed_key(seed) -> str:
+        """Stable key of an int seed or of a SeedSequence spawned for a worker or replicate"""
+        if isinstance(seed, np.random.SeedSequence):
+            return f"{seed.entropy}-{'.'.join(map(str, seed.spawn_key))}"
+        if isinstance(seed, (int, np.integer)):
+            return str(int(seed))
+        return None
+
+    def stream(self, generator: str, seed, dimension: int, count: int, dtype, make_draw, version: str = ""):
+        """
+        Return draw(rows) handing out successive rows of the normal stream that make_draw() -> draw(rows)
+        produces from a fresh generator. The first count rows come from the cached block, generated in one
+        go on a miss; a block cached for at least count rows is served as a prefix slice. Streams the cache
+        cannot key, and blocks larger than the whole cache, fall back to make_draw(). version tags blocks
+        with the library version of the generator, so an upgrade that changes the stream misses the cache.
+        """
+        seed_key = self.seed_key(seed)
+        itemsize = np.dtype(dtype).itemsize
+        if not self.enabled or seed_key is None or count is None or count * dimension * itemsize > self.max_bytes:
+            return make_draw()
+
+        block = self.block(f"{generator}{version}-{np.dtype(dtype).name}-d{dimension}-{seed_key}", generator, count, dimension, dtype, make_draw)
+        position = 0
+        fallback = None
+
+        def draw(rows):
+            nonlocal position, fallback
+            if position + rows <= count:
+                rows_drawn = block[position:position + rows]
+            else:
+                # Past the cached rows: replay the generator up to the current position and continue from it.
+                if fallback is None:
+                    fallback = make_draw()
+                    if position > 0:
+                        fallback(position)
+                rows_drawn = fallback(rows)
+            position += rows
+            return rows_drawn
+
+        return draw
+
+    def block(self, key: str, generator: str, count: int, dimension: int, dtype, make_draw) -> np.ndarray:
+        """The first count rows of the block for key, memory-mapped read-only"""
+        path = os.path.join(self.directory, hashlib.sha256(f"{key}-numpy{np.__version__}".encode()).hexdigest()[:32] + ".npy")
+        with self._lock:
+            try:
+                block = np.load(path, mmap_mode="r")
+                if len(block) >= count:
+                    os.utime(path)
+                    metrics.inc("normal_cache_requests_total", generator=generator, result="hit")
+                    return block[:count]
+            except (FileNotFoundError, ValueError):
+                pass
+            metrics.inc("normal_cache_requests_total", generator=generator, result="miss")
+            self.store(path, count, dimension, dtype, make_draw())
+            self.evict(keep=path)
+            return np.load(path, mmap_mode="r")[:count]
+
+    def store(self, path: str, count: int, dimension: int, dtype, draw, chunk_size: int = 2**16) -> None:
+        """
+        Write count rows of draw(rows) chunk by chunk into a temporary file and rename it, so the block is
+        never held in memory whole and readers in other processes never see a partial block
+        """
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(handle)
+        try:
+            block = np.lib.format.open_memmap(temporary, mode="w+", dtype=dtype, shape=(count, dimension))
+            for start in range(0, count, chunk_size):
+                block[start:start + chunk_size] = draw(min(chunk_size, count - start))
+            block.flush()
+            del block
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def evict(self, keep: str = None) -> None:
+        """Delete the least recently used blocks until the total fits max_bytes; processes mapping them keep their copy"""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npy"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.unlink(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        metrics.set("normal_cache_bytes", total)
+
+normal_blocks = NormalBlockCache.from_environment()
@@ -0,0 +1,93 @@
+import functools
+import hashlib
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from pydantic import BaseModel
+
+class ResultCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        """
+        Bounded LRU cache of endpoint responses with a time-to-live per entry
+        maxsize: Maximum number of entries kept; 0 disables the cache
+        ttl: Seconds an entry stays valid after it was stored
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(namespace: str, request: BaseModel) -> str:
+        """Key a request by its endpoint and canonical JSON form, so equal DTOs share an entry"""
+        payload = request.model_dump_json().encode()
+        return f"{namespace}:{type(request).__name__}:{hashlib.sha256(payload).hexdigest()}"
+
+    def get(self, key: str):
+        """Return (True, value) for a live entry, otherwise (False, None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key: str, value) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def cached(self, func):
+        """Decorate a route handler, plain or async, taking a single DTO argument named request"""
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(request):
+                key = self.make_key(func.__name__, request)
+                found, value = self.get(key)
+                if found:
+                    return value
+                value = await func(request)
+                self.set(key, value)
+                return value
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(request):
+            key = self.make_key(func.__name__, request)
+            found, value = self.get(key)
+            if found:
+                return value
+            value = func(request)
+            self.set(key, value)
+            return value
+        return wrapper